@@ -0,0 +1,30 @@
+"""
+Compares attribute access through the ``root`` proxy with access through a compiled accessor::
+
+    python benchmarks/bench_accessors.py
+"""
+
+import timeit
+
+from confetti import Config
+
+NUMBER = 200000
+
+
+def main():
+    config = Config({"server": {"http": {"port": 8080, "host": "localhost"}}})
+    root = config.root
+    compiled = config.compile_root()
+    for name, accessor in [("proxy", root), ("compiled", compiled)]:
+        elapsed = timeit.timeit(lambda: accessor.server.http.port, number=NUMBER)
+        print(
+            "{0:>10}: {1:.3f}us per access".format(name, elapsed * 1000000.0 / NUMBER)
+        )
+    elapsed = timeit.timeit(
+        lambda: Config(config.serialize_to_dict()).compile_root(), number=1000
+    )
+    print("{0:>10}: {1:.3f}us per config".format("compile", elapsed * 1000.0))
+
+
+if __name__ == "__main__":
+    main()
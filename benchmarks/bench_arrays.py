@@ -0,0 +1,52 @@
+"""
+Compares large numeric list leaves with NumericArray leaves for backups, serialization, parsing and memory::
+
+    python benchmarks/bench_arrays.py
+"""
+
+import timeit
+
+from confetti import Config, NumericArray
+from confetti.utils import coerce_leaf_value
+
+LEAVES = 10
+ITEMS = 100000
+NUMBER = 5
+
+
+def _make_config(factory):
+    return Config(
+        dict(
+            ("table{0}".format(index), factory([i * 0.5 for i in range(ITEMS)]))
+            for index in range(LEAVES)
+        )
+    )
+
+
+def _time(func):
+    return timeit.timeit(func, number=NUMBER) * 1000.0 / NUMBER
+
+
+def main():
+    string = repr([i * 0.5 for i in range(ITEMS)])
+    for name, factory in [("list", list), ("NumericArray", NumericArray)]:
+        config = _make_config(factory)
+        leaf = config["table0"]
+
+        def backup():
+            config.backup()
+            config.discard_backup()
+
+        print(
+            "{0:>12}: backup {1:8.2f}ms, serialize {2:8.2f}ms, parse {3:8.2f}ms, size {4:8.1f}KB".format(
+                name,
+                _time(backup),
+                _time(config.serialize_to_dict),
+                _time(lambda: coerce_leaf_value("table0", string, leaf)),
+                config.get_memory_usage()[0][1] / 1024.0,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Measures how loading and validating many tenant config files with :func:`confetti.bulk.load_files` scales with the
+number of worker processes::
+
+    python benchmarks/bench_bulk.py
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from confetti import Config
+from confetti.bulk import load_files
+
+NUM_FILES = 2000
+SECTIONS = 10
+KEYS_PER_SECTION = 20
+
+
+def _make_dict(tenant):
+    return dict(
+        (
+            "section{0}".format(section),
+            dict(
+                ("key{0}".format(key), tenant + key) for key in range(KEYS_PER_SECTION)
+            ),
+        )
+        for section in range(SECTIONS)
+    )
+
+
+def _write_files(directory):
+    returned = []
+    for tenant in range(NUM_FILES):
+        filename = os.path.join(directory, "tenant{0}.py".format(tenant))
+        with open(filename, "w") as f:
+            f.write("CONFIG = {0!r}\n".format(_make_dict(tenant)))
+        returned.append(filename)
+    return returned
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        filenames = _write_files(directory)
+        base = Config(_make_dict(0))
+        start = time.time()
+        for filename in filenames:
+            config = Config.from_filename(filename)
+            base._verify_config_paths(config)
+        print("{0:>12}: {1:8.2f}s".format("sequential", time.time() - start))
+        processes = 1
+        while processes <= multiprocessing.cpu_count():
+            start = time.time()
+            results = load_files(filenames, base=base, processes=processes)
+            elapsed = time.time() - start
+            assert all(result.is_valid() for result in results)
+            print(
+                "{0:>12}: {1:8.2f}s".format("{0} processes".format(processes), elapsed)
+            )
+            processes *= 2
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
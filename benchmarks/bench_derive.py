@@ -0,0 +1,67 @@
+"""
+Compares the memory used by many per-tenant configs created as deep copies of a base config and as derived
+configs sharing the base::
+
+    python benchmarks/bench_derive.py
+"""
+
+import gc
+import tracemalloc
+
+from confetti import Config
+
+NUM_TENANTS = 10000
+SECTIONS = 20
+KEYS_PER_SECTION = 50
+
+
+def _make_base():
+    return Config(
+        dict(
+            (
+                "section{0}".format(section),
+                dict(("key{0}".format(key), key) for key in range(KEYS_PER_SECTION)),
+            )
+            for section in range(SECTIONS)
+        )
+    )
+
+
+def _overrides(tenant):
+    return {"section0.key0": tenant, "section1.key1": tenant, "section2.key2": tenant}
+
+
+def _copy(base, tenant):
+    returned = Config(base.serialize_to_dict())
+    for path, value in _overrides(tenant).items():
+        returned.assign_path(path, value)
+    return returned
+
+
+def _derive(base, tenant):
+    return base.derive(_overrides(tenant))
+
+
+def _measure(factory, base):
+    gc.collect()
+    tracemalloc.start()
+    tenants = [factory(base, tenant) for tenant in range(NUM_TENANTS)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert tenants[-1].get_path("section1.key1") == NUM_TENANTS - 1
+    return size
+
+
+def main():
+    base = _make_base()
+    for name, factory in [("deep copies", _copy), ("derived", _derive)]:
+        size = _measure(factory, base)
+        print(
+            "{0}: {1:.1f} MiB total, {2:.0f} bytes per tenant".format(
+                name, size / 2.0**20, size / float(NUM_TENANTS)
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Compares diffing two configs derived from the same base with serializing both and comparing the dicts::
+
+    python benchmarks/bench_diff.py
+"""
+
+import timeit
+
+from confetti import Config
+
+SECTIONS = 50
+KEYS_PER_SECTION = 100
+NUMBER = 100
+
+
+def _make_base():
+    return Config(
+        dict(
+            (
+                "section{0}".format(section),
+                dict(("key{0}".format(key), key) for key in range(KEYS_PER_SECTION)),
+            )
+            for section in range(SECTIONS)
+        )
+    )
+
+
+def _serialized_diff(first, second):
+    first = first.serialize_to_dict()
+    second = second.serialize_to_dict()
+    return [
+        (section, key)
+        for section in first
+        for key in first[section]
+        if first[section][key] != second[section].get(key)
+    ]
+
+
+def main():
+    base = _make_base()
+    first = base.derive({"section0.key0": -1})
+    second = base.derive({"section1.key1": -1})
+    for name, func in [
+        ("serialize", lambda: _serialized_diff(first, second)),
+        ("diff", lambda: first.diff(second)),
+    ]:
+        elapsed = timeit.timeit(func, number=NUMBER)
+        print("{0:>10}: {1:8.3f}ms".format(name, elapsed * 1000.0 / NUMBER))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compares the peak memory and time of exporting configs of growing sizes through serialize_to_dict() and json.dumps
+with streaming them through Config.dump()::
+
+    python benchmarks/bench_dump.py
+"""
+
+import json
+import os
+import time
+import tracemalloc
+
+from confetti import Config
+
+SECTIONS = [10, 100, 1000]
+KEYS_PER_SECTION = 100
+
+
+def _make_config(sections):
+    return Config(
+        dict(
+            (
+                "section{0}".format(section),
+                dict(
+                    ("key{0}".format(key), "value{0}".format(key))
+                    for key in range(KEYS_PER_SECTION)
+                ),
+            )
+            for section in range(sections)
+        )
+    )
+
+
+def _measure(func, config):
+    with open(os.devnull, "w") as f:
+        start = time.time()
+        func(config, f)
+        elapsed = time.time() - start
+        tracemalloc.start()
+        func(config, f)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def serialized(config, f):
+    f.write(json.dumps(config.serialize_to_dict()))
+
+
+def streamed(config, f):
+    config.dump(f)
+
+
+def main():
+    for sections in SECTIONS:
+        config = _make_config(sections)
+        for name, func in [("serialized", serialized), ("dump", streamed)]:
+            elapsed, peak = _measure(func, config)
+            print(
+                "{0:>7} leaves {1:>12}: {2:8.1f}ms {3:10.1f}KB".format(
+                    sections * KEYS_PER_SECTION, name, elapsed * 1000.0, peak / 1024.0
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
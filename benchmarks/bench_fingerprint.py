@@ -0,0 +1,55 @@
+"""
+Compares hashing the serialized form of a large config after each change with its incremental fingerprint::
+
+    python benchmarks/bench_fingerprint.py
+"""
+
+import hashlib
+import pickle
+import timeit
+
+from confetti import Config
+
+SECTIONS = 100
+KEYS_PER_SECTION = 100
+NUMBER = 100
+
+
+def _make_config():
+    return Config(
+        dict(
+            (
+                "section{0}".format(section),
+                dict(("key{0}".format(key), key) for key in range(KEYS_PER_SECTION)),
+            )
+            for section in range(SECTIONS)
+        )
+    )
+
+
+def main():
+    config = _make_config()
+    config.fingerprint()
+    counter = [0]
+
+    def change():
+        counter[0] += 1
+        config.assign_path("section5.key5", counter[0])
+
+    def serialized():
+        change()
+        return hashlib.sha1(
+            pickle.dumps(sorted(config.serialize_to_dict().items()))
+        ).hexdigest()
+
+    def incremental():
+        change()
+        return config.fingerprint()
+
+    for name, func in [("serialized", serialized), ("fingerprint", incremental)]:
+        elapsed = timeit.timeit(func, number=NUMBER)
+        print("{0:>12}: {1:8.3f}ms".format(name, elapsed * 1000.0 / NUMBER))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compares reading a few dozen paths one by one with get_path() and with a single get_paths() call::
+
+    python benchmarks/bench_get_paths.py
+"""
+
+import timeit
+
+from confetti import Config
+from confetti.paths import compile_paths
+
+NUMBER = 10000
+
+
+def _make_config():
+    return Config(
+        {
+            "app": {
+                "services": dict(
+                    (
+                        "service{0}".format(service),
+                        {
+                            "host": "localhost",
+                            "port": 8000 + service,
+                            "pool": {"size": 10, "timeout": 1.5, "retries": 3},
+                        },
+                    )
+                    for service in range(10)
+                )
+            }
+        }
+    )
+
+
+def main():
+    config = _make_config()
+    paths = [
+        "app.services.service{0}.{1}".format(service, key)
+        for service in range(6)
+        for key in ("host", "port", "pool.size", "pool.timeout", "pool.retries")
+    ]
+    path_set = compile_paths(paths)
+
+    def one_by_one():
+        return [config.get_path(path) for path in paths]
+
+    def get_paths():
+        return config.get_paths(paths)
+
+    def compiled():
+        return path_set.get(config)
+
+    assert tuple(one_by_one()) == get_paths() == compiled()
+    print("{0} paths".format(len(paths)))
+    for name, func in [
+        ("get_path", one_by_one),
+        ("get_paths", get_paths),
+        ("compiled", compiled),
+    ]:
+        elapsed = min(timeit.repeat(func, number=NUMBER, repeat=5))
+        print("{0:>12}: {1:8.2f}us".format(name, elapsed * 1e6 / NUMBER))
+
+
+if __name__ == "__main__":
+    main()
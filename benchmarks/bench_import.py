@@ -0,0 +1,53 @@
+"""
+Measures the overhead of importing confetti in a fresh interpreter over that of the bare interpreter, exiting with an
+error if ``import confetti`` exceeds the threshold given in milliseconds::
+
+    python benchmarks/bench_import.py [threshold]
+"""
+
+import subprocess
+import sys
+import time
+
+NUMBER = 20
+DEFAULT_THRESHOLD = 10.0
+
+STATEMENTS = [
+    ("bare", "pass"),
+    ("import confetti", "import confetti"),
+    ("Config", "from confetti import Config"),
+]
+
+
+def _time(statement):
+    best = None
+    for _ in range(NUMBER):
+        start = time.time()
+        subprocess.check_call([sys.executable, "-c", statement])
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best * 1000.0
+
+
+def main():
+    threshold = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_THRESHOLD
+    times = dict((name, _time(statement)) for name, statement in STATEMENTS)
+    for name, _ in STATEMENTS:
+        print(
+            "{0:>16}: {1:8.2f}ms (+{2:.2f}ms)".format(
+                name, times[name], times[name] - times["bare"]
+            )
+        )
+    overhead = times["import confetti"] - times["bare"]
+    if overhead > threshold:
+        print(
+            "import confetti overhead {0:.2f}ms exceeds {1:.2f}ms".format(
+                overhead, threshold
+            )
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Measures the memory taken by many tenant copies of a configuration loaded from JSON, whose keys and string values are
+built at runtime, with and without value interning::
+
+    python benchmarks/bench_interning.py
+"""
+
+import json
+import time
+import tracemalloc
+
+from confetti import Config
+from confetti.interning import set_value_interning
+
+TENANTS = 200
+SERVICES = 50
+
+
+def _make_document():
+    return json.dumps(
+        dict(
+            (
+                "service{0}".format(service),
+                {
+                    "host": "db-primary.internal.example.com",
+                    "mode": "read-write",
+                    "region": "eu-west-1",
+                    "port": 5432,
+                },
+            )
+            for service in range(SERVICES)
+        )
+    )
+
+
+def _load_tenants(document):
+    return [Config(json.loads(document)) for _ in range(TENANTS)]
+
+
+def main():
+    document = _make_document()
+    for name, intern_values in [("keys", False), ("keys+values", True)]:
+        set_value_interning(intern_values)
+        tracemalloc.start()
+        start = time.time()
+        tenants = _load_tenants(document)
+        elapsed = time.time() - start
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(
+            "{0:>12}: {1:8.1f}KB {2:8.1f}ms".format(
+                name, size / 1024.0, elapsed * 1000.0
+            )
+        )
+        del tenants
+    set_value_interning(False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compares persisting runtime overrides by saving the whole tree after every change with recording them in a
+:class:`confetti.journal.Journal`, and measures the time to replay the journal on startup::
+
+    python benchmarks/bench_journal.py
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+from confetti import Config
+from confetti.journal import Journal
+
+NUM_CHANGES = 5000
+SECTIONS = 20
+KEYS_PER_SECTION = 50
+
+
+def _make_config():
+    return Config(
+        dict(
+            (
+                "section{0}".format(section),
+                dict(("key{0}".format(key), key) for key in range(KEYS_PER_SECTION)),
+            )
+            for section in range(SECTIONS)
+        )
+    )
+
+
+def _changes():
+    for index in range(NUM_CHANGES):
+        yield "section{0}.key{1}".format(
+            index % SECTIONS, index % KEYS_PER_SECTION
+        ), index
+
+
+def _save_whole_tree(directory):
+    config = _make_config()
+    filename = os.path.join(directory, "tree.pickle")
+    for path, value in _changes():
+        config.assign_path(path, value)
+        with open(filename, "wb") as f:
+            pickle.dump(config.serialize_to_dict(), f)
+
+
+def _journal(directory):
+    config = _make_config()
+    journal = Journal(os.path.join(directory, "overrides.journal"))
+    journal.attach(config)
+    for path, value in _changes():
+        config.assign_path(path, value)
+    journal.close()
+
+
+def _replay(directory):
+    journal = Journal(os.path.join(directory, "overrides.journal"))
+    journal.attach(_make_config())
+    journal.close()
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        for name, func in [
+            ("save tree", _save_whole_tree),
+            ("journal", _journal),
+            ("replay", _replay),
+        ]:
+            start = time.time()
+            func(directory)
+            print("{0:>10}: {1:8.2f}ms".format(name, (time.time() - start) * 1000))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares the startup time and memory of loading a config file with a large routing table inline, and with the
+routing table declared as a lazy subtree which is never accessed::
+
+    python benchmarks/bench_lazy.py
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from confetti import Config
+
+NUM_ROUTES = 5000
+
+
+def _write_files(directory):
+    routes = (
+        "{"
+        + ", ".join(
+            '"route{0}": {{"path": "/r/{0}", "handler": "h{0}", "weight": {0}}}'.format(
+                i
+            )
+            for i in range(NUM_ROUTES)
+        )
+        + "}"
+    )
+    routes_filename = os.path.join(directory, "routes.py")
+    with open(routes_filename, "w") as f:
+        f.write("CONFIG = " + routes)
+    inline_filename = os.path.join(directory, "inline.py")
+    with open(inline_filename, "w") as f:
+        f.write('CONFIG = {"server": {"port": 8080}, "routes": ' + routes + "}")
+    lazy_filename = os.path.join(directory, "lazy.py")
+    with open(lazy_filename, "w") as f:
+        f.write(
+            "from confetti import Lazy\n"
+            'CONFIG = {{"server": {{"port": 8080}}, "routes": Lazy({0!r})}}'.format(
+                routes_filename
+            )
+        )
+    return inline_filename, lazy_filename
+
+
+def _load(filename):
+    config = Config.from_filename(filename)
+    assert config.root.server.port == 8080
+    return config
+
+
+def _measure(filename):
+    start = time.time()
+    _load(filename)
+    elapsed = time.time() - start
+    tracemalloc.start()
+    config = _load(filename)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, memory, config
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        for name, filename in zip(["inline", "lazy"], _write_files(directory)):
+            elapsed, memory, _ = _measure(filename)
+            print(
+                "{0:>8}: {1:8.2f}ms {2:10.1f}KB".format(
+                    name, elapsed * 1000, memory / 1024.0
+                )
+            )
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
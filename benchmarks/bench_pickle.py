@@ -0,0 +1,62 @@
+"""
+Compares pickling and copying a large config with round-tripping its serialized form::
+
+    python benchmarks/bench_pickle.py
+"""
+
+import copy
+import pickle
+import timeit
+
+from confetti import Config
+
+SECTIONS = 100
+KEYS_PER_SECTION = 100
+NUMBER = 10
+
+
+def _make_config():
+    return Config(
+        dict(
+            (
+                "section{0}".format(section),
+                dict(("key{0}".format(key), key) for key in range(KEYS_PER_SECTION)),
+            )
+            for section in range(SECTIONS)
+        )
+    )
+
+
+def main():
+    config = _make_config()
+
+    def serialized():
+        return Config(
+            pickle.loads(
+                pickle.dumps(config.serialize_to_dict(), pickle.HIGHEST_PROTOCOL)
+            )
+        )
+
+    def pickled():
+        return pickle.loads(pickle.dumps(config, pickle.HIGHEST_PROTOCOL))
+
+    def copied():
+        return copy.deepcopy(config)
+
+    print(
+        "pickle size: {0} bytes (serialized: {1} bytes)".format(
+            len(pickle.dumps(config, pickle.HIGHEST_PROTOCOL)),
+            len(pickle.dumps(config.serialize_to_dict(), pickle.HIGHEST_PROTOCOL)),
+        )
+    )
+    for name, func in [
+        ("serialized", serialized),
+        ("pickle", pickled),
+        ("deepcopy", copied),
+    ]:
+        elapsed = timeit.timeit(func, number=NUMBER)
+        print("{0:>12}: {1:8.3f}ms".format(name, elapsed * 1000.0 / NUMBER))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Measures the throughput of propagating changes from a publishing process to many subscribing worker processes::
+
+    python benchmarks/bench_pubsub.py
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from confetti import Config
+from confetti.pubsub import Publisher, Subscriber
+
+NUM_SUBSCRIBERS = 16
+NUM_BATCHES = 200
+CHANGES_PER_BATCH = 50
+SECTIONS = 20
+KEYS_PER_SECTION = 50
+
+
+def _make_config():
+    return Config(
+        dict(
+            (
+                "section{0}".format(section),
+                dict(("key{0}".format(key), key) for key in range(KEYS_PER_SECTION)),
+            )
+            for section in range(SECTIONS)
+        )
+    )
+
+
+def _subscribe(address, ready, done):
+    config = _make_config()
+    subscriber = Subscriber(config, address)
+    ready.release()
+    while subscriber.get_version() < NUM_BATCHES:
+        subscriber.poll(timeout=1)
+    done.put(config.root.section0.key0)
+    subscriber.close()
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    address = os.path.join(directory, "config.sock")
+    try:
+        config = _make_config()
+        publisher = Publisher(config, address, batch_interval=None)
+        ready = multiprocessing.Semaphore(0)
+        done = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=_subscribe, args=(address, ready, done))
+            for _ in range(NUM_SUBSCRIBERS)
+        ]
+        for process in processes:
+            process.start()
+        for _ in processes:
+            ready.acquire()
+        start = time.time()
+        for batch in range(NUM_BATCHES):
+            for index in range(CHANGES_PER_BATCH):
+                config.assign_path(
+                    "section{0}.key{1}".format(
+                        index % SECTIONS, index % KEYS_PER_SECTION
+                    ),
+                    batch,
+                )
+            publisher.flush()
+        results = [done.get() for _ in processes]
+        elapsed = time.time() - start
+        assert results == [NUM_BATCHES - 1] * NUM_SUBSCRIBERS
+        for process in processes:
+            process.join()
+        publisher.close()
+        changes = NUM_BATCHES * CHANGES_PER_BATCH
+        print(
+            "{0} subscribers: {1} changes in {2} patches in {3:.2f}s "
+            "({4:.0f} changes/s per subscriber)".format(
+                NUM_SUBSCRIBERS, changes, NUM_BATCHES, elapsed, changes / elapsed
+            )
+        )
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Measures the cost of reading references at several relative depths::
+
+    python benchmarks/bench_refs.py
+"""
+
+import timeit
+
+from confetti import Config, Ref
+
+DEPTHS = [1, 2, 4, 8]
+NUMBER = 100000
+
+
+def _build(depth):
+    node = {"ref": Ref("." * (depth + 1) + "target.value")}
+    for index in range(depth):
+        node = {"level{0}".format(index): node}
+    node["target"] = {"value": 1}
+    config = Config(node)
+    container = config
+    for index in reversed(range(depth)):
+        container = container["level{0}".format(index)]
+    return container
+
+
+def main():
+    for depth in DEPTHS:
+        container = _build(depth)
+        assert container["ref"] == 1
+        elapsed = timeit.timeit(lambda: container["ref"], number=NUMBER)
+        print(
+            "depth {0}: {1:.0f} ns per resolution".format(depth, elapsed / NUMBER * 1e9)
+        )
+
+
+if __name__ == "__main__":
+    main()
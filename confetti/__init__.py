@@ -1,6 +1,73 @@
+import sys
+
 from .__version__ import __version__
 
-from .config import Config
-from .metadata import Metadata
-from .ref import Ref
-from .utils import get_config_object_from_proxy
+# the public names, imported from their modules on first access to keep ``import confetti`` cheap
+_LAZY_ATTRIBUTES = {
+    "Computed": "ref",
+    "Config": "config",
+    "LayeredConfig": "layered",
+    "Lazy": "lazy",
+    "Metadata": "metadata",
+    "NumericArray": "arrays",
+    "Ref": "ref",
+    "get_config_object_from_proxy": "utils",
+}
+
+# submodules, imported on first access as attributes of the package like they were before the lazy imports
+_SUBMODULES = frozenset(
+    [
+        "accessors",
+        "arrays",
+        "bulk",
+        "config",
+        "derived",
+        "diff",
+        "dump",
+        "exceptions",
+        "fingerprint",
+        "interning",
+        "journal",
+        "layered",
+        "lazy",
+        "memory",
+        "metadata",
+        "paths",
+        "pubsub",
+        "python3_compat",
+        "query",
+        "ref",
+        "schema",
+        "utils",
+    ]
+)
+
+__all__ = sorted(_LAZY_ATTRIBUTES) + ["__version__"]
+
+if sys.version_info >= (3, 7):
+
+    def __getattr__(name):
+        if name in _SUBMODULES:
+            import importlib
+
+            return importlib.import_module("." + name, __name__)
+        module_name = _LAZY_ATTRIBUTES.get(name)
+        if module_name is None:
+            raise AttributeError(
+                "module {0!r} has no attribute {1!r}".format(__name__, name)
+            )
+        module = __import__(module_name, globals(), level=1)
+        returned = globals()[name] = getattr(module, name)
+        return returned
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _SUBMODULES)
+
+else:
+    from .arrays import NumericArray
+    from .config import Config
+    from .layered import LayeredConfig
+    from .lazy import Lazy
+    from .metadata import Metadata
+    from .ref import Computed, Ref
+    from .utils import get_config_object_from_proxy
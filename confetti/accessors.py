@@ -0,0 +1,169 @@
+import keyword
+import re
+
+from .config import Config, _is_node
+from .python3_compat import iteritems, string_types
+from .ref import Computed, Ref
+
+_SPECIAL_LEAVES = (Config, Computed, Ref)
+
+_IDENTIFIER = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+
+_classes_by_signature = {}
+
+# emptied when full, like the caches of compiled patterns and path sets
+_MAX_CACHED_CLASSES = 256
+
+
+def compile_accessor(config):
+    """
+    Returns an accessor object for ``config``, whose class is generated (or reused) according to the structure of the
+    tree
+
+    .. seealso:: :func:`Config.compile_root <confetti.config.Config.compile_root>`
+    """
+    return get_accessor_class(config)(config)
+
+
+def get_accessor_class(config):
+    """
+    Returns the accessor class matching the current structure of ``config``, generating it if needed
+    """
+    return _get_class(_get_signature(config))
+
+
+class AccessorBase(object):
+    """
+    Base class of generated accessors. Paths unknown to the generated class are looked up through the config's
+    ``root`` proxy. Leaves are read from the children of the config object on every access, so accessors stay
+    current when the children are replaced as a whole.
+
+    Nested accessors are created along with their parent, and only replaced when a node is assigned through the
+    accessor itself. An accessor held across other structure changes (e.g. a node replaced through the config object,
+    or new paths added) keeps reading the nodes it was created for, so :func:`Config.compile_root
+    <confetti.config.Config.compile_root>` should be called again to get a current one
+    """
+
+    __slots__ = ("_config",)
+
+    def __init__(self, config):
+        super(AccessorBase, self).__init__()
+        self._config = config
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return getattr(self._config.root, attr)
+
+    def __getitem__(self, item):
+        try:
+            return getattr(self, item)
+        except AttributeError:
+            raise KeyError(item)
+
+    def __dir__(self):
+        return list(self._config.keys())
+
+    def __repr__(self):
+        return "<Accessor {0!r}>".format(self._config)
+
+
+def _get_signature(config):
+    returned = []
+    for key, value in iteritems(config._value):
+        if not _is_accessible(key):
+            continue
+        if _is_node(value):
+            returned.append((key, _get_signature(config._get_child_config(key))))
+        else:
+            returned.append((key, None))
+    return tuple(returned)
+
+
+def _is_accessible(key):
+    return (
+        isinstance(key, string_types)
+        and _IDENTIFIER.match(key) is not None
+        and not keyword.iskeyword(key)
+    )
+
+
+def _generate_class(signature):
+    init_lines = [
+        "def __init__(self, config):",
+        "    AccessorBase.__init__(self, config)",
+    ]
+    lines = []
+    namespace = {
+        "AccessorBase": AccessorBase,
+        "_SPECIAL_LEAVES": _SPECIAL_LEAVES,
+        "_compile_child": _compile_child,
+    }
+    properties = []
+    slots = []
+    for index, (key, child_signature) in enumerate(signature):
+        properties.append((index, key))
+        if child_signature is not None:
+            namespace["_class_{0}".format(index)] = _get_class(child_signature)
+            init_lines.append(
+                "    self._node_{0} = _class_{0}(config._get_child_config({1!r}))".format(
+                    index, key
+                )
+            )
+            slots.append("_node_{0}".format(index))
+            # assignments go through the config object, after which the slot holds an accessor for the new node, or
+            # None if a leaf replaced it
+            lines.extend(
+                [
+                    "def _get_{0}(self):".format(index),
+                    "    returned = self._node_{0}".format(index),
+                    "    if returned is None:",
+                    "        return self._config[{0!r}]".format(key),
+                    "    return returned",
+                    "def _set_{0}(self, value):".format(index),
+                    "    self._config[{0!r}] = value".format(key),
+                    "    self._node_{0} = _compile_child(self._config, {1!r})".format(
+                        index, key
+                    ),
+                ]
+            )
+            continue
+        lines.extend(
+            [
+                "def _get_{0}(self):".format(index),
+                "    value = self._config._value[{0!r}]".format(key),
+                "    if isinstance(value, _SPECIAL_LEAVES):",
+                "        return self._config[{0!r}]".format(key),
+                "    return value",
+                "def _set_{0}(self, value):".format(index),
+                "    self._config[{0!r}] = value".format(key),
+            ]
+        )
+    source = "\n".join(init_lines + lines)
+    exec(compile(source, "<confetti accessor>", "exec"), namespace)
+
+    class_namespace = {
+        "__slots__": tuple(slots),
+        "__init__": namespace["__init__"],
+        "_source": source,
+    }
+    for index, key in properties:
+        class_namespace[key] = property(
+            namespace["_get_{0}".format(index)], namespace["_set_{0}".format(index)]
+        )
+    return type("Accessor", (AccessorBase,), class_namespace)
+
+
+def _compile_child(config, key):
+    if not _is_node(config._value[key]):
+        return None
+    return compile_accessor(config._get_child_config(key))
+
+
+def _get_class(signature):
+    returned = _classes_by_signature.get(signature)
+    if returned is None:
+        if len(_classes_by_signature) >= _MAX_CACHED_CLASSES:
+            _classes_by_signature.clear()
+        returned = _classes_by_signature[signature] = _generate_class(signature)
+    return returned
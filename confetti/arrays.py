@@ -0,0 +1,143 @@
+import array
+import re
+
+_SEPARATORS = re.compile(r"[\s,]+")
+
+_FLOAT_TYPECODES = frozenset("fd")
+
+
+class NumericArray(object):
+    """
+    An immutable leaf value holding a homogeneous sequence of numbers in an :class:`array.array`, for large leaves
+    such as weight tables or bucket boundaries::
+
+        config = Config({"buckets": NumericArray([0.1, 0.5, 1, 5])})
+
+    ``typecode`` is that of :mod:`array` (``"d"``, i.e. double, by default). As the values cannot be changed in
+    place, copies (including backups and :func:`Config.serialize_to_dict`) share the same array, and changing the
+    leaf means assigning a new array to it.
+
+    The values can be read without copying through :func:`NumericArray.memoryview`, the buffer protocol (Python 3.12
+    and up) or ``numpy.asarray()``
+    """
+
+    __slots__ = ("_array",)
+
+    def __init__(self, values=(), typecode="d"):
+        super(NumericArray, self).__init__()
+        if isinstance(values, NumericArray):
+            values = values._array
+        self._array = array.array(typecode, values)
+
+    @classmethod
+    def parse(cls, s, typecode="d"):
+        """
+        Parses a string of numbers separated by commas and/or whitespace, optionally enclosed in brackets (e.g.
+        ``"[1, 2.5, 3]"`` or ``"1 2.5 3"``)
+        """
+        s = s.strip()
+        if s[:1] in ("[", "(") and s[-1:] in ("]", ")"):
+            s = s[1:-1]
+        parts = [part for part in _SEPARATORS.split(s) if part]
+        convert = float if typecode in _FLOAT_TYPECODES else int
+        try:
+            return cls._from_array(array.array(typecode, map(convert, parts)))
+        except (ValueError, OverflowError):
+            raise ValueError("Invalid numeric array: {0!r}".format(s))
+
+    @classmethod
+    def _from_array(cls, values):
+        returned = cls.__new__(cls)
+        returned._array = values
+        return returned
+
+    @property
+    def typecode(self):
+        return self._array.typecode
+
+    @property
+    def itemsize(self):
+        return self._array.itemsize
+
+    def memoryview(self):
+        """
+        Returns a read-only memoryview of the values, without copying them
+        """
+        returned = memoryview(self._array)
+        if hasattr(returned, "toreadonly"):
+            returned = returned.toreadonly()
+        return returned
+
+    def __buffer__(self, flags):
+        return self.memoryview()
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy
+
+        returned = numpy.frombuffer(self._array, dtype=self._array.typecode)
+        returned.flags.writeable = False
+        if dtype is not None:
+            returned = returned.astype(dtype)
+        return returned
+
+    def tolist(self):
+        return self._array.tolist()
+
+    def tobytes(self):
+        return _tobytes(self._array)
+
+    def __len__(self):
+        return len(self._array)
+
+    def __iter__(self):
+        return iter(self._array)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return NumericArray._from_array(self._array[index])
+        return self._array[index]
+
+    def __eq__(self, other):
+        if isinstance(other, NumericArray):
+            return self._array == other._array
+        if isinstance(other, (list, tuple)):
+            return self._array.tolist() == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        returned = self.__eq__(other)
+        if returned is NotImplemented:
+            return returned
+        return not returned
+
+    def __hash__(self):
+        return hash((self._array.typecode, self.tobytes()))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (_restore_array, (self._array.typecode, self.tobytes()))
+
+    def __repr__(self):
+        return "<NumericArray {0!r} ({1} items)>".format(
+            self._array.typecode, len(self._array)
+        )
+
+
+def _tobytes(values):
+    if hasattr(values, "tobytes"):
+        return values.tobytes()
+    return values.tostring()
+
+
+def _restore_array(typecode, data):
+    values = array.array(typecode)
+    if hasattr(values, "frombytes"):
+        values.frombytes(data)
+    else:
+        values.fromstring(data)
+    return NumericArray._from_array(values)
@@ -0,0 +1,146 @@
+import multiprocessing
+import pickle
+
+from .config import Config, _Merge
+from .python3_compat import iteritems
+
+_MISSING_PATHS = "paths to disappear"
+
+_worker_base = None
+_worker_schema = None
+
+
+def load_files(filenames, base=None, processes=None, chunksize=8):
+    """
+    Loads many config files with :func:`Config.from_filename` in a pool of ``processes`` worker processes (one per
+    core by default), returning a :class:`LoadResult` for each file, in order.
+
+    When ``base`` is given, each file is validated against it: all paths of ``base`` must appear in the file (as in
+    :func:`Config.extend`), and the file must not contain unknown paths or values of the wrong type (as in
+    :func:`Config.compile_schema`)
+    """
+    filenames = list(filenames)
+    schema = base.compile_schema() if base is not None else None
+    if processes == 1 or len(filenames) <= 1:
+        _init_worker(base, schema)
+        try:
+            return [_load(filename) for filename in filenames]
+        finally:
+            _init_worker(None, None)
+    pool = multiprocessing.Pool(processes, _init_worker, (base, schema))
+    try:
+        return [
+            pickle.loads(data) for data in pool.map(_load_pickled, filenames, chunksize)
+        ]
+    finally:
+        pool.close()
+        pool.join()
+
+
+class LoadResult(object):
+    """
+    The outcome of loading a single file with :func:`load_files`. The loaded config is kept in a compact form of plain
+    values, which is cheap to pickle, and is only turned into a config object by :func:`LoadResult.get_config`
+    """
+
+    __slots__ = ("filename", "errors", "_state", "_metadata")
+
+    def __init__(self, filename, errors, state=None, metadata=None):
+        super(LoadResult, self).__init__()
+        self.filename = filename
+        self.errors = errors
+        self._state = state
+        self._metadata = metadata
+
+    def __getstate__(self):
+        return (self.filename, self.errors, self._state, self._metadata)
+
+    def __setstate__(self, state):
+        self.filename, self.errors, self._state, self._metadata = state
+
+    def is_valid(self):
+        return not self.errors
+
+    def get_config(self):
+        """
+        Returns the loaded config object, or None if the file could not be loaded
+        """
+        if self._state is None:
+            return None
+        returned = Config(self._state)
+        for path, metadata in iteritems(self._metadata):
+            returned.get_config(path).metadata = dict(metadata)
+        return returned
+
+    def __repr__(self):
+        return "<LoadResult {0} ({1} errors)>".format(self.filename, len(self.errors))
+
+
+def _init_worker(base, schema):
+    global _worker_base, _worker_schema
+    _worker_base = base
+    _worker_schema = schema
+
+
+def _load(filename):
+    try:
+        config = Config.from_filename(filename)
+    except Exception as e:
+        return LoadResult(filename, [("", "Cannot load: {0}".format(e))])
+    errors = []
+    if _worker_base is not None:
+        merge = _Merge()
+        merge.verify_config_paths(_worker_base, config, ())
+        errors.extend(
+            (path, "Missing path")
+            for path, message in merge.conflict_paths
+            if message == _MISSING_PATHS
+        )
+        errors.extend(_worker_schema.get_errors(config))
+        errors.sort()
+    state, metadata = _get_compact(config)
+    return LoadResult(filename, errors, state, metadata)
+
+
+def _load_pickled(filename):
+    """
+    Loads a file in a worker process, returning the pickled result. A result which cannot be pickled (e.g. holding a
+    lambda) is replaced with an error, instead of failing the whole batch when the pool sends it back
+    """
+    result = _load(filename)
+    try:
+        return pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        error = "Cannot send the loaded config between processes: {0}".format(e)
+        return pickle.dumps(
+            LoadResult(filename, result.errors + [("", error)]),
+            pickle.HIGHEST_PROTOCOL,
+        )
+
+
+def _get_compact(config):
+    """
+    Returns the values of ``config`` as a nested dict, along with the metadata of its nodes by path. Unlike
+    :func:`Config.serialize_to_dict`, leaf values are not copied, as the config object is discarded afterwards
+    """
+    state = {}
+    metadata = {}
+    stack = [("", config, state)]
+    while stack:
+        prefix, node, target = stack.pop()
+        for key, value in iteritems(node._value):
+            if isinstance(value, Config):
+                if value.metadata:
+                    metadata[prefix + key] = value.metadata
+                if value.is_leaf():
+                    value = value._value
+                else:
+                    child = target[key] = {}
+                    stack.append((prefix + key + ".", value, child))
+                    continue
+            elif isinstance(value, dict):
+                child = target[key] = {}
+                stack.append((prefix + key + ".", node._get_child_config(key), child))
+                continue
+            target[key] = value
+    return state, metadata
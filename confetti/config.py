@@ -1,4 +1,7 @@
 import copy
+import itertools
+import os
+import weakref
 
 from contextlib import contextmanager
 
@@ -6,12 +9,25 @@ from sentinels import NOTHING
 
 from . import exceptions
 from .python3_compat import iteritems, string_types, itervalues
-from .ref import Ref
+from .interning import intern_dict, intern_key, intern_value
+from .lazy import Lazy
+from .query import MetadataIndex, QueryIndex, compile_pattern
+from .ref import Computed, Ref, materialize
 from .utils import coerce_leaf_value
 
+_versions = itertools.count(1)
+
 
 class Config(object):
     _backups = None
+    _query_index = None
+    _metadata_index = None
+    _structure_generation = 0
+    _validator = None
+    _accessor = None
+    _change_callbacks = None
+    _remove_callbacks = None
+    _fingerprint = None
 
     def __init__(self, value=NOTHING, parent=None, metadata=None):
         super(Config, self).__init__()
@@ -22,15 +38,48 @@ class Config(object):
         self.metadata = metadata
         self.root = ConfigProxy(self)
         self._dirty = False
+        self.version = next(_versions)
         self._update_callbacks = []
 
-    def on_update(self, func):
+    def on_update(self, func, weak=False):
+        """
+        Registers ``func`` to be called as ``func(config)`` whenever this config object or anything under it is
+        updated. When ``weak`` is True, only a weak reference to ``func`` (or to the object of a bound method) is
+        kept, and the callback is dropped once it is garbage collected
+        """
+        if weak:
+            func = _WeakCallback(func, self, "_update_callbacks")
         self._update_callbacks.append(func)
 
+    def on_change(self, func, weak=False):
+        """
+        Registers ``func`` to be called as ``func(path, value)`` after each assignment of a leaf, or of a new subtree
+        added by :func:`Config.extend` or :func:`Config.update`, under this config object, ``path`` being relative to it.
+        ``weak`` is as in :func:`Config.on_update`
+        """
+        if self._change_callbacks is None:
+            self._change_callbacks = []
+        if weak:
+            func = _WeakCallback(func, self, "_change_callbacks")
+        self._change_callbacks.append(func)
+
+    def on_remove(self, func, weak=False):
+        """
+        Registers ``func`` to be called as ``func(path)`` after a leaf or a subtree under this config object is
+        removed (e.g. by :func:`Config.pop` or :func:`Config.restore`), ``path`` being relative to it. ``weak`` is as
+        in :func:`Config.on_update`
+        """
+        if self._remove_callbacks is None:
+            self._remove_callbacks = []
+        if weak:
+            func = _WeakCallback(func, self, "_remove_callbacks")
+        self._remove_callbacks.append(func)
+
     def is_dirty(self):
         return self._dirty
 
     def notify_update(self):
+        self.version = next(_versions)
         if not self._dirty:
             self._dirty = True
 
@@ -40,6 +89,20 @@ class Config(object):
         for hook in self._update_callbacks:
             hook(self)
 
+    def _notify_structure_change(self, keys=None):
+        _notify_structure_changes([(self, keys)])
+
+    def get_tree_version(self):
+        """
+        Returns the version of the root of the tree containing this config object. Like the ``version`` attribute of
+        every config object, it increases whenever anything under it changes, so a value cached along with it can be
+        validated with a single comparison
+        """
+        config = self
+        while config._parent is not None:
+            config = config._parent
+        return config.version
+
     def mark_clean(self):
         stack = [self]
         while stack:
@@ -57,7 +120,7 @@ class Config(object):
         if value is NOTHING:
             value = {}
         elif isinstance(value, dict):
-            value = value.copy()
+            value = intern_dict(value)
         elif isinstance(value, Config):
             value.set_parent(self)
         return value
@@ -67,6 +130,8 @@ class Config(object):
         for k, v in iteritems(self._value):
             if isinstance(v, dict):
                 to_replace.append((k, Config(v, parent=self)))
+            elif isinstance(v, Config) and v._parent is None:
+                v._parent = self
         for k, v in to_replace:
             self._value[k] = v
 
@@ -91,8 +156,16 @@ class Config(object):
             raise exceptions.CannotSetValue(
                 "Cannot set value of a non-leaf config object"
             )
-        self._value = value
+        if self._validator is not None:
+            self._validator.check(value)
+        self._assign_value(value)
         self.notify_update()
+        _notify_changes([(self, (), value)])
+
+    def _assign_value(self, value):
+        self._value = value = intern_value(value)
+        if isinstance(value, dict):
+            self._notify_structure_change()
 
     def is_leaf(self):
         """
@@ -121,10 +194,14 @@ class Config(object):
         Raises KeyError if no such child exists
         """
         returned = self._value[item]
+        if isinstance(returned, Lazy):
+            returned = self._get_child_config(item)
         if isinstance(returned, Config) and returned.is_leaf():
             returned = returned._value
         if isinstance(returned, Ref):
             returned = returned.resolve(self)
+        elif isinstance(returned, Computed):
+            returned = returned.resolve(self)
         assert not isinstance(returned, dict)
         return returned
 
@@ -154,15 +231,94 @@ class Config(object):
             if child is NOTHING:
                 raise exceptions.InvalidPath("Invalid path: {0!r}".format(path))
             if not isinstance(child, Config):
-                child = returned._value[p] = Config(child, parent=returned)
+                child = returned._get_child_config(p)
             returned = child
         return returned
 
+    def _get_child_config(self, key):
+        child = self._value[key]
+        if not isinstance(child, Config):
+            if isinstance(child, Lazy):
+                return self._load_lazy_child(key, child)
+            child = self._value[key] = Config(child, parent=self)
+        return child
+
+    def _load_lazy_child(self, key, lazy):
+        child = lazy.load()
+        if isinstance(child, Config):
+            child.set_parent(self)
+        else:
+            child = Config(child, parent=self)
+        self._value[key] = child
+        self._notify_structure_change([key])
+        return child
+
+    def query(self, pattern):
+        """
+        Returns a list of (path, config_object) tuples for each config object matching the dotted ``pattern``, in
+        which ``*`` matches a single path component and ``**`` matches any number of components
+
+        >>> config = Config({"a" : {"timeout" : 1, "b" : {"timeout" : 2}}})
+        >>> sorted(path for path, _ in config.query("**.timeout"))
+        ['a.b.timeout', 'a.timeout']
+        """
+        pattern = compile_pattern(pattern)
+        if self._query_index is not None:
+            return list(self._query_index.query(self, pattern))
+        return list(pattern.walk(self))
+
+    def build_query_index(self):
+        """
+        Indexes all paths under this config object, speeding up subsequent calls to :func:`Config.query`. The index
+        is discarded whenever the structure of the tree changes
+        """
+        self._query_index = QueryIndex(self)
+
+    def find_by_metadata(self, key, value=NOTHING):
+        """
+        Returns a list of (path, config_object) tuples for each config object under this one whose metadata
+        contains ``key``, optionally requiring it to equal ``value``
+
+        >>> from confetti import Metadata
+        >>> config = Config({"a" : 1 // Metadata(sensitive=True), "b" : 2})
+        >>> [path for path, _ in config.find_by_metadata("sensitive", True)]
+        ['a']
+
+        The lookup is served from an index built on first use and kept current by ``//``, assignments and
+        structural changes. Changing a ``metadata`` dict in place is not tracked.
+        """
+        if self._metadata_index is None:
+            self._metadata_index = MetadataIndex(self)
+        return [
+            (path, self.get_config(path))
+            for path in sorted(self._metadata_index.find(key, value))
+        ]
+
+    def assign_query(self, pattern, value):
+        """
+        Assigns ``value`` to all leaves matching ``pattern``, notifying about the update only once
+        """
+        matched = self.query(pattern)
+        for path, config in matched:
+            if not config.is_leaf():
+                raise exceptions.CannotSetValue(
+                    "Cannot set value of non-leaf path {0!r}".format(path)
+                )
+        _validate_assignments((config, value) for _, config in matched)
+        for _, config in matched:
+            config._assign_value(value)
+        _notify_updates([config for _, config in matched])
+        _notify_changes([(config, (), value) for _, config in matched])
+
     def pop(self, child_name):
         """
         Removes a child by its name
         """
-        return self._value.pop(child_name)
+        returned = self._value.pop(child_name)
+        _detach(self, returned)
+        self._notify_structure_change([child_name])
+        _notify_removals([(self, (child_name,))])
+        return returned
 
     def __setitem__(self, item, value):
         """
@@ -174,6 +330,8 @@ class Config(object):
         old_value = self._value[item]
         if isinstance(old_value, Config):
             old_metadata = old_value.metadata
+            if old_value._validator is not None:
+                old_value._validator.check(value)
         else:
             old_metadata = NOTHING
         self._value[item] = value
@@ -181,75 +339,63 @@ class Config(object):
             if not isinstance(value, Config):
                 self._value[item] = Config(value, parent=self)
             self._value[item].metadata = old_metadata
+            self._value[item]._validator = old_value._validator
+        if self._value[item] is not old_value:
+            _detach(self, old_value)
+            if isinstance(value, Config) and value._parent is None:
+                value.set_parent(self)
+        if (
+            _is_node(old_value)
+            or _is_node(value)
+            or (isinstance(value, Config) and not isinstance(old_value, Config))
+        ):
+            self._notify_structure_change([item])
         self.notify_update()
+        _notify_changes([(self, (item,), value)])
 
-    def extend(self, conf=None, **kw):
+    def extend(self, conf=None, dry_run=False, **kw):
         """
         Extends a configuration files by adding values from a specified config or dict.
-        This permits adding new (previously nonexisting) structures or nodes to the configuration.
+        This permits adding new (previously nonexisting) structures or nodes to the configuration. Config objects
+        belonging to another tree (e.g. the children of ``conf``) are copied rather than shared.
+
+        The whole extension is validated before any value is changed, including against the validators of leaves
+        enforced by :func:`Config.compile_schema`. When ``dry_run`` is True, nothing is changed and the list of
+        conflicts (:class:`.exceptions.CannotSetValue` objects, followed by a :class:`.exceptions.ValidationError` for
+        any invalid values) is returned instead.
         """
         if conf is None:
             conf = {}
+        if dry_run:
+            conf, kw = _copy_incoming(conf), _copy_incoming(kw)
 
+        # extending adds to the structure rather than changing values, so it does not mark the tree as dirty
+        merge = _Merge(mark_dirty=False)
         if isinstance(conf, Config):
-            self._extend_from_conf(conf)
+            merge.extend_from_conf(self, conf)
         else:
-            self._extend_from_dict(conf)
-        self._extend_from_dict(kw)
-
-    def _extend_from_conf(self, conf):
-        conf = dict((key, conf.get_config(key)) for key in conf.keys())
-        for key, value in iteritems(conf):
-            if key in self._value:
-                self.get_config(key)._verify_config_paths(value)
-        for key, value in iteritems(conf):
-            self._value[key] = value
+            merge.extend_from_dict(self, conf, ())
+        merge.extend_from_dict(self, kw, ())
+        return merge.finish(dry_run)
 
     def _verify_config_paths(self, conf):
-        if self.is_leaf():
-            if (isinstance(conf, Config) and not conf.is_leaf()) or isinstance(
-                conf, dict
-            ):
-                raise exceptions.CannotSetValue(
-                    "Setting {0} will cause a value to disappear from {1}".format(
-                        conf, self
-                    )
-                )
-        else:
-            if conf.is_leaf():
-                raise exceptions.CannotSetValue(
-                    "Setting {0} will cause paths to disappear from {1}".format(
-                        conf, self
-                    )
-                )
-            else:
-                for k in self._value.keys():
-                    if k not in conf._value:
-                        raise exceptions.CannotSetValue(
-                            "Setting {0} will cause paths to disappear from {1}".format(
-                                conf, self
-                            )
-                        )
-                    self.get_config(k)._verify_config_paths(conf._value[k])
-
-    def _extend_from_dict(self, d):
-        for key, value in iteritems(d):
-            if isinstance(value, dict):
-                if key not in self._value:
-                    self._value[key] = {}
-                self.get_config(key).extend(value)
-            else:
-                self._value[key] = value
+        merge = _Merge()
+        merge.verify_config_paths(self, conf, ())
+        if merge.conflicts:
+            raise merge.conflicts[0]
 
-    def update(self, conf):
-        conf = dict((key, conf.get_config(key)) for key in conf.keys())
-        for key, value in iteritems(conf):
-            if not value.is_leaf():
-                if key not in self._value:
-                    self._value[key] = {}
-                self.get_config(key).update(value)
-            else:
-                self._value[key] = value
+    def update(self, conf, dry_run=False):
+        """
+        Updates the configuration with the leaves of another config object or dict, adding missing nodes along
+        the way. Unlike :func:`Config.extend`, existing paths not mentioned in ``conf`` are preserved.
+
+        As in :func:`Config.extend`, ``dry_run`` returns the list of conflicts without changing anything
+        """
+        if dry_run:
+            conf = _copy_incoming(conf)
+        merge = _Merge()
+        merge.update(self, conf, ())
+        return merge.finish(dry_run)
 
     def keys(self):
         """
@@ -329,6 +475,153 @@ class Config(object):
         """
         return _get_state(self)
 
+    def dump(self, fp, format="json", redact=None, indent=None):
+        """
+        Writes this config object to the file object ``fp`` as JSON (``format="json"``) or YAML (``format="yaml"``),
+        streaming the tree in chunks rather than building a serialized copy of it first. Cross references are
+        resolved, and leaves (or nodes) whose metadata holds a true value for the key ``redact`` are written as
+        ``"<redacted>"``:
+
+        >>> import sys
+        >>> from confetti import Metadata
+        >>> config = Config({"db" : {"user" : "admin", "password" : "x" // Metadata(secret=True)}})
+        >>> config.dump(sys.stdout, format="yaml", redact="secret")
+        db:
+          user: "admin"
+          password: "<redacted>"
+        """
+        from .dump import dump
+
+        dump(self, fp, format=format, redact=redact, indent=indent)
+
+    def get_memory_usage(self, max_depth=None):
+        """
+        Returns a list of ``(path, size)`` tuples, giving the approximate size in bytes of every node under this config
+        object (up to ``max_depth`` levels down) along with its subtree, largest first. The root is reported as ``""``.
+        Objects shared between nodes, such as interned keys and values, are only counted once, for the first node
+        reached:
+
+        >>> config = Config({"a" : {"b" : "x" * 1000}, "c" : 1})
+        >>> [path for path, size in config.get_memory_usage()]
+        ['', 'a']
+
+        .. seealso:: :func:`.interning.set_value_interning`
+        """
+        from .memory import get_memory_usage
+
+        return get_memory_usage(self, max_depth=max_depth)
+
+    def compile_schema(self, enforce=False):
+        """
+        Captures the type of every leaf, along with constraints given through its metadata (``type``, ``choices``,
+        ``min_value``, ``max_value`` and ``validator``), into a :class:`.schema.Schema` which can validate whole
+        overlays in a single pass:
+
+        >>> config = Config({"a" : {"b" : 2}})
+        >>> schema = config.compile_schema()
+        >>> schema.get_errors({"a" : {"b" : "x", "c" : 1}})
+        [('a.b', "Expected int, got 'x'"), ('a.c', 'Unknown path')]
+
+        When ``enforce`` is True, every leaf also keeps its validator, so that assignments through
+        :func:`Config.set_value`, ``__setitem__`` and the bulk assignments (:func:`Config.update`,
+        :func:`Config.extend`, :func:`Config.assign_query` and :func:`Config.load_environ`) raise
+        :class:`.exceptions.ValidationError` for invalid values.
+        """
+        from .schema import compile_schema
+
+        return compile_schema(self, enforce=enforce)
+
+    def compile_root(self):
+        """
+        Returns a replacement for the ``root`` proxy, whose class is generated from the current structure of the
+        tree with a slot per node and a property per leaf, making attribute access close to native speed:
+
+        >>> config = Config({"a" : {"b" : 2}})
+        >>> root = config.compile_root()
+        >>> root.a.b
+        2
+
+        The returned object is cached until the structure of the tree changes, and generated classes are reused for
+        identical structures, making it cheap to call this method again after adding or removing paths.
+        """
+        accessor = self._accessor
+        if accessor is None or accessor[0] != self._structure_generation:
+            from .accessors import compile_accessor
+
+            accessor = self._accessor = (
+                self._structure_generation,
+                compile_accessor(self),
+            )
+        return accessor[1]
+
+    def fingerprint(self):
+        """
+        Returns a hex digest of the contents (values, not metadata) of this config object, which is equal for config
+        objects with equal contents:
+
+        >>> Config({"a" : {"b" : 2}}).fingerprint() == Config({"a" : {"b" : 2}}).fingerprint()
+        True
+
+        Digests of subtrees are cached along with their versions, so after a change only the nodes between the changed
+        leaf and this config object are hashed again
+        """
+        import binascii
+
+        from .fingerprint import get_digest
+
+        return binascii.hexlify(get_digest(self)).decode("ascii")
+
+    def diff(self, other):
+        """
+        Returns a list of ``(kind, path, value)`` tuples describing how ``other`` differs from this config object, where
+        ``kind`` is ``"add"``, ``"remove"`` or ``"change"`` and ``value`` is the new value (None for removals):
+
+        >>> config = Config({"a" : {"b" : 2, "c" : 3}})
+        >>> other = Config({"a" : {"b" : 4}, "d" : 5})
+        >>> config.diff(other)
+        [('change', 'a.b', 4), ('remove', 'a.c', None), ('add', 'd', 5)]
+
+        Subtrees which are the same object or have the same version, e.g. unchanged subtrees of configs derived from
+        the same base, are skipped without being compared. Metadata is not compared.
+        """
+        from .diff import diff
+
+        return diff(self, other)
+
+    def apply_patch(self, patch):
+        """
+        Applies a list of changes, as returned by :func:`Config.diff`, to this config object. All changes are validated
+        before any of them is applied, raising :class:`.exceptions.ValidationError` listing all problems found, and update
+        hooks are fired once for the whole patch:
+
+        >>> config = Config({"a" : {"b" : 2, "c" : 3}})
+        >>> config.apply_patch(config.diff(Config({"a" : {"b" : 4}, "d" : 5})))
+        >>> config.serialize_to_dict() == {"a" : {"b" : 4}, "d" : 5}
+        True
+        """
+        from .diff import apply_patch
+
+        apply_patch(self, patch)
+
+    def derive(self, overrides=None):
+        """
+        Returns a new config object deriving from this one. The derived config shares all unmodified values and
+        subtrees with this one, and only stores the values assigned to it, either through ``overrides`` (a dict of
+        dotted paths or a nested dict of existing leaves) or later on.
+
+        >>> base = Config({"a" : {"b" : 1, "c" : 2}})
+        >>> derived = base.derive({"a.b" : 3})
+        >>> base.assign_path("a.c", 4)
+        >>> derived.get_value()
+        {'a': {'b': 3, 'c': 4}}
+
+        Callbacks can be registered on inherited nodes of the derived config, but not on inherited leaves, which are
+        not stored in it until they are assigned (:class:`.exceptions.CannotRegisterCallback` is raised)
+        """
+        from .derived import derive
+
+        return derive(self, overrides)
+
     def get_parent(self):
         """
         Returns the parent config object
@@ -360,6 +653,80 @@ class Config(object):
         path, value = expr.split("=", 1)
         self.assign_path(path, value, deduce_type, default_type)
 
+    def load_environ(
+        self,
+        prefix="APP",
+        separator="__",
+        deduce_type=True,
+        default_type=None,
+        environ=None,
+    ):
+        """
+        Assigns leaves from environment variables named after their paths, e.g. ``APP__SECTION__KEY`` for the path
+        ``section.key`` (names are matched case-insensitively). All values are converted and validated before any of
+        them is assigned, and update hooks are fired once for the whole batch. Nodes which are still :class:`.Lazy` are
+        not loaded, so their leaves cannot be assigned this way. Raises :class:`.exceptions.InvalidPath` for variables
+        matching more than one leaf, e.g. paths differing only in case.
+
+        Returns the names of variables carrying the prefix which do not match any leaf.
+
+        >>> config = Config({"a" : {"b" : 2}})
+        >>> config.load_environ(environ={"APP__A__B" : "3", "APP__A__C" : "4"})
+        ['APP__A__C']
+        >>> config.root.a.b
+        3
+        """
+        if environ is None:
+            environ = os.environ
+        prefix = prefix.upper() + separator
+        leaves_by_name = {}
+        ambiguous = {}
+        stack = [(self, ())]
+        while stack:
+            node, components = stack.pop()
+            for key, value in iteritems(node._value):
+                if isinstance(value, Lazy):
+                    # not loaded just to look for environment variables
+                    continue
+                if _is_node(value):
+                    stack.append((node._get_child_config(key), components + (key,)))
+                    continue
+                name = prefix + separator.join(components + (key,)).upper()
+                path = ".".join(components + (key,))
+                if name in leaves_by_name:
+                    ambiguous.setdefault(name, [leaves_by_name[name][2]]).append(path)
+                leaves_by_name[name] = (node, key, path)
+
+        assignments = []
+        unknown = []
+        for name, value in iteritems(environ):
+            normalized_name = name.upper()
+            if not normalized_name.startswith(prefix):
+                continue
+            if normalized_name in ambiguous:
+                raise exceptions.InvalidPath(
+                    "{0!r} is ambiguous, matching paths {1}".format(
+                        name, ", ".join(sorted(ambiguous[normalized_name]))
+                    )
+                )
+            leaf = leaves_by_name.get(normalized_name)
+            if leaf is None:
+                unknown.append(name)
+                continue
+            node, key, path = leaf
+            config = node._get_child_config(key)
+            if deduce_type:
+                # Ref and Computed leaves are coerced by the value they resolve to
+                value = coerce_leaf_value(path, value, node[key], default_type)
+            assignments.append((config, value))
+
+        _validate_assignments(assignments)
+        for config, value in assignments:
+            config._assign_value(value)
+        _notify_updates(config for config, _ in assignments)
+        _notify_changes((config, (), value) for config, value in assignments)
+        return sorted(unknown)
+
     def get_path(self, path):
         """
         Gets a value by its dotted path
@@ -370,6 +737,62 @@ class Config(object):
         """
         return self.get_config(path).get_value()
 
+    def get_paths(self, paths, as_dict=False):
+        """
+        Gets the values of several dotted paths at once, walking each prefix they share only once. Leaves are returned
+        as through ``__getitem__``, with cross references resolved. Returns a tuple of the values in order, or a dict
+        mapping the paths to their values if ``as_dict`` is True:
+
+        >>> config = Config({"db" : {"host" : "localhost", "port" : 5432}})
+        >>> config.get_paths(["db.host", "db.port"])
+        ('localhost', 5432)
+
+        ``paths`` can also be a :class:`.paths.PathSet`, as returned by :func:`.paths.compile_paths`, to reuse it
+        across calls.
+        """
+        from .paths import compile_paths
+
+        path_set = compile_paths(paths)
+        if as_dict:
+            return path_set.get_dict(self)
+        return path_set.get(self)
+
+    def materialize_refs(self, in_place=False):
+        """
+        Resolves all :class:`.Ref` objects under this config object in dependency order, and returns a dict of the
+        configuration with all references, and :class:`.Computed` leaves, replaced by their values. References to
+        other references or to computed leaves are followed.
+
+        When ``in_place`` is True, the references in the tree are also replaced by their values. Computed leaves are
+        kept, as they are not references.
+
+        Raises :class:`.exceptions.CyclicReferenceError` if references form a cycle, and
+        :class:`.exceptions.CannotResolveError` if a reference points to a nonexistent path.
+        """
+        return materialize(self, in_place=in_place)
+
+    def __reduce__(self):
+        """
+        Pickles the values, metadata and structure of the tree in a flat form. Hooks, backups and enforced schemas are
+        not pickled
+        """
+        return (_restore_config, (self._get_copy_class(),) + _flatten(self))
+
+    def __copy__(self):
+        """
+        Returns a new tree with the structure and metadata of this config object, sharing its leaf values
+        """
+        return _restore_config(self._get_copy_class(), *_flatten(self))
+
+    def __deepcopy__(self, memo):
+        returned = memo[id(self)] = _restore_config(
+            self._get_copy_class(), *copy.deepcopy(_flatten(self), memo)
+        )
+        return returned
+
+    def _get_copy_class(self):
+        return type(self)
+
     def __repr__(self):
         return "<Config {0}>".format(self.get_value())
 
@@ -409,11 +832,421 @@ class ConfigProxy(object):
         except AttributeError:
             raise KeyError(item)
 
+    def __reduce__(self):
+        return (ConfigProxy, (self._conf,))
+
+
+def _is_node(value):
+    return isinstance(value, (dict, Lazy)) or (
+        isinstance(value, Config) and not value.is_leaf()
+    )
+
+
+def _get_children(value):
+    if isinstance(value, Config):
+        return value._value
+    return value
+
+
+class _Merge(object):
+    """
+    Plans a merge of values into a config tree in a single traversal, collecting conflicts along the way. Nothing
+    is changed until :func:`_Merge.finish` applies the plan
+    """
+
+    def __init__(self, mark_dirty=True):
+        super(_Merge, self).__init__()
+        self.mark_dirty = mark_dirty
+        self.conflicts = []
+        self.conflict_paths = []
+        self.errors = []
+        self._assignments = {}
+        self._new_nodes = set()
+
+    def _get_planned(self, node):
+        returned = self._assignments.get(id(node))
+        if returned is None:
+            returned = self._assignments[id(node)] = (node, {})
+        return returned[1]
+
+    def _get_child(self, node, planned, key):
+        returned = planned.get(key, NOTHING)
+        if returned is NOTHING:
+            returned = node._value.get(key, NOTHING)
+            if isinstance(returned, Lazy):
+                returned = node._get_child_config(key)
+        return returned
+
+    def _get_child_node(self, node, planned, key):
+        returned = planned.get(key, NOTHING)
+        if not isinstance(returned, Config):
+            returned = node._get_child_config(key)
+        return returned
+
+    def _conflict(self, path, message):
+        self.conflict_paths.append((".".join(path), message))
+        self.conflicts.append(
+            exceptions.CannotSetValue(
+                "Setting {0!r} will cause {1}".format(".".join(path), message)
+            )
+        )
+
+    def extend_from_dict(self, node, d, path):
+        planned = self._get_planned(node)
+        for key, value in iteritems(d):
+            key = intern_key(key)
+            if not isinstance(value, dict):
+                planned[key] = value = intern_value(value)
+                self._check_leaf(node, key, value)
+                continue
+            existing = self._get_child(node, planned, key)
+            if existing is NOTHING:
+                planned[key] = Config(value, parent=node)
+            elif _is_node(existing):
+                self.extend_from_dict(
+                    self._get_child_node(node, planned, key), value, path + (key,)
+                )
+            else:
+                self._conflict(path + (key,), "a value to disappear")
+
+    def extend_from_conf(self, node, conf):
+        planned = self._get_planned(node)
+        for key in list(conf.keys()):
+            value = conf._get_child_config(key)
+            existing = self._get_child(node, planned, key)
+            if existing is not NOTHING:
+                self.verify_config_paths(existing, value, (key,))
+            planned[key] = value
+            self._check_leaf(node, key, value)
+
+    def verify_config_paths(self, existing, conf, path):
+        if not _is_node(existing):
+            if _is_node(conf):
+                self._conflict(path, "a value to disappear")
+            return
+        if not _is_node(conf):
+            self._conflict(path, "paths to disappear")
+            return
+        incoming = _get_children(conf)
+        for key, value in iteritems(_get_children(existing)):
+            child = incoming.get(key, NOTHING)
+            if child is NOTHING:
+                self._conflict(path + (key,), "paths to disappear")
+            else:
+                self.verify_config_paths(value, child, path + (key,))
+
+    def update(self, node, conf, path):
+        planned = self._get_planned(node)
+        for key in list(conf.keys()):
+            if isinstance(conf, Config):
+                value = conf._get_child_config(key)
+            else:
+                value = conf[key]
+            key = intern_key(key)
+            if not _is_node(value):
+                planned[key] = value = intern_value(value)
+                self._check_leaf(node, key, value)
+                continue
+            existing = self._get_child(node, planned, key)
+            if existing is NOTHING:
+                child = planned[key] = Config(parent=node)
+                self._new_nodes.add(id(child))
+            elif _is_node(existing):
+                child = self._get_child_node(node, planned, key)
+            else:
+                self._conflict(path + (key,), "a value to disappear")
+                continue
+            self.update(child, value, path + (key,))
+
+    def _check_leaf(self, node, key, value):
+        existing = node._value.get(key)
+        if not isinstance(existing, Config) or existing._validator is None:
+            return
+        if isinstance(value, Config):
+            if not value.is_leaf():
+                return
+            value = value._value
+        message = existing._validator.get_error(value)
+        if message is not None:
+            self.errors.append((existing._validator.path, message))
+
+    def get_problems(self):
+        returned = list(self.conflicts)
+        if self.errors:
+            returned.append(exceptions.ValidationError(sorted(self.errors)))
+        return returned
+
+    def finish(self, dry_run=False):
+        if dry_run:
+            return self.get_problems()
+        if self.conflicts:
+            raise self.conflicts[0]
+        if self.errors:
+            raise exceptions.ValidationError(sorted(self.errors))
+        for node, planned in itervalues(self._assignments):
+            replaced = {}
+            for key, value in list(iteritems(planned)):
+                value = planned[key] = _adopt(node, value)
+                existing = node._value.get(key)
+                if existing is value:
+                    continue
+                _detach(node, existing)
+                if isinstance(existing, Config) and existing.is_leaf():
+                    leaf = _carry_leaf_settings(node, existing, value)
+                    if leaf is not value:
+                        replaced[key] = leaf
+            node._value.update(planned)
+            node._value.update(replaced)
+        _notify_structure_changes(
+            (node, list(planned))
+            for node, planned in itervalues(self._assignments)
+            if planned
+        )
+        _notify_updates(
+            (node for node, planned in itervalues(self._assignments) if planned),
+            mark_dirty=self.mark_dirty,
+        )
+        _notify_changes(
+            (node, (key,), value)
+            for node, planned in itervalues(self._assignments)
+            if id(node) not in self._new_nodes
+            for key, value in iteritems(planned)
+        )
+        return None
+
+
+class _WeakCallback(object):
+    """
+    Calls a function, or a bound method, without keeping it alive. Removes itself from the callbacks of the config
+    object it was registered on once the function (or the object of the method) is garbage collected. Methods of
+    objects which cannot be referenced weakly, such as lists, are kept alive instead
+    """
+
+    def __init__(self, func, config, attribute):
+        super(_WeakCallback, self).__init__()
+        remove = _get_callback_remover(self, weakref.ref(config), attribute)
+        obj = getattr(func, "__self__", None)
+        self._func = self._name = None
+        if obj is None:
+            self._ref = weakref.ref(func, remove)
+            return
+        if hasattr(func, "__func__"):
+            self._func = func.__func__
+        else:
+            # methods of builtin types have no underlying function, and are looked up by name on each call
+            self._name = func.__name__
+        try:
+            self._ref = weakref.ref(obj, remove)
+        except TypeError:
+            self._ref = lambda: obj
+
+    def __call__(self, *args):
+        obj = self._ref()
+        if obj is None:
+            return None
+        if self._func is not None:
+            return self._func(obj, *args)
+        if self._name is not None:
+            return getattr(obj, self._name)(*args)
+        return obj(*args)
+
+
+def _get_callback_remover(callback, config_ref, attribute):
+    callback_ref = weakref.ref(callback)
+
+    def remove(_):
+        config = config_ref()
+        if config is None:
+            return
+        # replaced rather than changed in place, as the callbacks may be being iterated
+        setattr(
+            config,
+            attribute,
+            [
+                func
+                for func in getattr(config, attribute) or ()
+                if func is not callback_ref()
+            ],
+        )
+
+    return remove
+
+
+def _copy_incoming(conf):
+    """
+    Copies the values of a dry run merge, as planning adopts the config objects within them into the planned tree
+    """
+    if isinstance(conf, Config):
+        return copy.deepcopy(conf)
+    return dict((key, copy.deepcopy(value)) for key, value in iteritems(conf))
+
+
+def _adopt(parent, value):
+    """
+    Returns ``value`` ready to be stored under ``parent``. Parentless config objects are adopted as they are, while those
+    belonging to another tree are copied, so that the two trees do not share (and notify through) the same objects
+    """
+    if not isinstance(value, Config) or value._parent is parent:
+        return value
+    if value._parent is not None:
+        value = copy.copy(value)
+    value._parent = parent
+    return value
+
+
+def _carry_leaf_settings(parent, leaf, value):
+    """
+    Returns the value to store in place of ``leaf``, keeping its metadata and validator when it is replaced with
+    another leaf
+    """
+    if leaf.metadata is None and leaf._validator is None:
+        return value
+    if not isinstance(value, Config):
+        if _is_node(value):
+            return value
+        value = Config(value, parent=parent)
+    elif not value.is_leaf():
+        return value
+    if value.metadata is None:
+        value.metadata = leaf.metadata
+    if value._validator is None:
+        value._validator = leaf._validator
+    return value
+
+
+def _validate_assignments(assignments):
+    """
+    Raises :class:`.exceptions.ValidationError` listing every (config, value) assignment rejected by the validator
+    of its leaf
+    """
+    errors = []
+    for config, value in assignments:
+        if config._validator is not None:
+            message = config._validator.get_error(value)
+            if message is not None:
+                errors.append((config._validator.path, message))
+    if errors:
+        raise exceptions.ValidationError(sorted(errors))
+
+
+def _detach(parent, child):
+    """
+    Detaches a child removed from ``parent``, so that it no longer notifies its former parent of updates
+    """
+    if isinstance(child, Config) and child._parent is parent:
+        child._parent = None
+        if not child.is_leaf():
+            _invalidate_anchors(child)
+
+
+def _invalidate_anchors(config):
+    """
+    Discards the anchors cached by the references under a node detached from its parent, as those pointing above it
+    no longer resolve. Attaching a parentless node needs no such care, since references could not be resolved past
+    its top before
+    """
+    stack = [config._value]
+    while stack:
+        for value in itervalues(stack.pop()):
+            if isinstance(value, Config):
+                value = value._value
+            if isinstance(value, dict):
+                stack.append(value)
+            elif isinstance(value, Ref):
+                value.invalidate_anchor()
+
+
+def _notify_structure_changes(changes):
+    for config, keys in changes:
+        chain = []
+        while config is not None:
+            config._query_index = None
+            config._structure_generation += 1
+            config.version = next(_versions)
+            chain.append(config)
+            config = config._parent
+        indexed = [i for i, c in enumerate(chain) if c._metadata_index is not None]
+        if not indexed:
+            continue
+        components = ()
+        for index in range(indexed[-1] + 1):
+            if index:
+                key = _get_child_key(chain[index], chain[index - 1])
+                if key is NOTHING:
+                    break
+                components = (key,) + components
+            if chain[index]._metadata_index is not None:
+                chain[index]._metadata_index.refresh(components, chain[0], keys)
+
+
+def _get_child_key(parent, child):
+    for key, value in iteritems(parent._value):
+        if value is child:
+            return key
+    return NOTHING
+
+
+def _notify_changes(changes):
+    _notify_path_callbacks(
+        "_change_callbacks",
+        ((config, components, (value,)) for config, components, value in changes),
+    )
+
+
+def _notify_removals(removals):
+    _notify_path_callbacks(
+        "_remove_callbacks",
+        ((config, components, ()) for config, components in removals),
+    )
+
+
+def _notify_path_callbacks(attribute, events):
+    """
+    Calls the callbacks stored in ``attribute`` of the config objects above each ``(config, components, args)`` event
+    as ``callback(path, *args)``, with the path relative to the config object they were registered on
+    """
+    for config, components, args in events:
+        chain = []
+        while config is not None:
+            chain.append(config)
+            config = config._parent
+        watched = [i for i, c in enumerate(chain) if getattr(c, attribute)]
+        if not watched:
+            continue
+        for index in range(watched[-1] + 1):
+            if index:
+                key = _get_child_key(chain[index], chain[index - 1])
+                if key is NOTHING:
+                    break
+                components = (key,) + components
+            for callback in getattr(chain[index], attribute) or ():
+                callback(".".join(components), *args)
+
+
+def _notify_updates(configs, mark_dirty=True):
+    updated = []
+    seen = set()
+    for config in configs:
+        while config is not None and id(config) not in seen:
+            seen.add(id(config))
+            updated.append(config)
+            config = config._parent
+    for config in updated:
+        if mark_dirty:
+            config._dirty = True
+        config.version = next(_versions)
+    for config in updated:
+        for hook in config._update_callbacks:
+            hook(config)
+
 
 def _get_state(config):
     if isinstance(config, Config):
         if config.is_leaf():
             return copy.deepcopy(config._value)
+        for key, value in list(iteritems(config._value)):
+            if isinstance(value, Lazy):
+                config._get_child_config(key)
         return _get_state(config._value)
     if isinstance(config, dict):
         returned = {}
@@ -432,3 +1265,58 @@ def _set_state(config, state):
             _set_state(config[key], value)
         else:
             config[key] = value
+
+
+def _flatten(config):
+    """
+    Returns the contents of ``config`` as a flat list of ``(parent_index, key, children, metadata)`` entries, one per
+    node, the root being the first. ``children`` maps the keys of the node to its leaf values, child nodes being left
+    as None placeholders to keep the order of keys. The metadata of leaves is returned separately, by (node index, key)
+    """
+    if config.is_leaf():
+        return [(-1, None, config._value, _copy_metadata(config.metadata))], {}
+    entries = []
+    leaf_metadata = {}
+    stack = [(-1, None, config)]
+    while stack:
+        parent_index, key, node = stack.pop()
+        index = len(entries)
+        children = {}
+        entries.append((parent_index, key, children, _copy_metadata(node.metadata)))
+        for key, value in iteritems(node._value):
+            if isinstance(value, Config):
+                if value.is_leaf():
+                    if value.metadata:
+                        leaf_metadata[index, key] = dict(value.metadata)
+                    value = value._value
+            elif isinstance(value, dict):
+                value = node._get_child_config(key)
+            if isinstance(value, Config):
+                stack.append((index, key, value))
+                value = None
+            children[key] = value
+    return entries, leaf_metadata
+
+
+def _copy_metadata(metadata):
+    # copies do not share metadata dicts, which are changed in place by ``//``
+    return dict(metadata) if metadata else None
+
+
+def _restore_config(cls, entries, leaf_metadata):
+    parent_index, key, children, metadata = entries[0]
+    if not isinstance(children, dict):
+        return cls(children, metadata=metadata)
+    nodes = []
+    for parent_index, key, children, metadata in entries:
+        if parent_index == -1:
+            node = cls(metadata=metadata)
+        else:
+            parent = nodes[parent_index]
+            node = parent._value[key] = Config(parent=parent, metadata=metadata)
+        node._value.update(intern_dict(children))
+        nodes.append(node)
+    for (index, key), metadata in iteritems(leaf_metadata):
+        node = nodes[index]
+        node._value[key] = Config(node._value[key], parent=node, metadata=metadata)
+    return nodes[0]
@@ -0,0 +1,226 @@
+from sentinels import NOTHING
+
+from . import exceptions
+from .config import Config, _versions
+from .lazy import Lazy
+from .python3_compat import iteritems
+
+
+def derive(base, overrides=None):
+    """
+    Creates a config object reading through to ``base`` for everything not assigned to it
+
+    .. seealso:: :func:`Config.derive <confetti.config.Config.derive>`
+    """
+    returned = _DerivedConfig.inherit(base)
+    if overrides:
+        for path, value in _iter_override_paths(overrides):
+            returned.assign_path(path, value)
+    return returned
+
+
+def _iter_override_paths(overrides, prefix=""):
+    for key, value in iteritems(overrides):
+        if isinstance(value, dict):
+            for item in _iter_override_paths(value, prefix + key + "."):
+                yield item
+        else:
+            yield prefix + key, value
+
+
+class _DerivedConfig(Config):
+    """
+    A config node whose children fall through to a node of the base config. Nodes and leaves inherited from the base
+    are handed out as transient config objects, which are pinned into the derived tree only once they are changed, or
+    once callbacks are registered on them (in the case of nodes, which keep falling through to the base afterwards)
+    """
+
+    _pin_key = None
+    _own_version = None
+    _seen_base_version = None
+
+    @property
+    def version(self):
+        # a node that was changed in the derived config moves to a new version whenever its base node does, as its
+        # contents depend on both; an unchanged node simply shares the version of its base node
+        overlay = self._value
+        if not isinstance(overlay, _OverlayDict):
+            return self._own_version
+        base_version = overlay._base.version
+        if overlay.is_pristine():
+            return base_version
+        if base_version != self._seen_base_version:
+            self._seen_base_version = base_version
+            self._own_version = next(_versions)
+        return self._own_version
+
+    @version.setter
+    def version(self, version):
+        self._own_version = version
+        if isinstance(self._value, _OverlayDict):
+            self._seen_base_version = self._value._base.version
+
+    @classmethod
+    def inherit(cls, base, parent=None, pin_key=None):
+        returned = cls(parent=parent)
+        returned._value = _OverlayDict(base, returned)
+        returned._pin_key = pin_key
+        returned.metadata = base.metadata
+        returned.version = base.version
+        return returned
+
+    def on_update(self, func, weak=False):
+        self._pin_for_callback()
+        Config.on_update(self, func, weak)
+
+    def on_change(self, func, weak=False):
+        self._pin_for_callback()
+        Config.on_change(self, func, weak)
+
+    def _pin_for_callback(self):
+        # callbacks registered on a transient object would be lost along with it
+        if self._pin_key is None:
+            return
+        if not isinstance(self._value, _OverlayDict):
+            raise exceptions.CannotRegisterCallback(
+                "Cannot register callbacks on inherited leaf {0!r} before assigning it".format(
+                    self._pin_key
+                )
+            )
+        self._pin()
+
+    def _get_copy_class(self):
+        # copies are standalone trees, holding the values seen through the overlay
+        return Config
+
+    def _pin(self):
+        if self._pin_key is None:
+            return
+        parent = self._parent
+        parent._pin()
+        parent._value.store(self._pin_key, self)
+        self._pin_key = None
+
+    def _get_child_config(self, key):
+        child = self._value[key]
+        if isinstance(child, Config):
+            return child
+        if self._value.is_inherited(key):
+            returned = _DerivedConfig(child, parent=self)
+            returned._pin_key = key
+            returned.version = self._value._base.version
+            return returned
+        return Config._get_child_config(self, key)
+
+    def _assign_value(self, value):
+        self._pin()
+        Config._assign_value(self, value)
+
+
+class _OverlayDict(dict):
+    """
+    The children of a derived config node. The dict itself only holds the children assigned in the derived config,
+    and lookups of other children fall through to the base node
+    """
+
+    def __init__(self, base, node):
+        super(_OverlayDict, self).__init__()
+        self._base = base
+        self._node = node
+        self._deleted = set()
+
+    def is_inherited(self, key):
+        return (
+            not dict.__contains__(self, key)
+            and key not in self._deleted
+            and key in self._base._value
+        )
+
+    def _get_inherited(self, key):
+        if key in self._deleted:
+            return NOTHING
+        returned = self._base._value.get(key, NOTHING)
+        if isinstance(returned, (dict, Lazy)):
+            returned = self._base._get_child_config(key)
+        if isinstance(returned, Config):
+            if returned.is_leaf():
+                leaf = _DerivedConfig(returned._value, parent=self._node)
+                leaf.metadata = returned.metadata
+                leaf.version = returned.version
+                leaf._pin_key = key
+                return leaf
+            return _DerivedConfig.inherit(returned, parent=self._node, pin_key=key)
+        return returned
+
+    def is_pristine(self):
+        """
+        Returns whether nothing was assigned or deleted in the derived node, i.e. it is identical to the base node
+        """
+        return not dict.__len__(self) and not self._deleted
+
+    def store(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._deleted.discard(key)
+
+    def __getitem__(self, key):
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        returned = self._get_inherited(key)
+        if returned is NOTHING:
+            raise KeyError(key)
+        return returned
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or self.is_inherited(key)
+
+    def keys(self):
+        returned = [key for key in self._base._value if key not in self._deleted]
+        returned.extend(key for key in dict.keys(self) if key not in self._base._value)
+        return returned
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def copy(self):
+        return dict(self.items())
+
+    def __setitem__(self, key, value):
+        self._node._pin()
+        self.store(key, value)
+
+    def update(self, *args, **kwargs):
+        for key, value in iteritems(dict(*args, **kwargs)):
+            self[key] = value
+
+    def pop(self, key, *default):
+        if dict.__contains__(self, key):
+            self._node._pin()
+            returned = dict.pop(self, key)
+        elif self.is_inherited(key):
+            self._node._pin()
+            returned = self._get_inherited(key)
+        elif default:
+            return default[0]
+        else:
+            raise KeyError(key)
+        if key in self._base._value:
+            self._deleted.add(key)
+        return returned
+
+    def __delitem__(self, key):
+        self.pop(key)
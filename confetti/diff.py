@@ -0,0 +1,181 @@
+from sentinels import NOTHING
+
+from .config import (
+    Config,
+    _detach,
+    _get_state,
+    _is_node,
+    _notify_changes,
+    _notify_removals,
+    _notify_structure_changes,
+    _notify_updates,
+)
+from .exceptions import ValidationError
+from .ref import Ref
+
+ADD = "add"
+REMOVE = "remove"
+CHANGE = "change"
+
+
+def diff(config, other):
+    """
+    Returns the changes turning ``config`` into ``other``
+
+    .. seealso:: :func:`Config.diff <confetti.config.Config.diff>`
+    """
+    returned = []
+    stack = [((), config, other)]
+    while stack:
+        components, node, other_node = stack.pop()
+        if node is other_node or node.version == other_node.version:
+            continue
+        children = node._value
+        other_children = other_node._value
+        changes = []
+        for key in sorted(set(children.keys()) | set(other_children.keys())):
+            value = children.get(key, NOTHING)
+            other_value = other_children.get(key, NOTHING)
+            if value is other_value:
+                continue
+            path = components + (key,)
+            if value is NOTHING:
+                changes.append((ADD, path, _get_state(other_value)))
+            elif other_value is NOTHING:
+                changes.append((REMOVE, path, None))
+            elif _is_node(value) and _is_node(other_value):
+                stack.append(
+                    (
+                        path,
+                        node._get_child_config(key),
+                        other_node._get_child_config(key),
+                    )
+                )
+            elif _is_node(value) or _is_node(other_value):
+                changes.append((REMOVE, path, None))
+                changes.append((ADD, path, _get_state(other_value)))
+            elif not _leaf_equals(_get_leaf(value), _get_leaf(other_value)):
+                changes.append((CHANGE, path, _get_state(other_value)))
+        returned.extend(changes)
+    returned.sort(key=lambda change: change[1])
+    return [(kind, ".".join(path), value) for kind, path, value in returned]
+
+
+def _get_leaf(value):
+    if isinstance(value, Config):
+        return value._value
+    return value
+
+
+def _leaf_equals(value, other_value):
+    if isinstance(value, Ref) and isinstance(other_value, Ref):
+        return (
+            value._target == other_value._target
+            and value._filter == other_value._filter
+        )
+    return value == other_value
+
+
+def apply_patch(config, patch):
+    """
+    Applies a list of changes returned by :func:`diff` to ``config``
+
+    .. seealso:: :func:`Config.apply_patch <confetti.config.Config.apply_patch>`
+    """
+    errors = []
+    removed = set()
+    added = set()
+    operations = []
+    for kind, path, value in patch:
+        components = tuple(path.split("."))
+        parent = _get_parent(config, components)
+        key = components[-1]
+        if parent is None:
+            errors.append((path, "Invalid path"))
+            continue
+        exists = (components in added) or (
+            components not in removed and key in parent._value
+        )
+        if kind == ADD:
+            if exists:
+                errors.append((path, "Path already exists"))
+                continue
+            added.add(components)
+        elif not exists:
+            errors.append((path, "Invalid path"))
+            continue
+        elif kind == REMOVE:
+            removed.add(components)
+            added.discard(components)
+        elif kind == CHANGE:
+            child = parent._value[key]
+            if _is_node(child) or isinstance(value, dict):
+                errors.append((path, "Cannot change a node"))
+                continue
+            if isinstance(child, Config) and child._validator is not None:
+                message = child._validator.get_error(value)
+                if message is not None:
+                    errors.append((path, message))
+                    continue
+        else:
+            errors.append((path, "Unknown change {0!r}".format(kind)))
+            continue
+        operations.append((kind, parent, key, value))
+    if errors:
+        raise ValidationError(errors)
+
+    structure_changes = []
+    updated = []
+    changes = []
+    removals = []
+    for kind, parent, key, value in operations:
+        if kind == REMOVE:
+            _detach(parent, parent._value.pop(key))
+            structure_changes.append((parent, [key]))
+            updated.append(parent)
+            removals.append((parent, (key,)))
+            continue
+        if kind == ADD:
+            if isinstance(value, dict):
+                parent._value[key] = Config(value, parent=parent)
+                structure_changes.append((parent, [key]))
+                changes.extend(_iter_leaf_changes(parent, (key,), value))
+            else:
+                parent._value[key] = value
+                structure_changes.append((parent, [key]))
+                changes.append((parent, (key,), value))
+            updated.append(parent)
+            continue
+        child = parent._value[key]
+        if isinstance(child, Config):
+            child._assign_value(value)
+            updated.append(child)
+        else:
+            parent._value[key] = value
+            updated.append(parent)
+        changes.append((parent, (key,), value))
+    _notify_structure_changes(structure_changes)
+    _notify_updates(updated)
+    _notify_removals(removals)
+    _notify_changes(changes)
+
+
+def _get_parent(config, components):
+    for component in components[:-1]:
+        if config.is_leaf() or component not in config._value:
+            return None
+        config = config._get_child_config(component)
+    if config.is_leaf():
+        return None
+    return config
+
+
+def _iter_leaf_changes(parent, components, value):
+    stack = [(components, value)]
+    while stack:
+        components, value = stack.pop()
+        if isinstance(value, dict):
+            for key in value:
+                stack.append((components + (key,), value[key]))
+        else:
+            yield parent, components, value
@@ -0,0 +1,186 @@
+import json
+import re
+
+from .arrays import NumericArray
+from .config import Config
+from .lazy import Lazy
+from .python3_compat import iteritems, string_types
+from .ref import Computed, Ref
+
+JSON = "json"
+YAML = "yaml"
+
+REDACTED = "<redacted>"
+
+_START = "start"
+_END = "end"
+_LEAF = "leaf"
+
+_CHUNK_PARTS = 1024
+
+_YAML_PLAIN_KEY = re.compile(r"^[A-Za-z_][A-Za-z0-9_\-]*$")
+_YAML_RESERVED = frozenset(
+    ["y", "yes", "n", "no", "true", "false", "on", "off", "null"]
+)
+
+
+def dump(config, fp, format=JSON, redact=None, indent=None):
+    """
+    Writes ``config`` to the file object ``fp``
+
+    .. seealso:: :func:`Config.dump <confetti.config.Config.dump>`
+    """
+    if format == JSON:
+        emit = _emit_json
+    elif format == YAML:
+        emit = _emit_yaml
+    else:
+        raise ValueError("Unknown format {0!r}".format(format))
+    encode = _get_encoder()
+    buffer = []
+    for part in emit(_iter_events(config, redact), encode, indent):
+        buffer.append(part)
+        if len(buffer) >= _CHUNK_PARTS:
+            fp.write("".join(buffer))
+            del buffer[:]
+    fp.write("".join(buffer))
+
+
+def _get_encoder():
+    encode = json.JSONEncoder(separators=(", ", ": "), default=_encode_default).encode
+    encode_string = json.encoder.encode_basestring_ascii
+    # the most common leaf types are encoded directly, skipping the overhead of the encoder
+    fast_encoders = {str: encode_string, int: repr, type(None): encode}
+    for string_type in string_types:
+        fast_encoders[string_type] = encode_string
+
+    def returned(value):
+        return fast_encoders.get(type(value), encode)(value)
+
+    return returned
+
+
+def _encode_default(value):
+    if isinstance(value, NumericArray):
+        return value.tolist()
+    raise TypeError("{0!r} is not JSON serializable".format(value))
+
+
+def _iter_events(config, redact):
+    """
+    Walks the tree depth-first, yielding ``(kind, key, value)`` events: a start and an end event for each node, and a
+    leaf event for each leaf, with Refs and Computed leaves resolved
+    """
+    if config.is_leaf():
+        yield _LEAF, None, _get_leaf_value(config, config, redact)
+        return
+    yield _START, None, None
+    stack = [_iter_children(config, redact)]
+    while stack:
+        for key, value in stack[-1]:
+            if isinstance(value, (Config, dict)):
+                yield _START, key, None
+                stack.append(_iter_children(value, redact))
+                break
+            yield _LEAF, key, value
+        else:
+            stack.pop()
+            yield _END, None, None
+
+
+def _iter_children(node, redact):
+    """
+    Yields the children of a node, as nodes (config objects or dicts) or leaf values
+    """
+    if isinstance(node, dict):
+        for item in iteritems(node):
+            yield item
+        return
+    for key, value in iteritems(node._value):
+        if isinstance(value, (dict, Lazy)):
+            value = node._get_child_config(key)
+        if isinstance(value, Config) and not value.is_leaf():
+            yield key, REDACTED if _is_redacted(value, redact) else value
+        else:
+            yield key, _get_leaf_value(node, value, redact)
+
+
+def _get_leaf_value(node, value, redact):
+    if isinstance(value, Config):
+        if _is_redacted(value, redact):
+            return REDACTED
+        value = value._value
+    if isinstance(value, (Ref, Computed)):
+        # a Ref to a node resolves to a dict, which is then dumped as a node
+        value = value.resolve(node)
+    return value
+
+
+def _is_redacted(config, redact):
+    return (
+        redact is not None
+        and config.metadata is not None
+        and bool(config.metadata.get(redact))
+    )
+
+
+def _emit_json(events, encode, indent):
+    has_children = []
+    separator = "," if indent is not None else ", "
+    for kind, key, value in events:
+        if kind == _END:
+            if has_children.pop() and indent is not None:
+                yield "\n" + " " * (indent * len(has_children)) + "}"
+            else:
+                yield "}"
+            continue
+        value = "{" if kind == _START else encode(value)
+        if has_children:
+            prefix = separator if has_children[-1] else ""
+            if indent is not None:
+                prefix += "\n" + " " * (indent * len(has_children))
+            has_children[-1] = True
+            value = prefix + encode(_get_key_string(key)) + ": " + value
+        if kind == _START:
+            has_children.append(False)
+        yield value
+    yield "\n"
+
+
+def _emit_yaml(events, encode, indent):
+    if indent is None:
+        indent = 2
+    has_children = []
+    for kind, key, value in events:
+        if kind == _END:
+            if not has_children.pop():
+                yield " {}\n" if has_children else "{}\n"
+            continue
+        if not has_children:
+            if kind == _START:
+                has_children.append(False)
+            else:
+                yield encode(value) + "\n"
+            continue
+        # the header line of a parent node is left open until its first child
+        prefix = "\n" if not has_children[-1] and len(has_children) > 1 else ""
+        has_children[-1] = True
+        prefix += " " * (indent * (len(has_children) - 1)) + _get_yaml_key(key, encode)
+        if kind == _START:
+            has_children.append(False)
+            yield prefix + ":"
+        else:
+            yield prefix + ": " + encode(value) + "\n"
+
+
+def _get_key_string(key):
+    if isinstance(key, string_types):
+        return key
+    return str(key)
+
+
+def _get_yaml_key(key, encode):
+    key = _get_key_string(key)
+    if _YAML_PLAIN_KEY.match(key) and key.lower() not in _YAML_RESERVED:
+        return key
+    return encode(key)
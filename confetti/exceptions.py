@@ -20,3 +20,19 @@ class CannotResolveError(ConfigException):
 
 class NoBackup(ConfigException):
     pass
+
+
+class CyclicReferenceError(CannotResolveError):
+    pass
+
+
+class CannotRegisterCallback(ConfigException):
+    pass
+
+
+class ValidationError(ConfigException):
+    def __init__(self, errors):
+        super(ValidationError, self).__init__(
+            "\n".join("{0}: {1}".format(path, message) for path, message in errors)
+        )
+        self.errors = errors
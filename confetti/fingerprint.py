@@ -0,0 +1,100 @@
+import hashlib
+import numbers
+
+from .arrays import NumericArray
+from .config import Config, _is_node
+from .derived import _OverlayDict
+from .python3_compat import iteritems, string_types
+from .ref import Computed, Ref
+
+
+def get_digest(config):
+    """
+    Returns the content hash of ``config`` as bytes, reusing the cached hashes of unchanged subtrees
+
+    .. seealso:: :func:`Config.fingerprint <confetti.config.Config.fingerprint>`
+    """
+    # the versions of derived nodes move along with their base nodes, so cached digests of derived nodes are
+    # invalidated by changes to the base too
+    cached = config._fingerprint
+    if cached is not None and cached[0] == config.version:
+        return cached[1]
+    children = config._value
+    if isinstance(children, _OverlayDict) and children.is_pristine():
+        digest = get_digest(children._base)
+    elif config.is_leaf():
+        digest = _hash_leaf(config._value)
+    else:
+        hashed = hashlib.sha1(b"node")
+        for key in sorted(children.keys()):
+            value = children[key]
+            if isinstance(value, Config) or _is_node(value):
+                child_digest = get_digest(config._get_child_config(key))
+            else:
+                child_digest = _hash_leaf(value)
+            hashed.update(_encode(key))
+            hashed.update(child_digest)
+        digest = hashed.digest()
+    config._fingerprint = (config.version, digest)
+    return digest
+
+
+def _hash_leaf(value):
+    return hashlib.sha1(b"leaf" + _encode(value)).digest()
+
+
+def _encode(value):
+    if value is None:
+        return b"N"
+    if isinstance(value, bool):
+        return b"T" if value else b"F"
+    if isinstance(value, numbers.Integral):
+        return b"i" + str(value).encode("ascii")
+    if isinstance(value, float):
+        return b"f" + repr(value).encode("ascii")
+    if isinstance(value, bytes):
+        return b"b" + _frame(value)
+    if isinstance(value, string_types):
+        return b"s" + _frame(value.encode("utf-8"))
+    if isinstance(value, (list, tuple)):
+        return (b"l" if isinstance(value, list) else b"t") + _frame_all(
+            _encode(item) for item in value
+        )
+    if isinstance(value, (set, frozenset)):
+        return b"e" + _frame_all(sorted(_encode(item) for item in value))
+    if isinstance(value, dict):
+        return b"d" + _frame_all(
+            sorted(
+                _encode(key) + _frame(_encode(item)) for key, item in iteritems(value)
+            )
+        )
+    if isinstance(value, NumericArray):
+        return b"a" + value.typecode.encode("ascii") + _frame(value.tobytes())
+    if isinstance(value, Ref):
+        return b"r" + _frame(_encode(value._target)) + _encode_callable(value._filter)
+    if isinstance(value, Computed):
+        return b"c" + _encode_callable(value._func)
+    return b"o" + _frame(
+        _get_name(type(value)).encode("utf-8") + repr(value).encode("utf-8")
+    )
+
+
+def _encode_callable(func):
+    if func is None:
+        return b"N"
+    return _frame(_get_name(func).encode("utf-8"))
+
+
+def _get_name(obj):
+    return "{0}.{1}".format(
+        getattr(obj, "__module__", None),
+        getattr(obj, "__qualname__", getattr(obj, "__name__", repr(obj))),
+    )
+
+
+def _frame(encoded):
+    return str(len(encoded)).encode("ascii") + b":" + encoded
+
+
+def _frame_all(encoded_items):
+    return b"".join(_frame(encoded) for encoded in encoded_items)
@@ -0,0 +1,46 @@
+from .python3_compat import intern, iteritems, itervalues
+
+_intern_values = False
+
+
+def set_value_interning(enabled):
+    """
+    Sets whether string leaf values are interned along with keys when building config trees. Useful when the same
+    strings (host names, modes etc.) are repeated across many subtrees or copies of a configuration
+    """
+    global _intern_values
+    _intern_values = bool(enabled)
+
+
+def is_value_interning_enabled():
+    return _intern_values
+
+
+def intern_key(key):
+    if type(key) is str:
+        return intern(key)
+    return key
+
+
+def intern_value(value):
+    if _intern_values and type(value) is str:
+        return intern(value)
+    return value
+
+
+def intern_dict(d):
+    """
+    Returns a copy of ``d`` with its keys, and string values if enabled, interned
+    """
+    if type(d) is dict and not _intern_values:
+        try:
+            return dict(zip(map(intern, d), itervalues(d)))
+        except TypeError:
+            # not all keys are strings
+            pass
+    # keeps the type of ordered dicts and the like
+    returned = d.copy()
+    returned.clear()
+    for key, value in iteritems(d):
+        returned[intern_key(key)] = intern_value(value)
+    return returned
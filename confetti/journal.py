@@ -0,0 +1,298 @@
+import os
+import pickle
+import threading
+import time
+
+from sentinels import Sentinel
+
+from .config import Config, _get_state
+from .exceptions import InvalidPath
+from .python3_compat import iteritems
+
+_PICKLE_PROTOCOL = 2
+
+_replace = getattr(os, "replace", os.rename)
+
+_REMOVED = Sentinel("REMOVED")
+
+
+class Journal(object):
+    """
+    An append-only log of the leaf changes made to a config object, allowing runtime overrides to survive restarts::
+
+        journal = Journal("/var/lib/myapp/overrides.journal")
+        journal.attach(config)  # replays past changes, then records new ones
+        config.assign_path("a.b", 3)
+
+    Each change is appended as a ``(version, path, value)`` record, and each removal (e.g. by :func:`Config.pop`) as a
+    ``(version, path)`` record. Records are written to the file immediately, but only fsync'ed every ``sync_every``
+    records, or on :func:`Journal.sync`. Records are never left unsynced for more than ``sync_interval`` seconds, as a
+    timer syncs them in the background if no other record comes along.
+
+    Once the journal grows past ``compact_threshold`` bytes, it is folded in the background into a snapshot holding
+    the latest value (or removal) of every path, which is kept next to the journal (``<filename>.snapshot``)
+    """
+
+    def __init__(
+        self, filename, sync_every=100, sync_interval=1.0, compact_threshold=1 << 20
+    ):
+        super(Journal, self).__init__()
+        self.filename = filename
+        self.snapshot_filename = filename + ".snapshot"
+        self._compacting_filename = filename + ".compacting"
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._file = None
+        self._version = 0
+        self._pending = 0
+        self._last_sync = time.time()
+        self._sync_timer = None
+        self._replaying = False
+        self._compaction = None
+
+    def get_version(self):
+        """
+        Returns the version of the latest change recorded or replayed
+        """
+        return self._version
+
+    def attach(self, config):
+        """
+        Replays the journal into ``config``, and records every leaf change and removal made under it from now on
+        """
+        self.replay(config)
+        config.on_change(self.record)
+        config.on_remove(self.record_removal)
+
+    def replay(self, config):
+        """
+        Applies the changes saved in the snapshot and the journal to ``config``. Consecutive assignments are applied as
+        a single update, firing update hooks once, and removals are applied with :func:`Config.pop` in between. The
+        replayed changes are not recorded again.
+        """
+        with self._lock:
+            version, values = self._read_snapshot()
+            for filename in (self._compacting_filename, self.filename):
+                version = _fold_records(
+                    values, _read_records(filename, truncate=True), version
+                )
+            self._version = version
+            if not values:
+                return
+            self._replaying = True
+            try:
+                _apply(config, values)
+            finally:
+                self._replaying = False
+
+    def record(self, path, value):
+        """
+        Appends a change of the leaf at ``path`` to the journal
+        """
+        if isinstance(value, Config):
+            value = value._value if value.is_leaf() else _get_state(value)
+        self._append(path, value)
+
+    def record_removal(self, path):
+        """
+        Appends the removal of the leaf or subtree at ``path`` to the journal
+        """
+        self._append(path)
+
+    def _append(self, *fields):
+        with self._lock:
+            if self._replaying:
+                return
+            self._version += 1
+            f = self._get_file()
+            pickle.dump((self._version,) + fields, f, _PICKLE_PROTOCOL)
+            f.flush()
+            self._pending += 1
+            if (
+                self._pending >= self.sync_every
+                or time.time() - self._last_sync >= self.sync_interval
+            ):
+                self.sync()
+            elif self._sync_timer is None:
+                self._sync_timer = threading.Timer(self.sync_interval, self.sync)
+                self._sync_timer.daemon = True
+                self._sync_timer.start()
+            if (
+                self.compact_threshold is not None
+                and f.tell() >= self.compact_threshold
+            ):
+                self.compact()
+
+    def _get_file(self):
+        if self._file is None:
+            self._file = open(self.filename, "ab")
+        return self._file
+
+    def sync(self):
+        """
+        Forces all recorded changes to disk
+        """
+        with self._lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            if self._file is not None and self._pending:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._pending = 0
+            self._last_sync = time.time()
+
+    def compact(self, wait=False):
+        """
+        Folds the journal into the snapshot in a background thread. The journal is started afresh right away, so
+        recording is not blocked by the compaction.
+        """
+        with self._lock:
+            if self._compaction is None or not self._compaction.is_alive():
+                if os.path.exists(self._compacting_filename):
+                    # left over by an interrupted compaction
+                    self._fold()
+                self.sync()
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                if os.path.exists(self.filename):
+                    _replace(self.filename, self._compacting_filename)
+                    self._compaction = threading.Thread(target=self._fold)
+                    self._compaction.daemon = True
+                    self._compaction.start()
+            compaction = self._compaction
+        if wait and compaction is not None:
+            compaction.join()
+
+    def _fold(self):
+        version, values = self._read_snapshot()
+        version = _fold_records(
+            values, _read_records(self._compacting_filename), version
+        )
+        temp_filename = self.snapshot_filename + ".tmp"
+        with open(temp_filename, "wb") as f:
+            pickle.dump((version, _get_records(values)), f, _PICKLE_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        _replace(temp_filename, self.snapshot_filename)
+        os.remove(self._compacting_filename)
+
+    def _read_snapshot(self):
+        values = {}
+        if not os.path.exists(self.snapshot_filename):
+            return 0, values
+        with open(self.snapshot_filename, "rb") as f:
+            version, records = pickle.load(f)
+        _fold_records(values, records, 0)
+        return version, values
+
+    def close(self):
+        """
+        Syncs and closes the journal, waiting for a running compaction to finish
+        """
+        with self._lock:
+            self.sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+
+    def __repr__(self):
+        return "<Journal {0} (version {1})>".format(self.filename, self._version)
+
+
+def _read_records(filename, truncate=False):
+    """
+    Returns the records of a journal file, stopping at a partially written record (which is cut off the file if
+    ``truncate`` is True)
+    """
+    returned = []
+    if not os.path.exists(filename):
+        return returned
+    with open(filename, "r+b" if truncate else "rb") as f:
+        valid_size = 0
+        while True:
+            try:
+                returned.append(pickle.load(f))
+            except Exception:
+                break
+            valid_size = f.tell()
+        f.seek(0, os.SEEK_END)
+        if truncate and f.tell() != valid_size:
+            f.truncate(valid_size)
+    return returned
+
+
+def _fold_records(values, records, version):
+    """
+    Folds the records newer than ``version`` into ``values``, a dict mapping each path to the latest
+    ``(version, value)`` recorded for it (``value`` being ``_REMOVED`` for removals). Removals and subtree assignments
+    supersede everything recorded under their path.
+    """
+    for record in records:
+        record_version, path = record[:2]
+        if record_version <= version:
+            continue
+        value = record[2] if len(record) == 3 else _REMOVED
+        if value is _REMOVED or isinstance(value, dict):
+            prefix = path + "."
+            for other in [other for other in values if other.startswith(prefix)]:
+                del values[other]
+        values[path] = (record_version, value)
+        version = record_version
+    return version
+
+
+def _get_records(values):
+    return [
+        (version, path) if value is _REMOVED else (version, path, value)
+        for path, (version, value) in sorted(
+            iteritems(values), key=lambda item: item[1][0]
+        )
+    ]
+
+
+def _apply(config, values):
+    assigned = {}
+    for record in _get_records(values):
+        if len(record) == 3 and not isinstance(record[2], dict):
+            assigned[record[1]] = record[2]
+            continue
+        # subtree assignments replace what the config holds at their path
+        if assigned:
+            config.update(_get_nested_dict(assigned))
+            assigned = {}
+        _remove(config, record[1])
+        if len(record) == 3:
+            assigned[record[1]] = record[2]
+    if assigned:
+        config.update(_get_nested_dict(assigned))
+
+
+def _remove(config, path):
+    parent_path, _, key = path.rpartition(".")
+    try:
+        parent = config.get_config(parent_path) if parent_path else config
+    except InvalidPath:
+        return
+    if not parent.is_leaf() and key in parent:
+        parent.pop(key)
+
+
+def _get_nested_dict(values):
+    returned = {}
+    for path, value in iteritems(values):
+        components = path.split(".")
+        node = returned
+        for component in components[:-1]:
+            child = node.get(component)
+            if not isinstance(child, dict):
+                child = node[component] = {}
+            node = child
+        node[components[-1]] = value
+    return returned
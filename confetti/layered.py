@@ -0,0 +1,186 @@
+from sentinels import NOTHING
+
+from . import exceptions
+from .config import Config, _get_state
+from .python3_compat import iteritems
+
+
+class LayeredConfig(object):
+    """
+    Combines an ordered stack of config objects (e.g. defaults, site files, environment and command line), in which
+    each path is resolved from the highest-precedence layer defining it. Layers are referenced, never copied.
+
+    >>> layered = LayeredConfig([("defaults", Config({"a": 1, "b": 2})), ("cli", Config({"b": 3}))])
+    >>> layered.get_path("b")
+    3
+    >>> layered.get_source("a")
+    'defaults'
+    """
+
+    def __init__(self, layers=()):
+        super(LayeredConfig, self).__init__()
+        self._layers = []
+        self._cache = {}
+        self._versions = ()
+        for name, config in layers:
+            self.add_layer(name, config)
+
+    def add_layer(self, name, config, index=None):
+        """
+        Adds a layer named ``name``. The layer takes precedence over all existing layers, unless an ``index`` in the
+        precedence order (0 being the lowest) is given
+        """
+        if name in self.get_layer_names():
+            raise ValueError("Layer {0!r} already exists".format(name))
+        if not isinstance(config, Config):
+            config = Config(config)
+        if index is None:
+            index = len(self._layers)
+        self._layers.insert(index, (name, config))
+        self.invalidate()
+
+    def remove_layer(self, name):
+        """
+        Removes the layer named ``name`` and returns its config object
+        """
+        for index, (layer_name, config) in enumerate(self._layers):
+            if layer_name == name:
+                break
+        else:
+            raise LookupError("No such layer: {0!r}".format(name))
+        self._layers.pop(index)
+        self.invalidate()
+        return config
+
+    def get_layer(self, name):
+        """
+        Returns the config object of the layer named ``name``
+        """
+        for layer_name, config in self._layers:
+            if layer_name == name:
+                return config
+        raise LookupError("No such layer: {0!r}".format(name))
+
+    def get_layer_names(self):
+        """
+        Returns the names of the layers, from the lowest precedence to the highest
+        """
+        return [name for name, _ in self._layers]
+
+    def invalidate(self):
+        """
+        Discards all cached resolutions
+        """
+        self._cache.clear()
+        self._versions = self._get_versions()
+
+    def _get_versions(self):
+        # the version of a config object moves whenever anything under it changes, so checking the versions of the
+        # layers replaces subscribing to their updates, which would keep this object alive as long as the layers
+        return tuple(config.version for _, config in self._layers)
+
+    def get_path(self, path):
+        """
+        Gets the value of the dotted path ``path`` from the highest-precedence layer defining it. Nodes are returned
+        as dicts merging all the layers defining them. A leaf in a layer hides the paths under it in lower layers.
+        """
+        value, _ = self._resolve(path)
+        if isinstance(value, dict):
+            # resolved nodes are cached, and must not be changed through the returned dict
+            value = _copy_nodes(value)
+        return value
+
+    def get_source(self, path):
+        """
+        Returns the name of the layer from which the value of ``path`` is taken
+        """
+        return self._resolve(path)[1]
+
+    def __contains__(self, path):
+        try:
+            self._resolve(path)
+        except exceptions.InvalidPath:
+            return False
+        return True
+
+    def _resolve(self, path):
+        if self._versions != self._get_versions():
+            self.invalidate()
+        returned = self._cache.get(path, NOTHING)
+        if returned is not NOTHING:
+            return returned
+        components = path.split(".")
+        nodes = []
+        for name, config in reversed(self._layers):
+            child = _get_layer_child(config, components)
+            if child is NOTHING:
+                continue
+            if child is None or child.is_leaf():
+                if nodes:
+                    break
+                if child is None:
+                    # hidden by a leaf on the way
+                    raise exceptions.InvalidPath("Invalid path: {0!r}".format(path))
+                returned = self._cache[path] = (_get_leaf_value(config, path), name)
+                return returned
+            nodes.append((name, child))
+        if not nodes:
+            raise exceptions.InvalidPath("Invalid path: {0!r}".format(path))
+        value = {}
+        for _, child in reversed(nodes):
+            _merge_into(value, _get_state(child))
+        returned = self._cache[path] = (value, nodes[0][0])
+        return returned
+
+    def serialize_to_dict(self):
+        """
+        Returns a recursive dict merging all layers
+        """
+        returned = {}
+        for _, config in self._layers:
+            _merge_into(returned, _get_state(config))
+        return returned
+
+    def __repr__(self):
+        return "<LayeredConfig {0}>".format(self.get_layer_names())
+
+
+def _get_layer_child(config, components):
+    """
+    Returns the config object at the path ``components`` of a layer, NOTHING if the layer does not define it, or None
+    if a leaf of the layer lies on the way
+    """
+    node = config
+    for component in components:
+        if node.is_leaf():
+            return None
+        if component not in node._value:
+            return NOTHING
+        node = node._get_child_config(component)
+    return node
+
+
+def _copy_nodes(value):
+    returned = dict(value)
+    for key, child in iteritems(returned):
+        if isinstance(child, dict):
+            returned[key] = _copy_nodes(child)
+    return returned
+
+
+def _get_leaf_value(config, path):
+    if "." in path:
+        parent_path, key = path.rsplit(".", 1)
+        config = config.get_config(parent_path)
+    else:
+        key = path
+    return config[key]
+
+
+def _merge_into(target, source):
+    for key, value in iteritems(source):
+        existing = target.get(key)
+        if isinstance(value, dict) and isinstance(existing, dict):
+            _merge_into(existing, value)
+        else:
+            target[key] = value
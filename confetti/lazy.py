@@ -0,0 +1,59 @@
+class Lazy(object):
+    """
+    A placeholder for a subtree which is only read and parsed on first access, e.g. through
+    :func:`Config.get_config <confetti.config.Config.get_config>`, ``__getitem__`` or the ``root`` proxy::
+
+        config = Config({"server": {"port": 8080}, "routes": Lazy("routes.py")})
+
+    By default the whole file is executed, and its ``CONFIG`` variable is taken as the subtree, like in
+    :func:`Config.from_filename <confetti.config.Config.from_filename>`. When ``offset`` or ``length`` are given, only
+    that byte range of the file is read, and it is expected to contain a single expression (e.g. a dict literal).
+
+    ``loader``, if given, is called with the bytes read and returns the subtree instead (e.g. ``json.loads``).
+    """
+
+    def __init__(self, filename, offset=0, length=None, loader=None, namespace=None):
+        super(Lazy, self).__init__()
+        self.filename = filename
+        self.offset = offset
+        self.length = length
+        self.loader = loader
+        self.namespace = namespace
+
+    def is_range(self):
+        return self.offset != 0 or self.length is not None
+
+    def read(self):
+        """
+        Reads the bytes backing the subtree
+        """
+        with open(self.filename, "rb") as f:
+            if self.offset:
+                f.seek(self.offset)
+            if self.length is None:
+                return f.read()
+            return f.read(self.length)
+
+    def load(self):
+        """
+        Reads and parses the subtree, returning its value
+        """
+        data = self.read()
+        if self.loader is not None:
+            return self.loader(data)
+        namespace = dict(__file__=self.filename)
+        if self.namespace is not None:
+            namespace.update(self.namespace)
+        if self.is_range():
+            return eval(compile(data, self.filename, "eval"), namespace)
+        exec(compile(data, self.filename, "exec"), namespace)
+        return namespace["CONFIG"]
+
+    def __repr__(self):
+        if self.is_range():
+            return "<Lazy {0}[{1}:{2}]>".format(
+                self.filename,
+                self.offset,
+                "" if self.length is None else self.offset + self.length,
+            )
+        return "<Lazy {0}>".format(self.filename)
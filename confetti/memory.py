@@ -0,0 +1,77 @@
+import sys
+
+from .arrays import NumericArray
+from .config import Config
+from .python3_compat import iteritems, itervalues
+
+_CONTAINERS = (list, tuple, set, frozenset)
+
+
+def get_memory_usage(config, max_depth=None):
+    """
+    Returns ``(path, size)`` tuples for the nodes of ``config``
+
+    .. seealso:: :func:`Config.get_memory_usage <confetti.config.Config.get_memory_usage>`
+    """
+    returned = []
+    _get_node_size(config, (), max_depth, set(), returned)
+    returned.sort(key=lambda item: (-item[1], item[0]))
+    return returned
+
+
+def _get_node_size(config, components, max_depth, seen, report):
+    returned = _get_config_overhead(config, seen)
+    for key, value in iteritems(config._value):
+        returned += _get_size(key, seen)
+        if isinstance(value, Config):
+            if not value.is_leaf():
+                returned += _get_node_size(
+                    value, components + (key,), max_depth, seen, report
+                )
+                continue
+            returned += _get_config_overhead(value, seen)
+            value = value._value
+        returned += _get_value_size(value, seen)
+    if max_depth is None or len(components) <= max_depth:
+        report.append((".".join(str(component) for component in components), returned))
+    return returned
+
+
+def _get_config_overhead(config, seen):
+    returned = _get_size(config, seen) + _get_size(config.__dict__, seen)
+    returned += _get_size(config.root, seen) + _get_size(config.root.__dict__, seen)
+    returned += _get_size(config._update_callbacks, seen)
+    if config.metadata is not None:
+        returned += _get_value_size(config.metadata, seen)
+    if isinstance(config._value, dict):
+        returned += _get_size(config._value, seen)
+    return returned
+
+
+def _get_value_size(value, seen):
+    returned = 0
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        size = _get_size(value, seen)
+        if not size:
+            continue
+        returned += size
+        if isinstance(value, dict):
+            stack.extend(value)
+            stack.extend(itervalues(value))
+        elif isinstance(value, _CONTAINERS):
+            stack.extend(value)
+        elif isinstance(value, NumericArray):
+            stack.append(value._array)
+    return returned
+
+
+def _get_size(obj, seen):
+    """
+    Returns the size of ``obj``, unless it was already counted (e.g. an interned string shared by several nodes)
+    """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    return sys.getsizeof(obj)
@@ -12,5 +12,6 @@ class Metadata(object):
             if value.metadata is None:
                 value.metadata = {}
             value.metadata.update(self.metadata)
+            value._notify_structure_change()
             return value
         return Config(value, metadata=self.metadata)
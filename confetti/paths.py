@@ -0,0 +1,147 @@
+from sentinels import NOTHING
+
+from . import exceptions
+from .config import Config, _is_node
+from .ref import Computed, Ref
+
+_path_set_cache = {}
+
+# emptied when full, like the cache of compiled query patterns
+_MAX_CACHED_PATH_SETS = 256
+
+_SPECIAL_VALUES = (Ref, Computed)
+
+
+class PathSet(object):
+    """
+    A set of dotted paths compiled into a trie, so that reading all of them walks each shared prefix once. Compiled
+    path sets can be passed to :func:`Config.get_paths <confetti.config.Config.get_paths>` instead of the paths
+    themselves
+    """
+
+    def __init__(self, paths):
+        super(PathSet, self).__init__()
+        self.paths = tuple(paths)
+        root = {}
+        for index, path in enumerate(self.paths):
+            node = root
+            for component in path.split("."):
+                entry = node.get(component)
+                if entry is None:
+                    entry = node[component] = ([], {}, path)
+                node = entry[1]
+            entry[0].append(index)
+        self._trie = _compile_trie(root)
+
+    def get(self, config):
+        """
+        Returns a tuple of the values of the paths under ``config``, in order
+        """
+        values = [None] * len(self.paths)
+        stack = [(config, self._trie)]
+        while stack:
+            node, (leaves, nodes) = stack.pop()
+            if not isinstance(node, Config):
+                # a dict returned by a Ref
+                for key, indices, path in leaves:
+                    value = _get_child(node, key, path, True)[0]
+                    for index in indices:
+                        values[index] = value
+                for key, indices, trie, path in nodes:
+                    value, child = _get_child(node, key, path, bool(indices))
+                    for index in indices:
+                        values[index] = value
+                    stack.append((_check_node(child, path), trie))
+                continue
+            children = node._value
+            for key, indices, path in leaves:
+                child = children.get(key)
+                if isinstance(child, Config) and not isinstance(
+                    child._value, _SPECIAL_VALUES
+                ):
+                    value = child.get_value()
+                else:
+                    value = _get_child(node, key, path, True)[0]
+                for index in indices:
+                    values[index] = value
+            for key, indices, trie, path in nodes:
+                child = children.get(key)
+                if not isinstance(child, Config) or child.is_leaf():
+                    value, child = _get_child(node, key, path, bool(indices))
+                    child = _check_node(child, path)
+                elif indices:
+                    value = child.get_value()
+                for index in indices:
+                    values[index] = value
+                stack.append((child, trie))
+        return tuple(values)
+
+    def get_dict(self, config):
+        """
+        Returns a dict mapping the paths to their values under ``config``
+        """
+        return dict(zip(self.paths, self.get(config)))
+
+    def __repr__(self):
+        return "<PathSet {0!r}>".format(list(self.paths))
+
+
+def compile_paths(paths):
+    """
+    Returns a :class:`PathSet` for the given paths, reusing previously compiled path sets
+    """
+    if isinstance(paths, PathSet):
+        return paths
+    paths = tuple(paths)
+    returned = _path_set_cache.get(paths)
+    if returned is None:
+        if len(_path_set_cache) >= _MAX_CACHED_PATH_SETS:
+            _path_set_cache.clear()
+        returned = _path_set_cache[paths] = PathSet(paths)
+    return returned
+
+
+def _compile_trie(node):
+    """
+    Turns a level of the trie into a list of (key, indices, path) entries for the paths ending there, and a list of
+    (key, indices, trie, path) entries for the nodes to walk into
+    """
+    leaves = []
+    nodes = []
+    for key, (indices, children, path) in node.items():
+        if children:
+            # errors about walking into the node mention a path going through it
+            path = next(iter(children.values()))[2]
+            nodes.append((key, tuple(indices), _compile_trie(children), path))
+        else:
+            leaves.append((key, tuple(indices), path))
+    return leaves, nodes
+
+
+def _check_node(child, path):
+    if child is None:
+        raise exceptions.InvalidPath("Invalid path: {0!r}".format(path))
+    return child
+
+
+def _get_child(node, key, path, wanted):
+    """
+    Returns the value of the child ``key`` of ``node`` (if ``wanted``), along with the node to walk into for longer
+    paths: a config object, the dict a Ref resolved to, or None for leaves
+    """
+    if isinstance(node, Config):
+        child = node._value.get(key, NOTHING)
+        if child is NOTHING:
+            raise exceptions.InvalidPath("Invalid path: {0!r}".format(path))
+        if _is_node(child):
+            child = node._get_child_config(key)
+            return (child.get_value() if wanted else None), child
+        value = child._value if isinstance(child, Config) else child
+        if isinstance(value, (Ref, Computed)):
+            # a Ref to a node resolves to a dict, which longer paths can walk into
+            value = value.resolve(node)
+    else:
+        value = node.get(key, NOTHING)
+        if value is NOTHING:
+            raise exceptions.InvalidPath("Invalid path: {0!r}".format(path))
+    return value, (value if isinstance(value, dict) else None)
@@ -0,0 +1,386 @@
+import collections
+import copy
+import multiprocessing
+import threading
+from multiprocessing.connection import Client, Listener
+
+from .config import Config, _get_state, _is_node
+from .python3_compat import iteritems
+
+_PATCH = "patch"
+_SNAPSHOT = "snapshot"
+_SUBSCRIBE = "subscribe"
+
+
+class Publisher(object):
+    """
+    Publishes the changes made to a config object to :class:`Subscriber` objects in other processes, over a local
+    socket (``address`` is a filename for a Unix socket)::
+
+        publisher = Publisher(config, "/run/myapp/config.sock")
+        ...
+        config.assign_path("a.b", 3)  # reaches all subscribers
+
+    Changes are collected and published every ``batch_interval`` seconds (or on :func:`Publisher.flush`) as a
+    single versioned patch, holding the latest value of each path changed. The last ``history`` patches are kept for
+    subscribers catching up; subscribers which fall further behind, or whose backlog exceeds ``max_pending`` patches,
+    get a snapshot of the whole configuration instead.
+
+    Removals of paths are not published.
+
+    Connections are authenticated with ``authkey``, which defaults to the authkey of the current process
+    (:attr:`multiprocessing.Process.authkey`). That key is random, and inherited by the processes started through
+    :mod:`multiprocessing`, so only the processes of the same tree (or those given the key) can subscribe. Messages
+    are pickled, so subscribers and the publisher must trust each other: anyone holding the key can run code in them.
+    """
+
+    def __init__(
+        self,
+        config,
+        address,
+        authkey=None,
+        batch_interval=0.05,
+        history=1000,
+        max_pending=1000,
+    ):
+        super(Publisher, self).__init__()
+        self._config = config
+        self._state = _get_state(config)
+        self._lock = threading.Lock()
+        self._pending = collections.OrderedDict()
+        self._version = 0
+        self._history = collections.deque(maxlen=history)
+        self._subscriptions = []
+        self.max_pending = max_pending
+        self._closed = threading.Event()
+        self._authkey = authkey = _get_authkey(authkey)
+        self._listener = Listener(address, authkey=authkey)
+        self.address = self._listener.address
+        config.on_change(self._on_change)
+        self._threads = [_start_thread(self._accept)]
+        if batch_interval is not None:
+            self._threads.append(
+                _start_thread(self._flush_periodically, batch_interval)
+            )
+
+    def get_version(self):
+        """
+        Returns the version of the latest patch published
+        """
+        return self._version
+
+    def _on_change(self, path, value):
+        if isinstance(value, Config) or isinstance(value, dict):
+            value = _get_state(value)
+        else:
+            value = copy.deepcopy(value)
+        with self._lock:
+            self._pending.pop(path, None)
+            self._pending[path] = value
+
+    def flush(self):
+        """
+        Publishes the pending changes, if any
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            assignments = list(iteritems(self._pending))
+            self._pending.clear()
+            self._version += 1
+            message = (_PATCH, self._version, assignments)
+            self._history.append(message)
+            for path, value in assignments:
+                _set_path(self._state, path, value)
+            for subscription in self._subscriptions:
+                subscription.push(message)
+
+    def _flush_periodically(self, interval):
+        while not self._closed.wait(interval):
+            self.flush()
+
+    def _get_snapshot_message(self):
+        with self._lock:
+            return (_SNAPSHOT, self._version, copy.deepcopy(self._state))
+
+    def _accept(self):
+        while not self._closed.is_set():
+            try:
+                connection = self._listener.accept()
+            except Exception:
+                # failed handshakes (e.g. a wrong authkey) only affect the connecting client
+                continue
+            try:
+                kind, version = connection.recv()
+                if kind != _SUBSCRIBE:
+                    raise ValueError("Unexpected message {0!r}".format(kind))
+            except Exception:
+                connection.close()
+                continue
+            with self._lock:
+                if self._closed.is_set():
+                    connection.close()
+                    return
+                subscription = _Subscription(self, connection)
+                if version < self._version:
+                    if self._history and version >= self._history[0][1] - 1:
+                        for message in self._history:
+                            if message[1] > version:
+                                subscription.push(message)
+                    else:
+                        subscription.resync()
+                self._subscriptions.append(subscription)
+
+    def _remove(self, subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def get_num_subscribers(self):
+        with self._lock:
+            return len(self._subscriptions)
+
+    def close(self):
+        """
+        Publishes the pending changes, then stops accepting subscribers and disconnects the existing ones
+        """
+        self.flush()
+        self._closed.set()
+        try:
+            # wake up the accepting thread
+            Client(self.address, authkey=self._authkey).close()
+        except (EOFError, IOError, OSError):
+            pass
+        self._listener.close()
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.close()
+        for thread in self._threads:
+            thread.join()
+
+    def __repr__(self):
+        return "<Publisher {0} (version {1})>".format(self.address, self._version)
+
+
+class _Subscription(object):
+    """
+    Sends the messages of a publisher to a single subscriber from a thread of its own, so that slow subscribers do
+    not hold back the publisher
+    """
+
+    def __init__(self, publisher, connection):
+        super(_Subscription, self).__init__()
+        self._publisher = publisher
+        self._connection = connection
+        self._condition = threading.Condition()
+        self._pending = collections.deque()
+        self._resync = False
+        self._closed = False
+        self._thread = _start_thread(self._run)
+
+    def push(self, message):
+        with self._condition:
+            if len(self._pending) >= self._publisher.max_pending:
+                self._pending.clear()
+                self._resync = True
+            else:
+                self._pending.append(message)
+            self._condition.notify()
+
+    def resync(self):
+        with self._condition:
+            self._pending.clear()
+            self._resync = True
+            self._condition.notify()
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    while not (self._pending or self._resync or self._closed):
+                        self._condition.wait()
+                    if self._closed and not self._pending:
+                        return
+                    if self._resync:
+                        self._resync = False
+                        message = None
+                    else:
+                        message = self._pending.popleft()
+                if message is None:
+                    message = self._publisher._get_snapshot_message()
+                self._connection.send(message)
+        except (EOFError, IOError, OSError):
+            self._publisher._remove(self)
+        finally:
+            self._connection.close()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+
+class Subscriber(object):
+    """
+    Applies the patches published by a :class:`Publisher` to a config object in this process. Each patch is applied as
+    a single update, firing only the hooks of the nodes it changes.
+
+    ``version`` is the version of the publisher the config object is known to reflect, e.g. when forked from the
+    publishing process after the publisher was created. Missing patches are sent upon connection.
+
+    Patches are applied by :func:`Subscriber.poll`, which can be integrated into an event loop through
+    :func:`Subscriber.fileno`, or by a background thread started with :func:`Subscriber.start`.
+
+    ``authkey`` must be that of the publisher, and defaults to the authkey of the current process like that of
+    :class:`Publisher`
+    """
+
+    def __init__(self, config, address, authkey=None, version=0):
+        super(Subscriber, self).__init__()
+        self._config = config
+        self._address = address
+        self._authkey = _get_authkey(authkey)
+        self._version = version
+        self._connection = None
+        self._thread = None
+        self._closed = False
+        self.connect()
+
+    def get_version(self):
+        """
+        Returns the version of the latest patch applied
+        """
+        return self._version
+
+    def connect(self):
+        """
+        (Re)connects to the publisher, catching up from the latest version applied
+        """
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = Client(self._address, authkey=self._authkey)
+        self._connection.send((_SUBSCRIBE, self._version))
+
+    def fileno(self):
+        return self._connection.fileno()
+
+    def poll(self, timeout=0):
+        """
+        Applies the patches received, waiting up to ``timeout`` seconds for the first one. Returns the number of
+        messages applied
+        """
+        returned = 0
+        while self._connection.poll(timeout):
+            self._apply(self._connection.recv())
+            returned += 1
+            timeout = 0
+        return returned
+
+    def _apply(self, message):
+        kind, version, payload = message
+        if version <= self._version:
+            return
+        if kind == _SNAPSHOT:
+            self._config.apply_patch(self._config.diff(Config(payload)))
+        elif version != self._version + 1:
+            # patches were missed, ask for them again
+            self.connect()
+            return
+        else:
+            self._config.apply_patch(_get_patch(self._config, payload))
+        self._version = version
+
+    def start(self):
+        """
+        Starts applying patches from a background thread
+        """
+        self._thread = _start_thread(self._run)
+
+    def _run(self):
+        while not self._closed:
+            try:
+                self.poll(timeout=0.1)
+            except (EOFError, IOError, OSError):
+                return
+
+    def close(self):
+        self._closed = True
+        if self._thread is not None:
+            self._thread.join()
+        self._connection.close()
+
+    def __repr__(self):
+        return "<Subscriber {0} (version {1})>".format(self._address, self._version)
+
+
+def _get_authkey(authkey):
+    if authkey is None:
+        return multiprocessing.current_process().authkey
+    return authkey
+
+
+def _start_thread(target, *args):
+    returned = threading.Thread(target=target, args=args)
+    returned.daemon = True
+    returned.start()
+    return returned
+
+
+def _set_path(state, path, value):
+    components = path.split(".")
+    for component in components[:-1]:
+        child = state.get(component)
+        if not isinstance(child, dict):
+            child = state[component] = {}
+        state = child
+    state[components[-1]] = copy.deepcopy(value)
+
+
+def _get_patch(config, assignments):
+    """
+    Converts (path, value) assignments into a patch for :func:`Config.apply_patch`, adding missing nodes along the
+    way
+    """
+    returned = []
+    added = {}
+    for path, value in assignments:
+        components = tuple(path.split("."))
+        for index in range(1, len(components)):
+            added_value = added.get(components[:index])
+            if isinstance(added_value, dict):
+                _set_path(added_value, ".".join(components[index:]), value)
+                break
+        else:
+            _add_change(config, returned, added, components, value)
+    return returned
+
+
+def _add_change(config, patch, added, components, value):
+    node = config
+    for index, component in enumerate(components[:-1]):
+        if node.is_leaf() or component not in node._value:
+            value = _nest(components[index + 1 :], value)
+            components = components[: index + 1]
+            break
+        node = node._get_child_config(component)
+    path = ".".join(components)
+    key = components[-1]
+    if components in added:
+        patch[patch.index(("add", path, added[components]))] = ("add", path, value)
+    elif key not in node._value:
+        patch.append(("add", path, value))
+    elif _is_node(node._value[key]) or isinstance(value, dict):
+        patch.append(("remove", path, None))
+        patch.append(("add", path, value))
+    else:
+        patch.append(("change", path, value))
+        return
+    added[components] = value
+
+
+def _nest(components, value):
+    for component in reversed(components):
+        value = {component: value}
+    return value
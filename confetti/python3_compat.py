@@ -1,7 +1,7 @@
-import platform
+import sys
 from types import MethodType
 
-IS_PY3 = platform.python_version() >= "3"
+IS_PY3 = sys.version_info[0] >= 3
 
 if IS_PY3:
     iteritems = lambda d: iter(d.items())  # not dict.items!!! See above
@@ -11,6 +11,7 @@ if IS_PY3:
     basestring = str
     string_types = (basestring,)
     from functools import reduce
+    from sys import intern
 else:
     iteritems = (
         lambda d: d.iteritems()
@@ -21,6 +22,7 @@ else:
 
     string_types = (str,)
     from __builtin__ import reduce
+    from __builtin__ import intern
 
 
 def items_list(dictionary):
@@ -0,0 +1,307 @@
+import re
+from fnmatch import fnmatchcase
+
+from sentinels import NOTHING
+
+from .python3_compat import iteritems
+
+_ANY = "*"
+_ANY_DEPTH = "**"
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+class PathPattern(object):
+    """
+    A compiled dotted path pattern, e.g. ``services.*.pool.max_size`` or ``**.timeout``.
+
+    ``*`` matches exactly one path component, ``**`` matches zero or more components, and any other component
+    may contain shell-style wildcards (``db_*``)
+    """
+
+    def __init__(self, pattern):
+        super(PathPattern, self).__init__()
+        self.pattern = pattern
+        self._segments = []
+        for segment in pattern.split("."):
+            if segment == _ANY_DEPTH:
+                if self._segments and self._segments[-1] == (_ANY_DEPTH, None):
+                    continue
+                self._segments.append((_ANY_DEPTH, None))
+            elif segment == _ANY:
+                self._segments.append((_ANY, None))
+            elif _GLOB_CHARS.search(segment):
+                self._segments.append(("glob", segment))
+            else:
+                self._segments.append(("literal", segment))
+        self._regex = re.compile(_segments_to_regex(self._segments))
+
+    def get_last_literal(self):
+        """
+        Returns the last path component if it is a plain name, otherwise None
+        """
+        kind, value = self._segments[-1]
+        if kind == "literal":
+            return value
+        return None
+
+    def matches(self, path):
+        """
+        Returns whether a dotted path matches this pattern
+        """
+        return self._regex.match(path) is not None
+
+    def walk(self, config):
+        """
+        Yields (path, config_object) tuples for each config object under ``config`` matching the pattern, descending
+        only into branches that can still match
+        """
+        seen = set()
+        stack = [(config, 0, ())]
+        while stack:
+            node, index, components = stack.pop()
+            if index == len(self._segments):
+                if components and components not in seen:
+                    seen.add(components)
+                    yield ".".join(components), node
+                continue
+            kind, value = self._segments[index]
+            if kind == _ANY_DEPTH:
+                stack.append((node, index + 1, components))
+                if not node.is_leaf():
+                    for key in node.keys():
+                        stack.append(
+                            (node._get_child_config(key), index, components + (key,))
+                        )
+                continue
+            if node.is_leaf():
+                continue
+            if kind == "literal":
+                if value in node._value:
+                    stack.append(
+                        (
+                            node._get_child_config(value),
+                            index + 1,
+                            components + (value,),
+                        )
+                    )
+                continue
+            for key in node.keys():
+                if kind == _ANY or fnmatchcase(key, value):
+                    stack.append(
+                        (node._get_child_config(key), index + 1, components + (key,))
+                    )
+
+    def __repr__(self):
+        return "<PathPattern {0!r}>".format(self.pattern)
+
+
+class QueryIndex(object):
+    """
+    Maps every path name under a config object to the paths ending with it, allowing queries whose last component is
+    a plain name to only consider the relevant candidates
+    """
+
+    def __init__(self, config):
+        super(QueryIndex, self).__init__()
+        from .config import _is_node
+
+        self._paths_by_name = {}
+        self._all_paths = []
+        stack = [(config, ())]
+        while stack:
+            node, components = stack.pop()
+            for key, value in iteritems(node._value):
+                path = components + (key,)
+                self._all_paths.append(path)
+                self._paths_by_name.setdefault(key, []).append(path)
+                if _is_node(value):
+                    stack.append((node._get_child_config(key), path))
+
+    def query(self, config, pattern):
+        name = pattern.get_last_literal()
+        if name is None:
+            candidates = self._all_paths
+        else:
+            candidates = self._paths_by_name.get(name, ())
+        for components in candidates:
+            path = ".".join(components)
+            if pattern.matches(path):
+                node = config
+                for component in components:
+                    node = node._get_child_config(component)
+                yield path, node
+
+
+_pattern_cache = {}
+
+# like the ``re`` module, the cache is simply emptied when full
+_MAX_CACHED_PATTERNS = 512
+
+
+def compile_pattern(pattern):
+    """
+    Returns a :class:`PathPattern` for the given pattern string, reusing previously compiled patterns
+    """
+    if isinstance(pattern, PathPattern):
+        return pattern
+    returned = _pattern_cache.get(pattern)
+    if returned is None:
+        if len(_pattern_cache) >= _MAX_CACHED_PATTERNS:
+            _pattern_cache.clear()
+        returned = _pattern_cache[pattern] = PathPattern(pattern)
+    return returned
+
+
+def _segments_to_regex(segments):
+    parts = []
+    for index, (kind, value) in enumerate(segments):
+        is_first = index == 0
+        is_last = index == len(segments) - 1
+        if kind == _ANY_DEPTH:
+            if is_first and is_last:
+                parts.append(r"[^.]+(?:\.[^.]+)*")
+            elif is_first:
+                parts.append(r"(?:[^.]+\.)*")
+            else:
+                parts.append(r"(?:\.[^.]+)*")
+            continue
+        if index > 0 and (segments[index - 1][0] != _ANY_DEPTH or index > 1):
+            parts.append(r"\.")
+        if kind == _ANY:
+            parts.append(r"[^.]+")
+        elif kind == "glob":
+            parts.append(_glob_to_regex(value))
+        else:
+            parts.append(re.escape(value))
+    return "".join(parts) + r"\Z"
+
+
+def _glob_to_regex(glob):
+    returned = []
+    index = 0
+    while index < len(glob):
+        char = glob[index]
+        index += 1
+        if char == "*":
+            returned.append(r"[^.]*")
+        elif char == "?":
+            returned.append(r"[^.]")
+        elif char == "[":
+            end = glob.find("]", index)
+            if end == -1:
+                returned.append(re.escape(char))
+                continue
+            body = glob[index:end]
+            index = end + 1
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            returned.append("[{0}]".format(body))
+        else:
+            returned.append(re.escape(char))
+    return "".join(returned)
+
+
+class MetadataIndex(object):
+    """
+    An inverted index from metadata keys and values to the paths of the config objects carrying them
+    """
+
+    def __init__(self, config):
+        super(MetadataIndex, self).__init__()
+        self._metadata_by_path = {}
+        self._paths_by_key = {}
+        self._paths_by_value = {}
+        self._trie = {}
+        self._add_children(config, ())
+
+    def find(self, key, value=NOTHING):
+        """
+        Returns the set of paths whose metadata contains ``key`` (with the value ``value``, if given)
+        """
+        if value is NOTHING:
+            return self._paths_by_key.get(key, frozenset())
+        try:
+            return self._paths_by_value.get((key, value), frozenset())
+        except TypeError:
+            return set(
+                path
+                for path in self._paths_by_key.get(key, ())
+                if self._metadata_by_path[path][key] == value
+            )
+
+    def refresh(self, components, config, keys):
+        """
+        Reindexes ``config``, residing under ``components``, or only its children named in ``keys`` if given
+        """
+        if keys is None:
+            if not components:
+                self.__init__(config)
+                return
+            self._remove(components)
+            self._add(config, components)
+            return
+        for key in keys:
+            self._remove(components + (key,))
+            child = config._value.get(key, NOTHING)
+            if child is not NOTHING:
+                self._add(child, components + (key,))
+
+    def _add(self, value, components):
+        from .config import Config
+
+        stack = [(value, components)]
+        while stack:
+            value, components = stack.pop()
+            if isinstance(value, Config):
+                if value.metadata:
+                    self._add_metadata(components, value.metadata)
+                if value.is_leaf():
+                    continue
+                value = value._value
+            elif not isinstance(value, dict):
+                continue
+            for key, child in iteritems(value):
+                stack.append((child, components + (key,)))
+
+    def _add_children(self, config, components):
+        for key, value in iteritems(config._value):
+            self._add(value, components + (key,))
+
+    def _add_metadata(self, components, metadata):
+        path = ".".join(components)
+        metadata = self._metadata_by_path[path] = dict(metadata)
+        for key, value in iteritems(metadata):
+            self._paths_by_key.setdefault(key, set()).add(path)
+            try:
+                self._paths_by_value.setdefault((key, value), set()).add(path)
+            except TypeError:
+                pass
+        trie = self._trie
+        for component in components:
+            trie = trie.setdefault(component, {})
+
+    def _remove(self, components):
+        trie = self._trie
+        for component in components[:-1]:
+            trie = trie.get(component)
+            if trie is None:
+                return
+        removed = trie.pop(components[-1], None)
+        if removed is None:
+            return
+        stack = [(components, removed)]
+        while stack:
+            components, children = stack.pop()
+            metadata = self._metadata_by_path.pop(".".join(components), None)
+            if metadata is not None:
+                self._discard(".".join(components), metadata)
+            for key, grandchildren in iteritems(children):
+                stack.append((components + (key,), grandchildren))
+
+    def _discard(self, path, metadata):
+        for key, metadata_value in iteritems(metadata):
+            self._paths_by_key[key].discard(path)
+            try:
+                self._paths_by_value[(key, metadata_value)].discard(path)
+            except (TypeError, KeyError):
+                pass
@@ -1,26 +1,361 @@
-from .exceptions import CannotResolveError
+import weakref
 
+from sentinels import NOTHING
+
+from .exceptions import CannotResolveError, CyclicReferenceError
+from .python3_compat import iteritems
 
-class Ref(object):
 
+class Ref(object):
     def __init__(self, target, filter=None):
         super(Ref, self).__init__()
         self._target = target
         self._filter = filter
-
-    def resolve(self, config):
-        target = self._target
         if target.startswith("."):
             target = target[1:]
-        while target.startswith("."):
-            target = target[1:]
-            if config is None:
+        stripped = target.lstrip(".")
+        self._levels = len(target) - len(stripped)
+        self._components = tuple(stripped.split("."))
+        # weak references to the config object containing the reference and to its anchor, cleared when a node
+        # between them is detached from its parent
+        self._anchor = None
+
+    def invalidate_anchor(self):
+        """
+        Discards the cached anchor of the reference. Called for the references under a node detached from its parent
+        """
+        self._anchor = None
+
+    def resolve(self, config):
+        anchor = self._anchor
+        returned = None
+        if anchor is not None and anchor[0]() is config:
+            returned = anchor[1]()
+        if returned is None:
+            returned = self._get_anchor(config)
+            self._anchor = (weakref.ref(config), weakref.ref(returned))
+        for component in self._components:
+            if returned.is_leaf() or component not in returned._value:
                 raise CannotResolveError("Cannot resolve {0}".format(self._target))
-            config = config.get_parent()
-        try:
-            returned = config.get_path(target)
-        except LookupError:
-            raise CannotResolveError("Cannot resolve {0}".format(self._target))
+            returned = returned._get_child_config(component)
+        if returned.is_leaf() and isinstance(returned._value, Computed):
+            returned = returned._value.resolve(returned)
+        else:
+            returned = returned.get_value()
         if self._filter is not None:
             returned = self._filter(returned)
         return returned
+
+    def _get_anchor(self, config):
+        for _ in range(self._levels):
+            if config is None:
+                break
+            config = config.get_parent()
+        if config is None:
+            raise CannotResolveError("Cannot resolve {0}".format(self._target))
+        return config
+
+    def get_target_components(self, components):
+        """
+        Returns the absolute path components referred to by this reference, given the path components of the config
+        object containing it. Returns None if the target lies above the first component
+        """
+        if self._levels > len(components):
+            return None
+        return tuple(components[: len(components) - self._levels]) + self._components
+
+    def __getstate__(self):
+        returned = self.__dict__.copy()
+        returned["_anchor"] = None
+        return returned
+
+    def __repr__(self):
+        return "<Ref {0!r}>".format(self._target)
+
+
+class Computed(object):
+    """
+    A leaf whose value is computed by ``func`` from other values in the config. ``func`` is called with a proxy of the
+    root of the tree, similar to ``config.root``, and the result is cached until any of the leaves read through that
+    proxy changes:
+
+    >>> from confetti import Config
+    >>> config = Config({
+    ...     "host": "localhost", "port": 80,
+    ...     "url": Computed(lambda root: "http://{0}:{1}".format(root.host, root.port)),
+    ... })
+    >>> config.root.url
+    'http://localhost:80'
+    >>> config.root.port = 8080
+    >>> config.root.url
+    'http://localhost:8080'
+
+    References read by ``func`` are followed, and the leaves they point to are tracked as well
+    """
+
+    def __init__(self, func):
+        super(Computed, self).__init__()
+        self._func = func
+        self._root = None
+        self._generation = None
+        self._value = None
+        self._dependencies = None
+        self._evaluating = False
+
+    def resolve(self, config):
+        root = config
+        while root._parent is not None:
+            root = root._parent
+        if (
+            self._root is root
+            and self._generation == root._structure_generation
+            and all(
+                node._value.get(key) is child and child.version == version
+                for _, node, key, child, version in self._dependencies
+            )
+        ):
+            return self._value
+        if self._evaluating:
+            raise CyclicReferenceError("Cyclic computed value")
+        tracker = _Tracker(root)
+        self._evaluating = True
+        try:
+            value = self._func(_TrackingProxy(tracker, root, ()))
+        finally:
+            self._evaluating = False
+        self._root = root
+        self._generation = root._structure_generation
+        self._value = value
+        self._dependencies = tracker.dependencies
+        return value
+
+    def get_dependencies(self):
+        """
+        Returns the paths read during the latest evaluation
+        """
+        if self._dependencies is None:
+            return []
+        return sorted(set(".".join(d[0]) for d in self._dependencies))
+
+    def __getstate__(self):
+        returned = self.__dict__.copy()
+        returned.update(_root=None, _generation=None, _value=None, _dependencies=None)
+        return returned
+
+    def __repr__(self):
+        return "<Computed {0!r}>".format(self._func)
+
+
+class _Tracker(object):
+    """
+    Reads values on behalf of a :class:`Computed` leaf, recording every config object read along with its version
+    """
+
+    def __init__(self, root):
+        super(_Tracker, self).__init__()
+        self.root = root
+        self.dependencies = []
+
+    def get(self, node, components, key):
+        if node.is_leaf() or key not in node._value:
+            raise KeyError(key)
+        child = node._get_child_config(key)
+        components = components + (key,)
+        if not child.is_leaf():
+            return _TrackingProxy(self, child, components)
+        self.dependencies.append((components, node, key, child, child.version))
+        value = child._value
+        if isinstance(value, Ref):
+            return self._resolve_ref(value, node, components[:-1])
+        if isinstance(value, Computed):
+            returned = value.resolve(child)
+            self.dependencies.extend(value._dependencies)
+            return returned
+        return value
+
+    def _resolve_ref(self, ref, node, components):
+        target = ref.get_target_components(components)
+        if target is None:
+            return ref.resolve(node)
+        parent = self.root
+        for component in target[:-1]:
+            if parent.is_leaf() or component not in parent._value:
+                raise CannotResolveError("Cannot resolve {0}".format(ref._target))
+            parent = parent._get_child_config(component)
+        try:
+            returned = self.get(parent, target[:-1], target[-1])
+        except KeyError:
+            raise CannotResolveError("Cannot resolve {0}".format(ref._target))
+        if isinstance(returned, _TrackingProxy):
+            child = returned._config
+            self.dependencies.append((target, parent, target[-1], child, child.version))
+            returned = child.get_value()
+        if ref._filter is not None:
+            returned = ref._filter(returned)
+        return returned
+
+
+class _TrackingProxy(object):
+    def __init__(self, tracker, config, components):
+        super(_TrackingProxy, self).__init__()
+        self._tracker = tracker
+        self._config = config
+        self._components = components
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        try:
+            return self._tracker.get(self._config, self._components, attr)
+        except KeyError:
+            raise AttributeError(attr)
+
+    def __getitem__(self, item):
+        return self._tracker.get(self._config, self._components, item)
+
+    def __dir__(self):
+        return list(self._config.keys())
+
+
+def materialize(config, in_place=False):
+    """
+    Resolves all references and computed values under ``config`` in dependency order, returning the resolved dict
+
+    .. seealso:: :func:`Config.materialize_refs <confetti.config.Config.materialize_refs>`
+    """
+    from .config import Config, _get_state, _notify_updates
+
+    refs, computed = _collect_refs(config)
+    order = _sort_refs(refs)
+    state = _get_state(config)
+    # computed values read the live tree, in which references are followed anyway, so they are resolved first
+    for components, (value, container) in iteritems(computed):
+        _set_state_path(state, components, _get_state(value.resolve(container)))
+    resolved = {}
+    for components in order:
+        ref, container, key = refs[components]
+        target = ref.get_target_components(components[:-1])
+        if target is None:
+            value = ref.resolve(container)
+        else:
+            value = _get_state_path(state, target, ref)
+            if ref._filter is not None:
+                value = ref._filter(value)
+            elif isinstance(value, dict):
+                value = _get_state(value)
+        _set_state_path(state, components, value)
+        resolved[components] = value
+    if in_place:
+        updated = []
+        for components, value in iteritems(resolved):
+            _, container, key = refs[components]
+            child = container._value[key]
+            value = _get_state(value)
+            if isinstance(value, dict):
+                value = Config(value, parent=container)
+                value.metadata = getattr(child, "metadata", None)
+                container._value[key] = value
+                container._notify_structure_change([key])
+            elif isinstance(child, Ref):
+                container._value[key] = value
+                updated.append(container)
+            else:
+                child._value = value
+                updated.append(child)
+        _notify_updates(updated)
+    return state
+
+
+def _collect_refs(config):
+    from .config import Config
+    from .lazy import Lazy
+
+    refs = {}
+    computed = {}
+    stack = [(config, ())]
+    while stack:
+        node, components = stack.pop()
+        for key, value in iteritems(node._value):
+            if isinstance(value, Config):
+                if value.is_leaf():
+                    value = value._value
+                else:
+                    stack.append((value, components + (key,)))
+                    continue
+            elif isinstance(value, (dict, Lazy)):
+                # lazy subtrees are loaded, as they are part of the returned state
+                value = node._get_child_config(key)
+                if not value.is_leaf():
+                    stack.append((value, components + (key,)))
+                    continue
+                value = value._value
+            if isinstance(value, Ref):
+                refs[components + (key,)] = (value, node, key)
+            elif isinstance(value, Computed):
+                computed[components + (key,)] = (value, node)
+    return refs, computed
+
+
+def _sort_refs(refs):
+    refs_by_prefix = {}
+    for components in refs:
+        for index in range(len(components)):
+            refs_by_prefix.setdefault(components[:index], []).append(components)
+
+    dependencies = {}
+    for components, (ref, _, _) in iteritems(refs):
+        target = ref.get_target_components(components[:-1])
+        if target is None:
+            dependencies[components] = ()
+        else:
+            dependencies[components] = [
+                target[:index]
+                for index in range(1, len(target))
+                if target[:index] in refs
+            ]
+            if target in refs:
+                dependencies[components].append(target)
+            else:
+                dependencies[components].extend(refs_by_prefix.get(target, ()))
+
+    returned = []
+    visited = set()
+    for start in sorted(refs):
+        if start in visited:
+            continue
+        stack = [(start, iter(dependencies[start]))]
+        in_progress = set([start])
+        while stack:
+            components, remaining = stack[-1]
+            dependency = next(remaining, NOTHING)
+            if dependency is NOTHING:
+                stack.pop()
+                in_progress.discard(components)
+                visited.add(components)
+                returned.append(components)
+            elif dependency in in_progress:
+                cycle = [c for c, _ in stack]
+                cycle = cycle[cycle.index(dependency) :] + [dependency]
+                raise CyclicReferenceError(
+                    "Cyclic reference: {0}".format(
+                        " -> ".join(".".join(c) for c in cycle)
+                    )
+                )
+            elif dependency not in visited:
+                stack.append((dependency, iter(dependencies[dependency])))
+                in_progress.add(dependency)
+    return returned
+
+
+def _get_state_path(state, components, ref):
+    for component in components:
+        if not isinstance(state, dict) or component not in state:
+            raise CannotResolveError("Cannot resolve {0}".format(ref._target))
+        state = state[component]
+    return state
+
+
+def _set_state_path(state, components, value):
+    for component in components[:-1]:
+        state = state[component]
+    state[components[-1]] = value
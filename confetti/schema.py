@@ -0,0 +1,198 @@
+from sentinels import NOTHING
+
+from .config import Config, _is_node
+from .exceptions import ValidationError
+from .python3_compat import iteritems, string_types
+from .ref import Computed, Ref
+
+_NUMERIC_TYPES = (int, float)
+_RESOLVED_ON_READ = (Computed, Ref)
+
+
+class Schema(object):
+    """
+    A table of leaf validators indexed by path, compiled from the leaves of a config object
+
+    .. seealso:: :func:`Config.compile_schema <confetti.config.Config.compile_schema>`
+    """
+
+    def __init__(self, validators, nodes):
+        super(Schema, self).__init__()
+        self._validators = validators
+        self._nodes = nodes
+
+    def get_validator(self, path):
+        """
+        Returns the validator of the leaf at ``path``, or None if the leaf is not type-checked
+        """
+        return self._validators.get(path)
+
+    def get_errors(self, overlay):
+        """
+        Returns a list of (path, message) tuples for every problem found in ``overlay``, a (possibly partial) nested
+        dict or config object
+        """
+        errors = []
+        stack = [("", overlay)]
+        while stack:
+            prefix, node = stack.pop()
+            if isinstance(node, Config):
+                node = node._value
+            for key, value in iteritems(node):
+                path = prefix + key
+                if path in self._nodes:
+                    if _is_node(value):
+                        stack.append((path + ".", value))
+                    else:
+                        errors.append((path, "Cannot replace a node with a value"))
+                    continue
+                validator = self._validators.get(path, NOTHING)
+                if validator is NOTHING:
+                    errors.append((path, "Unknown path"))
+                    continue
+                if _is_node(value):
+                    errors.append((path, "Cannot replace a value with a node"))
+                    continue
+                if validator is None:
+                    continue
+                if isinstance(value, Config):
+                    value = value._value
+                message = validator.get_error(value)
+                if message is not None:
+                    errors.append((path, message))
+        return sorted(errors)
+
+    def validate(self, overlay):
+        """
+        Validates ``overlay``, a (possibly partial) nested dict or config object, in a single pass. Raises
+        :class:`.exceptions.ValidationError` listing all problems found
+        """
+        errors = self.get_errors(overlay)
+        if errors:
+            raise ValidationError(errors)
+
+    def __repr__(self):
+        return "<Schema ({0} leaves)>".format(len(self._validators))
+
+
+class LeafValidator(object):
+    """
+    Checks values assigned to a single leaf against its type and the constraints in its metadata:
+
+    * ``type`` - overrides the type deduced from the default value
+    * ``choices`` - a collection of allowed values
+    * ``min_value``/``max_value`` - inclusive bounds
+    * ``validator`` - a callable returning False for invalid values
+    """
+
+    def __init__(
+        self,
+        path,
+        type=None,
+        choices=None,
+        min_value=None,
+        max_value=None,
+        validator=None,
+    ):
+        super(LeafValidator, self).__init__()
+        self.path = path
+        self.type = type
+        self.choices = choices
+        self.min_value = min_value
+        self.max_value = max_value
+        self.validator = validator
+
+    @classmethod
+    def from_leaf(cls, path, value, metadata):
+        if metadata is None:
+            metadata = {}
+        leaf_type = metadata.get("type")
+        if (
+            leaf_type is None
+            and value is not None
+            and not isinstance(value, _RESOLVED_ON_READ)
+        ):
+            leaf_type = type(value)
+        returned = cls(
+            path,
+            type=leaf_type,
+            choices=metadata.get("choices"),
+            min_value=metadata.get("min_value"),
+            max_value=metadata.get("max_value"),
+            validator=metadata.get("validator"),
+        )
+        if returned.is_trivial():
+            return None
+        return returned
+
+    def is_trivial(self):
+        return (
+            self.type is None
+            and self.choices is None
+            and self.min_value is None
+            and self.max_value is None
+            and self.validator is None
+        )
+
+    def get_error(self, value):
+        """
+        Returns a message describing why ``value`` is invalid, or None if it is valid
+        """
+        if value is None or isinstance(value, _RESOLVED_ON_READ):
+            return None
+        if self.type is not None and not _is_instance(value, self.type):
+            return "Expected {0}, got {1!r}".format(self.type.__name__, value)
+        if self.choices is not None and value not in self.choices:
+            return "{0!r} is not one of {1!r}".format(value, self.choices)
+        if self.min_value is not None and value < self.min_value:
+            return "{0!r} is smaller than {1!r}".format(value, self.min_value)
+        if self.max_value is not None and value > self.max_value:
+            return "{0!r} is greater than {1!r}".format(value, self.max_value)
+        if self.validator is not None and self.validator(value) is False:
+            return "{0!r} is invalid".format(value)
+        return None
+
+    def check(self, value):
+        """
+        Raises :class:`.exceptions.ValidationError` if ``value`` is invalid
+        """
+        message = self.get_error(value)
+        if message is not None:
+            raise ValidationError([(self.path, message)])
+
+
+def compile_schema(config, enforce=False):
+    """
+    Compiles a :class:`Schema` from the leaves of ``config``
+
+    .. seealso:: :func:`Config.compile_schema <confetti.config.Config.compile_schema>`
+    """
+    validators = {}
+    nodes = set()
+    stack = [("", config)]
+    while stack:
+        prefix, node = stack.pop()
+        for key, value in iteritems(node._value):
+            path = prefix + key
+            if _is_node(value):
+                nodes.add(path)
+                stack.append((path + ".", node._get_child_config(key)))
+                continue
+            if isinstance(value, Config):
+                validator = LeafValidator.from_leaf(path, value._value, value.metadata)
+            else:
+                validator = LeafValidator.from_leaf(path, value, None)
+            validators[path] = validator
+            if enforce and validator is not None:
+                node._get_child_config(key)._validator = validator
+    return Schema(validators, nodes)
+
+
+def _is_instance(value, leaf_type):
+    if leaf_type is bool or isinstance(value, bool):
+        return leaf_type is bool and isinstance(value, bool)
+    if leaf_type in string_types:
+        return isinstance(value, string_types)
+    if leaf_type in _NUMERIC_TYPES and leaf_type is not int:
+        return isinstance(value, _NUMERIC_TYPES)
+    return isinstance(value, leaf_type)
@@ -1,4 +1,3 @@
-from ast import literal_eval
 from .exceptions import CannotDeduceType
 
 _COMPOUND_TYPES = [list, tuple, dict]
@@ -13,12 +12,21 @@ def coerce_leaf_value(path, value, leaf, default_type=None):
         leaf_type = default_type
     if leaf_type is None:
         raise CannotDeduceType("Cannot deduce type of path {0!r}".format(path))
+    from .arrays import NumericArray
+
     if leaf_type is bool:
         value = value.lower()
         if value not in _VALUES_FOR_TRUE and value not in _VALUES_FOR_FALSE:
             raise ValueError("Invalid value for boolean: {0!r}".format(value))
         return value in _VALUES_FOR_TRUE
+    if leaf_type is NumericArray:
+        return NumericArray.parse(
+            value, typecode=leaf.typecode if leaf is not None else "d"
+        )
     if leaf_type in _COMPOUND_TYPES:
+        # imported here, as ast is slow to import and rarely needed
+        from ast import literal_eval
+
         return literal_eval(value)
     return leaf_type(value)
 
@@ -0,0 +1,103 @@
+from confetti import Config, Metadata, Ref
+from confetti import exceptions
+from confetti.accessors import get_accessor_class
+
+import pytest
+
+
+@pytest.fixture
+def config():
+    return Config(
+        {
+            "a": {"b": {"c": 1}, "ref": Ref(".b.c"), "tagged": 3 // Metadata(x=1)},
+            "class": 5,
+            "value": 2,
+        }
+    )
+
+
+def test_leaf_and_node_access(config):
+    root = config.compile_root()
+    assert root.value == 2
+    assert root.a.b.c == 1
+    assert root.a.ref == 1
+    assert root.a.tagged == 3
+
+
+def test_non_identifier_keys_fall_back_to_proxy(config):
+    root = config.compile_root()
+    assert root["class"] == 5
+    assert getattr(root, "class") == 5
+    with pytest.raises(AttributeError):
+        root.nonexisting
+
+
+def test_setting_values(config):
+    hooks = []
+    config.on_update(hooks.append)
+    root = config.compile_root()
+    root.a.b.c = 7
+    assert root.a.b.c == 7
+    assert config.root.a.b.c == 7
+    assert hooks
+    root.a.tagged = 4
+    assert config["a"]["tagged"] == 4
+    assert config.get_config("a.tagged").metadata == {"x": 1}
+
+
+def test_setting_values_is_validated(config):
+    config.compile_schema(enforce=True)
+    root = config.compile_root()
+    with pytest.raises(exceptions.ValidationError):
+        root.a.b.c = "x"
+    assert root.a.b.c == 1
+
+
+def test_accessor_is_cached_until_structure_changes(config):
+    root = config.compile_root()
+    assert config.compile_root() is root
+    root.value = 3
+    assert config.compile_root() is root
+    config["a"].extend({"new": 1})
+    new_root = config.compile_root()
+    assert new_root is not root
+    assert new_root.a.new == 1
+    assert type(new_root.a.b) is type(root.a.b)
+
+
+def test_classes_are_reused_for_identical_structures():
+    first = Config({"x": 1, "y": {"z": 2}})
+    second = Config({"x": "a", "y": {"z": None}})
+    assert get_accessor_class(first) is get_accessor_class(second)
+    assert get_accessor_class(first) is not get_accessor_class(Config({"x": 1}))
+
+
+def test_dir(config):
+    assert sorted(dir(config.compile_root().a)) == ["b", "ref", "tagged"]
+
+
+def test_replaced_children_are_read(config):
+    root = config.compile_root()
+    config.get_config("a.b")._assign_value({"c": 5})
+    assert root.a.b.c == 5
+
+
+def test_class_cache_is_bounded():
+    from confetti import accessors
+
+    for index in range(accessors._MAX_CACHED_CLASSES * 2):
+        get_accessor_class(Config({"x{0}".format(index): 1}))
+    assert len(accessors._classes_by_signature) <= accessors._MAX_CACHED_CLASSES
+
+
+def test_setting_nodes_writes_through(config):
+    root = config.compile_root()
+    root.a.b = {"c": 2, "d": 3}
+    assert config.root.a.b.d == 3
+    assert root.a.b.c == 2
+    assert root.a.b.d == 3
+    root.a.b = 5
+    assert config.root.a.b == 5
+    assert root.a.b == 5
+    config["a"]["b"] = 6
+    assert root.a.b == 6
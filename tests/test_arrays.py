@@ -0,0 +1,115 @@
+import copy
+import io
+import json
+import pickle
+
+import pytest
+
+from confetti import Config, NumericArray
+
+
+@pytest.fixture
+def config():
+    return Config(
+        {
+            "weights": NumericArray([0.5, 1.5, 2.5]),
+            "buckets": NumericArray([1, 5, 10], "i"),
+        }
+    )
+
+
+def test_sequence():
+    values = NumericArray([1, 2, 3])
+    assert len(values) == 3
+    assert list(values) == [1.0, 2.0, 3.0]
+    assert values[1] == 2.0
+    assert values[1:] == [2.0, 3.0]
+    assert values == NumericArray([1, 2, 3])
+    assert values != NumericArray([1, 2])
+    assert values.typecode == "d"
+
+
+def test_memoryview_is_readonly(config):
+    view = config["weights"].memoryview()
+    assert view.tolist() == [0.5, 1.5, 2.5]
+    assert view.readonly
+
+
+def test_numpy(config):
+    numpy = pytest.importorskip("numpy")
+    values = numpy.asarray(config["buckets"])
+    assert values.tolist() == [1, 5, 10]
+    assert not values.flags.writeable
+
+
+def test_backup_and_serialize_share_array(config):
+    weights = config["weights"]
+    assert config.serialize_to_dict()["weights"] is weights
+    assert copy.deepcopy(config)["weights"] is weights
+    config.backup()
+    config["weights"] = NumericArray([3])
+    config.restore()
+    assert config["weights"] is weights
+
+
+def test_pickle(config):
+    unpickled = pickle.loads(pickle.dumps(config))
+    assert unpickled["weights"] == [0.5, 1.5, 2.5]
+    assert unpickled["buckets"].typecode == "i"
+
+
+@pytest.mark.parametrize(
+    "string", ["[1, 2.5, 3]", "1 2.5 3", "(1,2.5,3)", " 1 ,  2.5\n3 "]
+)
+def test_parse(string):
+    assert NumericArray.parse(string) == [1, 2.5, 3]
+
+
+def test_parse_empty():
+    assert len(NumericArray.parse("[]")) == 0
+
+
+def test_parse_invalid():
+    with pytest.raises(ValueError):
+        NumericArray.parse("[1, x]")
+    with pytest.raises(ValueError):
+        NumericArray.parse("1.5", typecode="i")
+
+
+def test_assign_path_deduces_type(config):
+    config.assign_path("buckets", "[2, 4, 8, 16]", deduce_type=True)
+    assert config["buckets"] == [2, 4, 8, 16]
+    assert config["buckets"].typecode == "i"
+
+
+def test_load_environ(config):
+    config.load_environ(environ={"APP__WEIGHTS": "0.25 0.75"})
+    assert config["weights"] == [0.25, 0.75]
+
+
+def test_fingerprint(config):
+    other = copy.deepcopy(config)
+    assert other.fingerprint() == config.fingerprint()
+    other["weights"] = NumericArray([0.5, 1.5, 2.6])
+    assert other.fingerprint() != config.fingerprint()
+
+
+def test_diff(config):
+    other = copy.deepcopy(config)
+    assert config.diff(other) == []
+    other["buckets"] = NumericArray([1, 5, 11], "i")
+    assert [path for _, path, _ in config.diff(other)] == ["buckets"]
+
+
+def test_dump(config):
+    f = io.StringIO() if str is not bytes else io.BytesIO()
+    config.dump(f)
+    assert json.loads(f.getvalue()) == {
+        "weights": [0.5, 1.5, 2.5],
+        "buckets": [1, 5, 10],
+    }
+
+
+def test_memory_usage():
+    config = Config({"a": NumericArray(range(10000))})
+    assert config.get_memory_usage()[0][1] > 80000
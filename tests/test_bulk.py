@@ -0,0 +1,98 @@
+import pickle
+
+import pytest
+from confetti import Config
+from confetti.bulk import load_files
+
+
+@pytest.fixture
+def base():
+    return Config({"db": {"host": "localhost", "port": 5432}, "debug": False})
+
+
+def _write(tmpdir, name, source):
+    returned = tmpdir.join(name)
+    returned.write(source)
+    return str(returned)
+
+
+@pytest.fixture
+def filenames(tmpdir):
+    return [
+        _write(
+            tmpdir,
+            "tenant{0}.py".format(index),
+            'CONFIG = {{"db": {{"host": "db{0}", "port": {0}}}, "debug": True}}'.format(
+                index
+            ),
+        )
+        for index in range(5)
+    ]
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_load_files(filenames, processes):
+    results = load_files(filenames, processes=processes)
+    assert [result.filename for result in results] == filenames
+    assert all(result.is_valid() for result in results)
+    assert [result.get_config().root.db.host for result in results] == [
+        "db{0}".format(index) for index in range(5)
+    ]
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_validation(tmpdir, base, filenames, processes):
+    invalid = [
+        _write(tmpdir, "missing.py", 'CONFIG = {"db": {"host": "x"}, "debug": True}'),
+        _write(
+            tmpdir,
+            "types.py",
+            'CONFIG = {"db": {"host": "x", "port": "80"}, "debug": True, "extra": 1}',
+        ),
+        _write(tmpdir, "broken.py", "CONFIG = {"),
+    ]
+    results = load_files(filenames + invalid, base=base, processes=processes)
+    assert all(result.is_valid() for result in results[:5])
+    assert [result.errors for result in results[5:7]] == [
+        [("db.port", "Missing path")],
+        [("db.port", "Expected int, got '80'"), ("extra", "Unknown path")],
+    ]
+    [(path, message)] = results[7].errors
+    assert path == ""
+    assert message.startswith("Cannot load")
+    assert results[7].get_config() is None
+
+
+def test_metadata_is_kept(tmpdir):
+    filename = _write(
+        tmpdir,
+        "metadata.py",
+        "from confetti import Metadata\n"
+        'CONFIG = {"a": {"b": 1 // Metadata(secret=True)}}',
+    )
+    [result] = load_files([filename])
+    assert result.get_config().get_config("a.b").metadata == {"secret": True}
+
+
+def test_results_are_picklable(filenames):
+    [result] = load_files(filenames[:1])
+    unpickled = pickle.loads(pickle.dumps(result))
+    assert unpickled.filename == result.filename
+    assert unpickled.get_config().serialize_to_dict() == (
+        result.get_config().serialize_to_dict()
+    )
+
+
+def test_unpicklable_result_is_reported(tmpdir, filenames):
+    unpicklable = _write(
+        tmpdir,
+        "unpicklable.py",
+        "from confetti import Ref\n"
+        'CONFIG = {"a": {"b": 1}, "c": Ref(".a.b", filter=lambda v: str(v))}',
+    )
+    results = load_files(filenames + [unpicklable], processes=2)
+    assert all(result.is_valid() for result in results[:-1])
+    [(path, message)] = results[-1].errors
+    assert path == ""
+    assert message.startswith("Cannot send")
+    assert results[-1].get_config() is None
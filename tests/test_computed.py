@@ -0,0 +1,143 @@
+import pytest
+from confetti import Computed, Config, Ref
+from confetti import exceptions
+
+
+class _Counter(object):
+    def __init__(self, func):
+        super(_Counter, self).__init__()
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, root):
+        self.calls += 1
+        return self.func(root)
+
+
+@pytest.fixture
+def url_func():
+    return _Counter(
+        lambda root: "{0}://{1}:{2}".format(
+            root.server.scheme, root.server.host, root.server.port
+        )
+    )
+
+
+@pytest.fixture
+def config(url_func):
+    return Config(
+        {
+            "server": {"scheme": "http", "host": "localhost", "port": 80},
+            "other": 1,
+            "url": Computed(url_func),
+        }
+    )
+
+
+def test_computed_value(config):
+    assert config["url"] == "http://localhost:80"
+    assert config.root.url == "http://localhost:80"
+
+
+def test_cached(config, url_func):
+    for _ in range(3):
+        assert config.root.url == "http://localhost:80"
+    assert url_func.calls == 1
+
+
+def test_dependencies(config):
+    computed = config.get_config("url").get_value()
+    assert computed.get_dependencies() == []
+    config.root.url
+    assert computed.get_dependencies() == [
+        "server.host",
+        "server.port",
+        "server.scheme",
+    ]
+
+
+def test_invalidated_by_dependency(config, url_func):
+    config.root.url
+    config.root.server.port = 8080
+    assert config.root.url == "http://localhost:8080"
+    config.assign_path("server.host", "example.com")
+    assert config.root.url == "http://example.com:8080"
+    assert url_func.calls == 3
+
+
+def test_not_invalidated_by_unrelated_change(config, url_func):
+    config.root.url
+    config.root.other = 2
+    config.extend({"new": 1})
+    config.root.url
+    assert url_func.calls <= 2
+    config.root.other = 3
+    config.root.url
+    assert url_func.calls <= 2
+
+
+def test_invalidated_by_replacing_node(config):
+    config.root.url
+    config["server"] = Config({"scheme": "https", "host": "h", "port": 443})
+    assert config.root.url == "https://h:443"
+
+
+def test_invalidated_by_restore(config):
+    config.backup()
+    config.root.server.port = 8080
+    assert config.root.url == "http://localhost:8080"
+    config.restore()
+    assert config.root.url == "http://localhost:80"
+
+
+def test_reading_refs(url_func):
+    config = Config(
+        {
+            "defaults": {"port": 80},
+            "server": {
+                "scheme": "http",
+                "host": "localhost",
+                "port": Ref("..defaults.port"),
+            },
+            "url": Computed(url_func),
+        }
+    )
+    assert config.root.url == "http://localhost:80"
+    config.root.defaults.port = 81
+    assert config.root.url == "http://localhost:81"
+
+
+def test_ref_to_computed(config):
+    config.extend({"url_ref": Ref("url")})
+    assert config.root.url_ref == "http://localhost:80"
+
+
+def test_computed_reading_computed(config):
+    config.extend({"health": Computed(lambda root: root.url + "/health")})
+    assert config.root.health == "http://localhost:80/health"
+    config.root.server.port = 81
+    assert config.root.health == "http://localhost:81/health"
+
+
+def test_nested_computed_leaf():
+    config = Config({"a": {"b": 2, "double": Computed(lambda root: root.a.b * 2)}})
+    assert config.root.a.double == 4
+    config.root.a.b = 3
+    assert config.root.a.double == 6
+
+
+def test_cycle():
+    config = Config(
+        {
+            "a": Computed(lambda root: root.b),
+            "b": Computed(lambda root: root.a),
+        }
+    )
+    with pytest.raises(exceptions.CyclicReferenceError):
+        config.root.a
+
+
+def test_missing_path():
+    config = Config({"a": Computed(lambda root: root.nonexisting)})
+    with pytest.raises(AttributeError):
+        config.root.a
@@ -115,12 +115,31 @@ class ExtendingTest(TestCase):
         self.conf.extend(Config({"b": {"c": {"d": 2}}}))
         self.assertEqual(self.conf.root.b.c.d, 2)
 
-    def test_extend_config_propagates_changes(self):
+    def test_extend_config_copies_other_trees(self):
         new_cfg = Config({"b": {"c": 2}})
         self.conf.extend(new_cfg)
         self.assertEqual(self.conf.root.b.c, 2)
         new_cfg.root.b.c = 3
-        self.assertEqual(self.conf.root.b.c, 3)
+        self.assertEqual(self.conf.root.b.c, 2)
+        self.conf.root.b.c = 4
+        self.assertEqual(new_cfg.root.b.c, 3)
+        self.assertIs(self.conf.get_config("b").get_parent(), self.conf)
+
+    def test_merged_configs_notify_their_new_tree(self):
+        calls = []
+        changes = []
+        self.conf.on_update(calls.append)
+        self.conf.on_change(lambda path, value: changes.append((path, value)))
+        self.conf.extend({"h": 3 // Metadata(s=True)})
+        self.conf.update(Config({"n": {"x": 1}, "l": 2 // Metadata(s=True)}))
+        del calls[:], changes[:]
+        for path in ("h", "n.x", "l"):
+            version = self.conf.version
+            self.conf.assign_path(path, 10)
+            self.assertGreater(self.conf.version, version)
+        self.assertEqual(calls, [self.conf] * 3)
+        self.assertEqual(changes, [("h", 10), ("n.x", 10), ("l", 10)])
+        self.assertEqual(self.conf.get_config("l").metadata, {"s": True})
 
     def test_extend_config_preserves_metadata(self):
         new_cfg = Config({"b": {"c": 2 // Metadata(x=3)}})
@@ -144,11 +163,71 @@ class ExtendingTest(TestCase):
         with self.assertRaises(exceptions.CannotSetValue):
             self.conf.extend(new_cfg)
 
+    def test_extend_config_reports_all_conflicts(self):
+        self.conf = Config({"a": {"b": 1, "c": 2}, "d": 3})
+        conflicts = self.conf.extend(
+            Config({"a": {"b": {"x": 1}}, "d": {"y": 2}}), dry_run=True
+        )
+        self.assertEqual(len(conflicts), 3)
+        for conflict in conflicts:
+            self.assertIsInstance(conflict, exceptions.CannotSetValue)
+        self.assertEqual(self.conf.serialize_to_dict(), {"a": {"b": 1, "c": 2}, "d": 3})
+
+    def test_extend_dry_run_does_not_change(self):
+        self.assertEqual(self.conf.extend({"b": {"c": 2}}, dry_run=True), [])
+        self.assertEqual(self.conf.serialize_to_dict(), {"a": 1})
+
+    def test_dry_run_does_not_adopt_incoming_configs(self):
+        inner = Config({"d": 1})
+        self.assertEqual(self.conf.extend({"b": {"c": inner}}, dry_run=True), [])
+        self.assertEqual(self.conf.update({"b": {"c": inner}}, dry_run=True), [])
+        self.assertIsNone(inner.get_parent())
+        incoming = Config({"b": {"c": 2}})
+        children = dict(incoming._value)
+        self.assertEqual(self.conf.update(incoming, dry_run=True), [])
+        self.assertEqual(incoming._value, children)
+
+    def test_extend_and_update_notify_once(self):
+        self.conf.extend({"b": {"c": 1}})
+        calls = []
+        self.conf.on_update(calls.append)
+        self.conf.get_config("b").on_update(calls.append)
+        version = self.conf.version
+        self.conf.update({"a": 2, "b": {"c": 2, "d": 3}})
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(
+            set(map(id, calls)), set([id(self.conf), id(self.conf.get_config("b"))])
+        )
+        self.assertGreater(self.conf.version, version)
+        self.assertTrue(self.conf.is_dirty())
+        self.conf.extend({"e": 4})
+        self.assertEqual(len(calls), 3)
+
+    def test_extend_dict_prevents_losing_value(self):
+        with self.assertRaises(exceptions.CannotSetValue):
+            self.conf.extend({"b": 2, "a": {"c": 3}})
+        self.assertEqual(self.conf.serialize_to_dict(), {"a": 1})
+
+    def test_extend_keyword_arguments_into_new_node(self):
+        self.conf.extend({"b": {"c": 1}}, b={"d": 2})
+        self.assertEqual(self.conf.serialize_to_dict(), {"a": 1, "b": {"c": 1, "d": 2}})
+
     def test_update_config_preserves_nodes(self):
         self.conf.update(Config({"b": {"c": 2}}))
         self.conf.update(Config({"b": {"d": 3}}))
         self.assertEqual(self.conf.serialize_to_dict(), {"a": 1, "b": {"c": 2, "d": 3}})
 
+    def test_update_from_dict(self):
+        self.conf.update({"b": {"c": 2}})
+        self.conf.update({"a": 2, "b": {"d": 3}})
+        self.assertEqual(self.conf.serialize_to_dict(), {"a": 2, "b": {"c": 2, "d": 3}})
+
+    def test_update_prevents_losing_value(self):
+        self.assertEqual(len(self.conf.update({"a": {"b": 2}}, dry_run=True)), 1)
+        with self.assertRaises(exceptions.CannotSetValue):
+            self.conf.update(Config({"a": {"b": 2}}))
+        self.assertEqual(self.conf.serialize_to_dict(), {"a": 1})
+
 
 class HelperMethodsTest(TestCase):
 
@@ -1,5 +1,9 @@
+import gc
+import weakref
+
 from .test_utils import TestCase
-from confetti import Config, Ref
+from confetti import Computed, Config, Ref
+from confetti import exceptions
 
 
 class CrossReferencingTest(TestCase):
@@ -33,3 +37,128 @@ class CrossReferencingTest(TestCase):
         self.assertEqual(conf.a.a_1.ref_1, conf.a.a_1.value)
         self.assertEqual(conf.a.a_1.ref_2, conf.a.a_2.value)
         self.assertEqual(conf.a.a_1.ref_3, conf.b.b_1.value)
+
+    def test_references_above_root(self):
+        conf = Config(dict(a=Ref("..b")))
+        with self.assertRaises(exceptions.CannotResolveError):
+            conf["a"]
+
+    def test_references_after_reparenting(self):
+        inner = Config(dict(ref=Ref("..value")))
+        with self.assertRaises(exceptions.CannotResolveError):
+            inner["ref"]
+        outer = Config(dict(value=self.VALUE, inner=inner))
+        self.assertEqual(outer.root.inner.ref, self.VALUE)
+
+    def test_references_follow_replaced_nodes(self):
+        conf = Config(dict(a=dict(value=1), ref=Ref(".a.value")))
+        self.assertEqual(conf["ref"], 1)
+        conf["a"] = Config(dict(value=2))
+        self.assertEqual(conf["ref"], 2)
+
+    def test_references_under_detached_nodes(self):
+        conf = Config(dict(value=1, a=dict(b=dict(ref=Ref("...value")))))
+        b = conf.get_config("a.b")
+        self.assertEqual(b["ref"], 1)
+        a = conf.pop("a")
+        with self.assertRaises(exceptions.CannotResolveError):
+            b["ref"]
+        Config(dict(value=2, a=a))
+        self.assertEqual(b["ref"], 2)
+
+    def test_anchors_kept_by_unrelated_changes(self):
+        conf = Config(dict(value=1, a=dict(ref=Ref("..value"), leaf=2)))
+        ref = conf.get_config("a")._value["ref"]
+        self.assertEqual(conf.root.a.ref, 1)
+        anchor = ref._anchor
+        Config(dict(x=Config(dict(y=1))))
+        conf.get_config("a").pop("leaf")
+        conf.extend(dict(b=dict(c=3)))
+        conf.pop("b")
+        self.assertIs(ref._anchor, anchor)
+
+    def test_anchor_does_not_keep_config_alive(self):
+        ref = Ref("..value")
+        conf = Config(dict(value=1, a=dict(ref=ref)))
+        self.assertEqual(conf.root.a.ref, 1)
+        conf_ref = weakref.ref(conf)
+        del conf
+        gc.collect()
+        self.assertIsNone(conf_ref())
+
+    def test_backup_does_not_copy_resolved_anchor(self):
+        conf = Config(dict(a=dict(value=1, ref=Ref(".value"))))
+        self.assertEqual(conf.root.a.ref, 1)
+        conf.backup()
+        conf.root.a.value = 2
+        conf.restore()
+        self.assertEqual(conf.root.a.ref, 1)
+        self.assertIsNone(conf.serialize_to_dict()["a"]["ref"]._anchor)
+
+
+class MaterializationTest(TestCase):
+
+    def setUp(self):
+        super(MaterializationTest, self).setUp()
+        self.conf = Config(
+            dict(
+                a=dict(
+                    value=1,
+                    ref=Ref(".value"),
+                    chained=Ref(".ref", filter=lambda x: x + 1),
+                ),
+                b=dict(
+                    ref=Ref("..a.chained"),
+                    node=Ref("..a"),
+                ),
+            )
+        )
+
+    def test_materialize(self):
+        result = self.conf.materialize_refs()
+        self.assertEqual(result["a"], dict(value=1, ref=1, chained=2))
+        self.assertEqual(result["b"]["ref"], 2)
+        self.assertEqual(result["b"]["node"], dict(value=1, ref=1, chained=2))
+        self.assertIsInstance(self.conf.get_path("a.ref"), Ref)
+
+    def test_materialize_in_place(self):
+        self.conf.materialize_refs(in_place=True)
+        self.assertEqual(self.conf.get_path("b.ref"), 2)
+        self.conf.root.a.value = 5
+        self.assertEqual(self.conf.root.a.ref, 1)
+        self.assertEqual(self.conf.root.b.node.chained, 2)
+
+    def test_materialize_subtree_with_outer_refs(self):
+        result = self.conf["b"].materialize_refs()
+        self.assertIsInstance(result["ref"], Ref)
+        self.assertEqual(result["node"]["value"], 1)
+
+    def test_materialize_computed(self):
+        conf = Config(
+            dict(
+                a=dict(value=1, doubled=Computed(lambda root: root.a.value * 2)),
+                b=dict(ref=Ref("..a.doubled"), node=Ref("..a")),
+            )
+        )
+        result = conf.materialize_refs()
+        self.assertEqual(result["a"], dict(value=1, doubled=2))
+        self.assertEqual(result["b"], dict(ref=2, node=dict(value=1, doubled=2)))
+        conf.materialize_refs(in_place=True)
+        self.assertEqual(conf.get_path("b.ref"), 2)
+        self.assertIsInstance(conf.get_config("a.doubled").get_value(), Computed)
+
+    def test_materialize_missing_target(self):
+        conf = Config(dict(a=Ref(".b")))
+        with self.assertRaises(exceptions.CannotResolveError):
+            conf.materialize_refs()
+
+    def test_materialize_cycle(self):
+        conf = Config(dict(a=dict(x=Ref(".y"), y=Ref("..b.z")), b=dict(z=Ref("..a.x"))))
+        with self.assertRaises(exceptions.CyclicReferenceError) as caught:
+            conf.materialize_refs()
+        self.assertIn("a.x -> a.y -> b.z -> a.x", str(caught.exception))
+
+    def test_materialize_self_containing_cycle(self):
+        conf = Config(dict(a=dict(x=Ref("..a"))))
+        with self.assertRaises(exceptions.CyclicReferenceError):
+            conf.materialize_refs()
@@ -0,0 +1,97 @@
+import pytest
+from confetti import Config, Metadata, Ref, exceptions
+
+
+@pytest.fixture
+def base():
+    return Config(
+        {
+            "a": {"b": 1, "c": 2, "tagged": 3 // Metadata(x=1)},
+            "d": 4,
+            "ref": Ref(".a.b"),
+        }
+    )
+
+
+@pytest.fixture
+def derived(base):
+    return base.derive({"a.b": 10})
+
+
+def test_overrides(base, derived):
+    assert derived.serialize_to_dict()["a"] == {"b": 10, "c": 2, "tagged": 3}
+    assert derived.root.d == 4
+    assert base.get_path("a.b") == 1
+
+
+def test_nested_overrides(base):
+    derived = base.derive({"a": {"c": 0}, "d": 5})
+    assert derived.serialize_to_dict()["a"] == {"b": 1, "c": 0, "tagged": 3}
+    assert derived.root.d == 5
+
+
+def test_base_changes_visible(base, derived):
+    base.assign_path("a.c", 20)
+    base.root.d = 40
+    base["a"].extend({"e": 5})
+    assert derived.root.a.c == 20
+    assert derived.root.d == 40
+    assert derived.root.a.e == 5
+
+
+def test_overridden_paths_not_affected_by_base(base, derived):
+    base.assign_path("a.b", 100)
+    assert derived.root.a.b == 10
+
+
+def test_changes_do_not_affect_base(base, derived):
+    derived.root.a.c = 30
+    derived.assign_path("d", 40)
+    derived["a"].pop("tagged")
+    assert base.serialize_to_dict()["a"] == {"b": 1, "c": 2, "tagged": 3}
+    assert base.root.d == 4
+    assert list(derived["a"].keys()) == ["b", "c"]
+
+
+def test_refs_resolve_within_derived(base, derived):
+    assert base.root.ref == 1
+    assert derived.root.ref == 10
+
+
+def test_metadata_inherited_and_preserved(derived):
+    assert derived.get_config("a.tagged").metadata == {"x": 1}
+    derived.root.a.tagged = 5
+    assert derived.get_config("a.tagged").metadata == {"x": 1}
+
+
+def test_derived_notifies_updates(derived, checkpoint):
+    derived.on_update(checkpoint)
+    derived.root.a.c = 5
+    assert checkpoint.called
+    assert derived.is_dirty()
+
+
+def test_unmodified_subtrees_are_shared(base):
+    derived = base.derive({"d": 5})
+    assert dict.keys(derived._value) == set(["d"])
+
+
+def test_callbacks_on_inherited_nodes(base, derived):
+    updates = []
+    changes = []
+    derived.get_config("a").on_update(updates.append)
+    derived.get_config("a").on_change(lambda path, value: changes.append((path, value)))
+    derived.assign_path("a.c", 5)
+    assert updates == [derived.get_config("a")]
+    assert changes == [("c", 5)]
+    base.assign_path("a.b", 7)
+    assert derived.get_path("a.c") == 5
+    assert base.get_path("a.c") == 2
+    assert derived.fingerprint() == base.derive({"a.b": 10, "a.c": 5}).fingerprint()
+
+
+def test_callbacks_on_inherited_leaves(derived):
+    with pytest.raises(exceptions.CannotRegisterCallback):
+        derived.get_config("d").on_update(lambda config: None)
+    derived.assign_path("d", 5)
+    derived.get_config("d").on_update(lambda config: None)
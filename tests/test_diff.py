@@ -0,0 +1,113 @@
+import copy
+
+import pytest
+from confetti import Config, Metadata, Ref
+from confetti import exceptions
+
+
+@pytest.fixture
+def config():
+    return Config(
+        {
+            "a": {"b": 1, "c": {"d": "x"}},
+            "e": [1, 2],
+            "f": {"g": True},
+        }
+    )
+
+
+def test_no_changes(config):
+    assert config.diff(copy.deepcopy(config)) == []
+
+
+def test_changes(config):
+    other = copy.deepcopy(config)
+    other.root.a.b = 2
+    other.get_config("a").pop("c")
+    other.extend({"h": {"i": 1}})
+    other["e"] = [3]
+    assert config.diff(other) == [
+        ("change", "a.b", 2),
+        ("remove", "a.c", None),
+        ("change", "e", [3]),
+        ("add", "h", {"i": 1}),
+    ]
+
+
+def test_node_replaced_by_value(config):
+    other = Config({"a": 1, "e": [1, 2], "f": {"g": True}})
+    assert config.diff(other) == [("remove", "a", None), ("add", "a", 1)]
+
+
+def test_refs_are_compared_by_target():
+    assert Config({"a": 1, "b": Ref(".a")}).diff(Config({"a": 1, "b": Ref(".a")})) == []
+    assert Config({"a": 1, "b": Ref(".a")}).diff(Config({"a": 1, "b": Ref(".c")}))
+
+
+def test_same_object_short_circuits(config):
+    assert config.diff(config) == []
+
+
+def test_derived_configs(config):
+    first = config.derive({"a.b": 2})
+    second = config.derive({"a.c.d": "y"})
+    assert first.diff(second) == [("change", "a.b", 1), ("change", "a.c.d", "y")]
+    assert config.diff(first) == [("change", "a.b", 2)]
+
+
+def test_apply_patch(config):
+    other = copy.deepcopy(config)
+    other.root.a.b = 2
+    other.get_config("a").pop("c")
+    other.extend({"h": {"i": 1}, "f": {"j": 3}})
+    config.apply_patch(config.diff(other))
+    assert config.serialize_to_dict() == other.serialize_to_dict()
+    assert config.diff(other) == []
+    assert config.root.h.i == 1
+
+
+def test_apply_patch_replacing_node(config):
+    config.apply_patch([("remove", "a", None), ("add", "a", 1)])
+    assert config.root.a == 1
+
+
+def test_apply_patch_hooks(config):
+    updates = []
+    changes = []
+    config.on_update(updates.append)
+    config.on_change(lambda path, value: changes.append((path, value)))
+    config.apply_patch(
+        [("change", "a.b", 2), ("change", "e", []), ("add", "h", {"i": 1})]
+    )
+    assert updates == [config]
+    assert sorted(changes) == [("a.b", 2), ("e", []), ("h.i", 1)]
+
+
+def test_apply_patch_validation(config):
+    config.compile_schema(enforce=True)
+    with pytest.raises(exceptions.ValidationError) as caught:
+        config.apply_patch(
+            [
+                ("change", "a.b", "x"),
+                ("change", "nonexisting.path", 1),
+                ("add", "e", 2),
+                ("remove", "z", None),
+                ("change", "a.c", 1),
+                ("change", "e", [3]),
+            ]
+        )
+    assert [path for path, _ in caught.value.errors] == [
+        "a.b",
+        "nonexisting.path",
+        "e",
+        "z",
+        "a.c",
+    ]
+    assert config.root.e == [1, 2]
+
+
+def test_apply_patch_keeps_metadata():
+    config = Config({"a": 1 // Metadata(x=1)})
+    config.apply_patch([("change", "a", 2)])
+    assert config.root.a == 2
+    assert config.get_config("a").metadata == {"x": 1}
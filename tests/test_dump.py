@@ -0,0 +1,114 @@
+import io
+import json
+
+import pytest
+
+from confetti import Computed, Config, Metadata, Ref
+
+
+@pytest.fixture
+def config():
+    return Config(
+        {
+            "a": {"b": 1, "c": [1, "x"], "d": {}},
+            "e": Ref(".a.b"),
+            "f": Computed(lambda config: config.a.b + 1),
+            "g": {"password": "secret" // Metadata(secret=True), "user": "admin"},
+            "h": None,
+        }
+    )
+
+
+_EXPECTED = {
+    "a": {"b": 1, "c": [1, "x"], "d": {}},
+    "e": 1,
+    "f": 2,
+    "g": {"password": "secret", "user": "admin"},
+    "h": None,
+}
+
+
+def _dump(config, **kwargs):
+    f = io.StringIO() if str is not bytes else io.BytesIO()
+    config.dump(f, **kwargs)
+    return f.getvalue()
+
+
+@pytest.mark.parametrize("indent", [None, 0, 4])
+def test_dump_json(config, indent):
+    assert json.loads(_dump(config, indent=indent)) == _EXPECTED
+
+
+def test_dump_json_layout():
+    assert _dump(Config({"a": {"b": 1}, "c": {}})) == '{"a": {"b": 1}, "c": {}}\n'
+    assert (
+        _dump(Config({"a": {"b": 1}}), indent=2) == '{\n  "a": {\n    "b": 1\n  }\n}\n'
+    )
+
+
+def test_dump_yaml(config):
+    assert _dump(config, format="yaml") == "\n".join(
+        [
+            "a:",
+            "  b: 1",
+            '  c: [1, "x"]',
+            "  d: {}",
+            "e: 1",
+            "f: 2",
+            "g:",
+            '  password: "secret"',
+            '  user: "admin"',
+            "h: null",
+            "",
+        ]
+    )
+
+
+def test_dump_yaml_quotes_keys():
+    assert _dump(Config({"yes": 1, "a b": 2, 3: 4}), format="yaml") == (
+        '"yes": 1\n"a b": 2\n"3": 4\n'
+    )
+
+
+def test_dump_yaml_is_valid(config):
+    yaml = pytest.importorskip("yaml")
+    assert yaml.safe_load(_dump(config, format="yaml")) == _EXPECTED
+
+
+@pytest.mark.parametrize("format", ["json", "yaml"])
+def test_dump_empty_and_leaf(format):
+    assert _dump(Config(), format=format) == "{}\n"
+    assert _dump(Config(5), format=format) == "5\n"
+
+
+def test_dump_redact(config):
+    expected = dict(_EXPECTED, g={"password": "<redacted>", "user": "admin"})
+    assert json.loads(_dump(config, redact="secret")) == expected
+
+
+def test_dump_redact_node():
+    config = Config({"a": Config({"b": 1}, metadata={"secret": True}), "c": 2})
+    assert json.loads(_dump(config, redact="secret")) == {"a": "<redacted>", "c": 2}
+
+
+def test_dump_ref_to_node():
+    config = Config({"a": {"b": 1}, "c": Ref(".a")})
+    assert json.loads(_dump(config)) == {"a": {"b": 1}, "c": {"b": 1}}
+
+
+def test_dump_unknown_format(config):
+    with pytest.raises(ValueError):
+        _dump(config, format="xml")
+
+
+def test_dump_large_tree_in_chunks():
+    writes = []
+
+    class _File(object):
+        def write(self, data):
+            writes.append(data)
+
+    config = Config(dict(("key{0}".format(index), index) for index in range(10000)))
+    config.dump(_File())
+    assert len(writes) > 1
+    assert json.loads("".join(writes)) == config.serialize_to_dict()
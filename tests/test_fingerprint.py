@@ -0,0 +1,132 @@
+import copy
+
+import pytest
+
+from confetti import Computed, Config, Metadata, Ref
+
+
+@pytest.fixture
+def config():
+    return Config(
+        {
+            "a": {"b": 1, "c": {"d": "x", "e": [1, 2.5, None]}},
+            "f": {"g": True, "h": (1, "2"), "i": {"j": set([1, 2])}},
+            "k": Ref(".a.b"),
+        }
+    )
+
+
+def test_equal_contents(config):
+    assert copy.deepcopy(config).fingerprint() == config.fingerprint()
+
+
+def test_insertion_order_does_not_matter():
+    assert (
+        Config({"a": 1, "b": 2}).fingerprint() == Config({"b": 2, "a": 1}).fingerprint()
+    )
+
+
+def test_different_contents():
+    fingerprints = set(
+        Config(value).fingerprint()
+        for value in [
+            {"a": 1},
+            {"a": "1"},
+            {"a": True},
+            {"a": 1.0},
+            {"a": [1]},
+            {"a": (1,)},
+            {"a": {"b": 1}},
+            {"b": 1},
+            {"a": None},
+            {"a": Ref(".b")},
+        ]
+    )
+    assert len(fingerprints) == 10
+
+
+def test_wrapped_leaves():
+    assert (
+        Config({"a": 1 // Metadata(x=1)}).fingerprint()
+        == Config({"a": 1}).fingerprint()
+    )
+
+
+def test_changes_update_fingerprint(config):
+    fingerprint = config.fingerprint()
+    config.root.a.c.d = "y"
+    assert config.fingerprint() != fingerprint
+    config.root.a.c.d = "x"
+    assert config.fingerprint() == fingerprint
+    config.extend({"new": 1})
+    assert config.fingerprint() != fingerprint
+    config.pop("new")
+    assert config.fingerprint() == fingerprint
+
+
+def test_subtree_fingerprint(config):
+    other = copy.deepcopy(config)
+    other.root.f.g = False
+    assert config.get_config("a").fingerprint() == other.get_config("a").fingerprint()
+    assert config.get_config("f").fingerprint() != other.get_config("f").fingerprint()
+
+
+def test_incremental(config, monkeypatch):
+    from confetti import fingerprint
+
+    config.fingerprint()
+    rehashed = []
+    original = fingerprint.get_digest
+
+    def get_digest(node):
+        cached = node._fingerprint
+        if cached is None or cached[0] != node.version:
+            rehashed.append(node)
+        return original(node)
+
+    monkeypatch.setattr(fingerprint, "get_digest", get_digest)
+    config.root.a.c.d = "y"
+    config.fingerprint()
+    assert rehashed == [config, config.get_config("a"), config.get_config("a.c")]
+
+
+def test_derived_configs(config):
+    derived = config.derive()
+    assert derived.fingerprint() == config.fingerprint()
+    derived.assign_path("a.b", 5)
+    assert derived.fingerprint() != config.fingerprint()
+    assert derived.get_config("f").fingerprint() == config.get_config("f").fingerprint()
+    derived.assign_path("a.b", 1)
+    assert derived.fingerprint() == config.fingerprint()
+
+
+def test_computed():
+    func = lambda root: 1
+    assert (
+        Config({"a": Computed(func)}).fingerprint()
+        == Config({"a": Computed(func)}).fingerprint()
+    )
+
+
+def test_derived_configs_after_base_changes():
+    base = Config({"a": {"b": 1, "c": 2}, "f": {"g": 3}})
+    derived = base.derive()
+    derived.assign_path("a.b", 5)
+    derived.fingerprint()
+    base.assign_path("f.g", 4)
+    base.assign_path("a.c", 6)
+    expected = Config({"a": {"b": 5, "c": 6}, "f": {"g": 4}}).fingerprint()
+    assert derived.fingerprint() == expected
+    assert (
+        derived.get_config("a").fingerprint() == Config({"b": 5, "c": 6}).fingerprint()
+    )
+
+
+def test_merge_then_assign():
+    config = Config({"x": 1, "n": {"y": 1}})
+    config.update(Config({"x": 0, "n": {"y": 2}}))
+    fingerprint = config.fingerprint()
+    config.assign_path("x", 5)
+    assert config.fingerprint() != fingerprint
+    config.assign_path("n.y", 3)
+    assert config.fingerprint() == Config({"x": 5, "n": {"y": 3}}).fingerprint()
@@ -0,0 +1,92 @@
+import pytest
+
+from confetti import Computed, Config, Ref, exceptions
+from confetti.derived import derive
+from confetti.paths import PathSet, compile_paths
+
+
+@pytest.fixture
+def config():
+    return Config(
+        {
+            "db": {"host": "localhost", "port": 5432, "pool": {"size": 10}},
+            "alias": Ref(".db"),
+            "port": Ref(".db.port"),
+            "next_port": Computed(lambda config: config.db.port + 1),
+        }
+    )
+
+
+def test_get_paths(config):
+    assert config.get_paths(["db.host", "db.port", "db.pool.size"]) == (
+        "localhost",
+        5432,
+        10,
+    )
+
+
+def test_get_paths_as_dict(config):
+    assert config.get_paths(["db.host", "db.pool.size"], as_dict=True) == {
+        "db.host": "localhost",
+        "db.pool.size": 10,
+    }
+
+
+def test_get_paths_matches_get_path(config):
+    paths = ["db.pool.size", "db.host", "db.pool", "db", "db.host"]
+    assert config.get_paths(paths) == tuple(config.get_path(path) for path in paths)
+
+
+def test_get_paths_resolves_refs(config):
+    assert config.get_paths(["port", "next_port", "alias.pool.size"]) == (
+        5432,
+        5433,
+        10,
+    )
+
+
+def test_get_paths_empty(config):
+    assert config.get_paths([]) == ()
+
+
+@pytest.mark.parametrize("path", ["x", "db.x", "db.host.x", "port.x", "alias.x"])
+def test_get_paths_invalid(config, path):
+    with pytest.raises(exceptions.InvalidPath) as caught:
+        config.get_paths(["db.host", path])
+    assert path in str(caught.value)
+
+
+def test_compiled_paths_reused(config):
+    paths = ["db.host", "db.port"]
+    path_set = compile_paths(paths)
+    assert isinstance(path_set, PathSet)
+    assert compile_paths(paths) is path_set
+    assert compile_paths(path_set) is path_set
+    assert config.get_paths(path_set) == ("localhost", 5432)
+    config.assign_path("db.port", 1)
+    assert path_set.get(config) == ("localhost", 1)
+
+
+def test_get_paths_after_structure_change(config):
+    path_set = compile_paths(["db.pool.size"])
+    config.get_config("db").pop("pool")
+    config.extend({"db": {"pool": {"size": 20}}})
+    assert path_set.get(config) == (20,)
+
+
+def test_get_paths_derived(config):
+    derived = derive(config, {"db": {"pool": {"size": 3}}})
+    assert derived.get_paths(["db.host", "db.pool.size", "alias.pool.size"]) == (
+        "localhost",
+        3,
+        3,
+    )
+
+
+def test_path_set_cache_is_bounded():
+    from confetti import paths
+
+    config = Config({"a": 1})
+    for index in range(paths._MAX_CACHED_PATH_SETS * 2):
+        assert config.get_paths(["a"] * (index + 1)) == (1,) * (index + 1)
+    assert len(paths._path_set_cache) <= paths._MAX_CACHED_PATH_SETS
@@ -0,0 +1,73 @@
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    sys.version_info < (3, 7), reason="Lazy imports require Python 3.7"
+)
+
+# modules which are slow to import, and not needed by ``import confetti`` itself
+_DEFERRED_MODULES = [
+    "ast",
+    "confetti.config",
+    "copy",
+    "json",
+    "platform",
+    "sentinels",
+]
+
+_IMPORT_TIME_THRESHOLD_US = 50000
+
+
+def _run(statement):
+    return subprocess.check_output(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stderr=subprocess.STDOUT,
+    ).decode("utf-8")
+
+
+def test_heavy_modules_deferred():
+    output = _run(
+        "import sys, confetti; print(' '.join(sorted(sys.modules)))"
+    ).splitlines()[-1]
+    imported = set(output.split())
+    assert "confetti" in imported
+    assert not [module for module in _DEFERRED_MODULES if module in imported]
+
+
+def test_import_time():
+    for line in _run("import confetti").splitlines():
+        if line.rstrip().endswith("| confetti"):
+            cumulative = int(line.split("|")[1])
+            break
+    else:
+        raise AssertionError("confetti not found in import times")
+    assert cumulative < _IMPORT_TIME_THRESHOLD_US
+
+
+def test_lazy_attributes():
+    import confetti
+
+    from confetti.config import Config
+
+    assert confetti.Config is Config
+    assert "Ref" in dir(confetti)
+    assert set(confetti.__all__) <= set(dir(confetti))
+    with pytest.raises(AttributeError):
+        confetti.nonexistent
+
+
+def test_public_attributes_unchanged():
+    # everything reachable as an attribute of the package before the imports were made lazy
+    output = _run(
+        "import confetti; print(' '.join(type(getattr(confetti, name)).__name__ for name in ["
+        "'Computed', 'Config', 'LayeredConfig', 'Lazy', 'Metadata', 'NumericArray', 'Ref', "
+        "'get_config_object_from_proxy', 'arrays', 'config', 'exceptions', 'interning', 'layered', "
+        "'lazy', 'metadata', 'python3_compat', 'query', 'ref', 'utils', '__version__']))"
+    ).splitlines()[-1]
+    assert output.split() == ["type"] * 7 + ["function"] + ["module"] * 11 + ["str"]
+    import confetti
+
+    assert confetti.exceptions.ValidationError is not None
+    assert "exceptions" in dir(confetti)
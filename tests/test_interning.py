@@ -0,0 +1,102 @@
+import collections
+import json
+import pickle
+
+import pytest
+
+from confetti import Config
+from confetti.interning import is_value_interning_enabled, set_value_interning
+
+
+@pytest.fixture
+def value_interning():
+    set_value_interning(True)
+    yield
+    set_value_interning(False)
+
+
+def _runtime_string(s):
+    # strings built at runtime are not interned by the interpreter
+    return "".join(list(s))
+
+
+def _get_key(config, key):
+    return next(k for k in config._value if k == key)
+
+
+def test_keys_interned():
+    first = Config(json.loads('{"some key": {"other key": 1}}'))
+    second = Config(json.loads('{"some key": {"other key": 2}}'))
+    assert _get_key(first, "some key") is _get_key(second, "some key")
+    assert _get_key(first.get_config("some key"), "other key") is _get_key(
+        second.get_config("some key"), "other key"
+    )
+
+
+def test_values_not_interned_by_default():
+    assert not is_value_interning_enabled()
+    first = Config({"a": _runtime_string("some value")})
+    second = Config({"a": _runtime_string("some value")})
+    assert first["a"] is not second["a"]
+
+
+def test_values_interned(value_interning):
+    first = Config({"a": _runtime_string("some value")})
+    second = Config({"b": {"c": _runtime_string("some value")}})
+    assert first["a"] is second["b"]["c"]
+
+
+def test_assigned_values_interned(value_interning):
+    config = Config({"a": {"b": 1}})
+    config.assign_path("a.b", _runtime_string("some value"))
+    assert config.root.a.b is Config({"x": _runtime_string("some value")})["x"]
+
+
+def test_extend_and_update_intern(value_interning):
+    config = Config({"a": {}})
+    config.extend({_runtime_string("new key"): _runtime_string("some value")})
+    config.update({"a": {_runtime_string("other key"): _runtime_string("some value")}})
+    assert _get_key(config, "new key") is _get_key(Config({"new key": 1}), "new key")
+    assert config["new key"] is config.root.a["other key"]
+
+
+def test_unpickled_keys_interned():
+    config = Config(json.loads('{"some key": 1}'))
+    assert _get_key(pickle.loads(pickle.dumps(config)), "some key") is _get_key(
+        config, "some key"
+    )
+
+
+def test_non_string_keys():
+    config = Config({1: "a", "b": {(2, 3): 4}})
+    assert config[1] == "a"
+    assert config["b"][(2, 3)] == 4
+
+
+def test_ordered_dict_kept():
+    value = collections.OrderedDict([("b", 1), ("a", 2)])
+    assert isinstance(Config(value)._value, collections.OrderedDict)
+    assert list(Config(value).keys()) == ["b", "a"]
+
+
+def test_memory_usage():
+    config = Config({"a": {"b": "x" * 10000, "c": {"d": 1}}, "e": {"f": 2}})
+    usage = config.get_memory_usage()
+    assert [path for path, _ in usage[:2]] == ["", "a"]
+    assert sorted(path for path, _ in usage) == ["", "a", "a.c", "e"]
+    sizes = dict(usage)
+    assert sizes[""] > sizes["a"] > 10000
+    assert sizes[""] >= sizes["a"] + sizes["e"]
+
+
+def test_memory_usage_max_depth():
+    config = Config({"a": {"b": {"c": 1}}})
+    assert [path for path, _ in config.get_memory_usage(max_depth=1)] == ["", "a"]
+
+
+def test_memory_usage_counts_shared_objects_once():
+    shared = "x" * 10000
+    config = Config({"a": {"b": shared}, "c": {"d": shared}})
+    sizes = dict(config.get_memory_usage())
+    assert sizes[""] < 20000
+    assert min(sizes["a"], sizes["c"]) < 10000
@@ -0,0 +1,181 @@
+import copy
+import os
+import time
+
+import pytest
+from confetti import Config
+from confetti.journal import Journal
+
+
+@pytest.fixture
+def config():
+    return Config({"a": {"b": 1, "c": {"d": "x"}}, "e": [1, 2]})
+
+
+@pytest.fixture
+def filename(tmpdir):
+    return str(tmpdir.join("overrides.journal"))
+
+
+@pytest.fixture
+def journal(filename):
+    returned = Journal(filename)
+    yield returned
+    returned.close()
+
+
+@pytest.fixture
+def restart(config, filename):
+    # taken before the test changes the config
+    base = copy.deepcopy(config)
+
+    def returned(**kwargs):
+        restored = copy.deepcopy(base)
+        journal = Journal(filename, **kwargs)
+        journal.attach(restored)
+        journal.close()
+        return restored, journal
+
+    return returned
+
+
+def test_record_and_replay(config, journal, restart):
+    journal.attach(config)
+    config.assign_path("a.b", 2)
+    config.root.a.c.d = "y"
+    config["e"] = [3]
+    config.extend({"a": {"new": 5}})
+    journal.close()
+
+    restored, restored_journal = restart()
+    assert restored.serialize_to_dict() == config.serialize_to_dict()
+    assert restored_journal.get_version() == journal.get_version() == 4
+
+
+def test_replay_does_not_record(config, journal, filename, restart):
+    journal.attach(config)
+    config.assign_path("a.b", 2)
+    journal.close()
+    size = os.path.getsize(filename)
+    restart()
+    assert os.path.getsize(filename) == size
+
+
+def test_versions_continue_after_restart(config, journal, filename, restart):
+    journal.attach(config)
+    config.assign_path("a.b", 2)
+    journal.close()
+
+    journal = Journal(filename)
+    journal.attach(config)
+    config.assign_path("a.b", 3)
+    journal.close()
+    assert journal.get_version() == 2
+    assert restart()[0].root.a.b == 3
+
+
+def test_truncated_record_is_discarded(config, journal, filename, restart):
+    journal.attach(config)
+    config.assign_path("a.b", 2)
+    config.assign_path("a.c.d", "y")
+    journal.close()
+    with open(filename, "r+b") as f:
+        f.truncate(os.path.getsize(filename) - 3)
+
+    config, journal = restart()
+    assert config.root.a.b == 2
+    assert config.root.a.c.d == "x"
+
+    journal = Journal(filename)
+    journal.attach(config)
+    config.assign_path("a.c.d", "z")
+    journal.close()
+    assert restart()[0].root.a.c.d == "z"
+
+
+def test_compaction(config, filename, restart):
+    journal = Journal(filename, compact_threshold=None)
+    journal.attach(config)
+    for value in range(100):
+        config.assign_path("a.b", value)
+    journal.compact(wait=True)
+    assert not os.path.exists(filename)
+    assert os.path.exists(journal.snapshot_filename)
+    config.assign_path("a.c.d", "y")
+    journal.close()
+
+    restored, restored_journal = restart()
+    assert restored.root.a.b == 99
+    assert restored.root.a.c.d == "y"
+    assert restored_journal.get_version() == 101
+
+
+def test_compaction_threshold(config, filename, restart):
+    journal = Journal(filename, compact_threshold=1024)
+    journal.attach(config)
+    for value in range(1000):
+        config.assign_path("a.b", value)
+        if journal._compaction is not None:
+            # the threshold is not checked again while a compaction is running
+            journal._compaction.join()
+    journal.close()
+    assert os.path.getsize(filename) < 1024
+    assert restart()[0].root.a.b == 999
+
+
+def test_idle_journal_is_synced(config, journal, monkeypatch):
+    synced = []
+    monkeypatch.setattr(os, "fsync", synced.append)
+    journal.sync_interval = 0.2
+    journal.attach(config)
+    journal.sync()
+    config.assign_path("a.b", 2)
+    assert not synced
+    deadline = time.time() + 5
+    while not synced and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(synced) == 1
+
+
+def test_pop_then_replay(config, journal, restart):
+    journal.attach(config)
+    config.extend({"x": 7})
+    config.get_config("a").pop("c")
+    config.pop("x")
+    journal.close()
+
+    restored, restored_journal = restart()
+    assert "x" not in restored
+    assert "c" not in restored.get_config("a")
+    assert restored.serialize_to_dict() == config.serialize_to_dict()
+    assert restored_journal.get_version() == 3
+
+
+def test_assignment_after_removal_is_replayed(config, journal, restart):
+    journal.attach(config)
+    config.get_config("a").pop("c")
+    config.extend({"a": {"c": {"f": 1}}})
+    journal.close()
+    assert restart()[0].serialize_to_dict() == config.serialize_to_dict()
+
+
+def test_restore_removals_are_recorded(config, journal, restart):
+    journal.attach(config)
+    config.backup()
+    config.extend({"x": 7})
+    config.restore()
+    journal.close()
+    assert "x" not in restart()[0]
+
+
+def test_compaction_keeps_removals(config, filename, restart):
+    journal = Journal(filename, compact_threshold=None)
+    journal.attach(config)
+    config.assign_path("a.c.d", "y")
+    config.get_config("a").pop("c")
+    journal.compact(wait=True)
+    journal.close()
+
+    restored = restart()[0]
+    assert "c" not in restored.get_config("a")
+    assert restored.serialize_to_dict() == config.serialize_to_dict()
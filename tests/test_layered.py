@@ -0,0 +1,108 @@
+import gc
+import weakref
+
+import pytest
+from confetti import Config, LayeredConfig, Ref
+from confetti import exceptions
+
+
+@pytest.fixture
+def defaults():
+    return Config({"db": {"host": "localhost", "port": 5432}, "debug": False})
+
+
+@pytest.fixture
+def site():
+    return Config({"db": {"host": "db.example.com"}})
+
+
+@pytest.fixture
+def layered(defaults, site):
+    return LayeredConfig([("defaults", defaults), ("site", site)])
+
+
+def test_precedence(layered):
+    assert layered.get_path("db.host") == "db.example.com"
+    assert layered.get_path("db.port") == 5432
+    assert layered.get_source("db.host") == "site"
+    assert layered.get_source("db.port") == "defaults"
+
+
+def test_nodes_are_merged(layered):
+    assert layered.get_path("db") == {"host": "db.example.com", "port": 5432}
+    assert layered.serialize_to_dict() == {
+        "db": {"host": "db.example.com", "port": 5432},
+        "debug": False,
+    }
+
+
+def test_invalid_path(layered):
+    assert "db.user" not in layered
+    with pytest.raises(exceptions.InvalidPath):
+        layered.get_path("db.user")
+
+
+def test_layers_are_not_copied(layered, defaults):
+    assert layered.get_layer("defaults") is defaults
+
+
+def test_add_and_remove_layer(layered, site):
+    assert layered.get_path("debug") is False
+    layered.add_layer("cli", {"debug": True})
+    assert layered.get_layer_names() == ["defaults", "site", "cli"]
+    assert layered.get_path("debug") is True
+    assert layered.get_source("debug") == "cli"
+    layered.remove_layer("cli")
+    assert layered.get_path("debug") is False
+    assert layered.remove_layer("site") is site
+    assert layered.get_path("db.host") == "localhost"
+
+
+def test_add_layer_at_index(layered):
+    layered.add_layer("lowest", {"db": {"host": "ignored", "user": "admin"}}, index=0)
+    assert layered.get_path("db.host") == "db.example.com"
+    assert layered.get_source("db.user") == "lowest"
+
+
+def test_cache_invalidated_on_layer_change(layered, defaults, site):
+    assert layered.get_path("db.port") == 5432
+    defaults.assign_path("db.port", 5433)
+    assert layered.get_path("db.port") == 5433
+    site["db"].extend({"port": 1234})
+    assert layered.get_path("db.port") == 1234
+    assert layered.get_source("db.port") == "site"
+
+
+def test_refs_resolved_within_layer():
+    layered = LayeredConfig([("a", Config({"x": 1, "y": Ref(".x")}))])
+    assert layered.get_path("y") == 1
+
+
+def test_leaves_hide_lower_nodes(layered, defaults):
+    layered.add_layer("cli", Config({"db": None}))
+    assert layered.get_path("db") is None
+    assert layered.get_source("db") == "cli"
+    assert "db.host" not in layered
+    with pytest.raises(exceptions.InvalidPath):
+        layered.get_path("db.host")
+    layered.remove_layer("cli")
+    assert layered.get_path("db.host") == "db.example.com"
+
+
+def test_layers_do_not_keep_layered_config_alive(defaults):
+    layered = LayeredConfig([("defaults", defaults)])
+    assert layered.get_path("debug") is False
+    layered_ref = weakref.ref(layered)
+    del layered
+    gc.collect()
+    assert layered_ref() is None
+    assert not defaults._update_callbacks
+
+
+def test_nodes_are_cached(layered, site):
+    db = layered.get_path("db")
+    db["host"] = "changed"
+    assert layered.get_path("db") == {"host": "db.example.com", "port": 5432}
+    assert layered._cache["db"][0] == {"host": "db.example.com", "port": 5432}
+    site.assign_path("db.host", "other")
+    assert layered.get_path("db")["host"] == "other"
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+from confetti import Config, Lazy, Ref
+
+
+@pytest.fixture
+def routes_filename(tmpdir):
+    returned = tmpdir.join("routes.py")
+    returned.write('CONFIG = {"index": {"path": "/", "handler": "home"}, "count": 1}')
+    return str(returned)
+
+
+@pytest.fixture
+def config(routes_filename):
+    return Config({"server": {"port": 8080}, "routes": Lazy(routes_filename)})
+
+
+def _is_loaded(config, key):
+    return not isinstance(config._value[key], Lazy)
+
+
+def test_not_loaded_until_accessed(config):
+    assert config.root.server.port == 8080
+    assert set(config.keys()) == set(["server", "routes"])
+    assert not _is_loaded(config, "routes")
+
+
+def test_load_through_get_config(config):
+    routes = config.get_config("routes.index")
+    assert routes["handler"] == "home"
+    assert _is_loaded(config, "routes")
+    assert config.get_config("routes").get_parent() is config
+
+
+def test_load_through_getitem(config):
+    routes = config["routes"]
+    assert isinstance(routes, Config)
+    assert routes["count"] == 1
+
+
+def test_load_through_proxy(config):
+    assert config.root.routes.index.path == "/"
+
+
+def test_loaded_only_once(config, routes_filename):
+    config.root.routes.count = 2
+    with open(routes_filename, "w") as f:
+        f.write("CONFIG = {}")
+    assert config.root.routes.count == 2
+
+
+def test_serialize_loads(config):
+    assert config.serialize_to_dict()["routes"]["index"]["path"] == "/"
+
+
+def test_refs_into_lazy_subtree(routes_filename):
+    config = Config(
+        {"handler": Ref("routes.index.handler"), "routes": Lazy(routes_filename)}
+    )
+    assert config["handler"] == "home"
+
+
+def test_extend_lazy_subtree(config):
+    config.extend({"routes": {"other": {"path": "/other"}}})
+    assert config.root.routes.other.path == "/other"
+    assert config.root.routes.index.path == "/"
+
+
+def test_query_loads(config):
+    assert [path for path, _ in config.query("routes.*.path")] == ["routes.index.path"]
+
+
+def test_byte_range(tmpdir):
+    filename = tmpdir.join("sections.txt")
+    first = '{"a": 1}'
+    second = '{"b": [1, 2, 3]}'
+    filename.write(first + second)
+    config = Config(
+        {
+            "first": Lazy(str(filename), length=len(first)),
+            "second": Lazy(str(filename), offset=len(first)),
+        }
+    )
+    assert config.root.second.b == [1, 2, 3]
+    assert not _is_loaded(config, "first")
+    assert config.root.first.a == 1
+
+
+def test_custom_loader(tmpdir):
+    filename = tmpdir.join("routes.json")
+    filename.write(json.dumps({"index": "/"}))
+    config = Config({"routes": Lazy(str(filename), loader=json.loads)})
+    assert config.root.routes.index == "/"
+
+
+def test_derived_config(config):
+    derived = config.derive({"routes.count": 5})
+    assert derived.root.routes.count == 5
+    assert derived.root.routes.index.path == "/"
+    assert config.root.routes.count == 1
+
+
+def test_materialize_refs_in_lazy_subtree(tmpdir):
+    filename = tmpdir.join("refs.py")
+    filename.write('from confetti import Ref\nCONFIG = {"h": Ref("..port")}')
+    config = Config({"port": 80, "routes": Lazy(str(filename))})
+    assert config.materialize_refs() == {"port": 80, "routes": {"h": 80}}
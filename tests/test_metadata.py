@@ -35,3 +35,46 @@ def config():
             "a": {"b": {"c": "nested_value" // Metadata(x=1)}},
         }
     )
+
+
+def _paths(results):
+    return [path for path, _ in results]
+
+
+def test_find_by_metadata(config):
+    assert _paths(config.find_by_metadata("a")) == ["key1", "key3"]
+    assert _paths(config.find_by_metadata("b", 2)) == ["key1", "key3"]
+    assert _paths(config.find_by_metadata("x", 1)) == ["a.b.c"]
+    assert config.find_by_metadata("x", 2) == []
+    [(_, cfg)] = config.find_by_metadata("x")
+    assert cfg is config.get_config("a.b.c")
+
+
+def test_find_by_metadata_unhashable_value():
+    config = Config({"a": 1 // Metadata(tags=["x"]), "b": 2 // Metadata(tags=["y"])})
+    assert _paths(config.find_by_metadata("tags", ["y"])) == ["b"]
+
+
+def test_find_by_metadata_after_assignment(config):
+    config.find_by_metadata("a")
+    config.root.key1 = "value3"
+    config["key2"] = "value4" // Metadata(a=5)
+    assert _paths(config.find_by_metadata("a")) == ["key1", "key2", "key3"]
+    assert _paths(config.find_by_metadata("a", 5)) == ["key2"]
+
+
+def test_find_by_metadata_after_floordiv(config):
+    config.find_by_metadata("a")
+    config.get_config("a.b.c") // Metadata(sensitive=True)
+    assert _paths(config.find_by_metadata("sensitive")) == ["a.b.c"]
+
+
+def test_find_by_metadata_after_structural_changes(config):
+    assert _paths(config["a"].find_by_metadata("x")) == ["b.c"]
+    config.find_by_metadata("x")
+    config.extend({"d": {"e": 1 // Metadata(x=1)}})
+    config["a"].update({"f": 2 // Metadata(x=1)})
+    assert _paths(config.find_by_metadata("x", 1)) == ["a.b.c", "a.f", "d.e"]
+    config["a"].pop("b")
+    assert _paths(config.find_by_metadata("x", 1)) == ["a.f", "d.e"]
+    assert _paths(config["a"].find_by_metadata("x")) == ["f"]
@@ -1,5 +1,5 @@
 from .test_utils import TestCase
-from confetti import Config
+from confetti import Config, Lazy, Ref
 from confetti import exceptions
 
 
@@ -69,3 +69,77 @@ class PathAssignmentTest(TestCase):
     def test_assign_path_direct(self):
         self.conf.assign_path("d", 5)
         self.assertEqual(self.conf["d"], 5)
+
+
+class EnvironLoadingTest(TestCase):
+
+    def setUp(self):
+        super(EnvironLoadingTest, self).setUp()
+        self.conf = Config(
+            dict(db=dict(host="localhost", port=5432, pool=dict(enabled=False)), e=None)
+        )
+
+    def test_load_environ(self):
+        unknown = self.conf.load_environ(
+            environ={
+                "APP__DB__HOST": "db.example.com",
+                "APP__DB__PORT": "6543",
+                "app__db__pool__enabled": "yes",
+                "OTHER__DB__PORT": "1",
+            }
+        )
+        self.assertEqual(unknown, [])
+        self.assertEqual(
+            self.conf.serialize_to_dict()["db"],
+            dict(host="db.example.com", port=6543, pool=dict(enabled=True)),
+        )
+
+    def test_load_environ_reports_unknown(self):
+        unknown = self.conf.load_environ(
+            environ={"APP__DB__USER": "admin", "APP__DB": "x", "APP__DB__PORT": "1"}
+        )
+        self.assertEqual(unknown, ["APP__DB", "APP__DB__USER"])
+        self.assertEqual(self.conf.root.db.port, 1)
+
+    def test_load_environ_custom_prefix_without_deduction(self):
+        self.conf.load_environ(
+            prefix="svc", separator="_", deduce_type=False, environ={"SVC_DB_PORT": "2"}
+        )
+        self.assertEqual(self.conf.root.db.port, "2")
+
+    def test_load_environ_is_atomic(self):
+        with self.assertRaises(exceptions.CannotDeduceType):
+            self.conf.load_environ(environ={"APP__DB__PORT": "2", "APP__E": "3"})
+        self.assertEqual(self.conf.root.db.port, 5432)
+
+    def test_load_environ_notifies_once(self):
+        calls = []
+        self.conf.on_update(calls.append)
+        self.conf.load_environ(
+            environ={"APP__DB__HOST": "example.com", "APP__DB__PORT": "1"}
+        )
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(self.conf.is_dirty())
+
+    def test_load_environ_skips_unloaded_lazy_nodes(self):
+        self.conf.extend(lazy=Lazy("nonexistent.py"))
+        unknown = self.conf.load_environ(
+            environ={"APP__LAZY__X": "1", "APP__DB__PORT": "1"}
+        )
+        self.assertEqual(unknown, ["APP__LAZY__X"])
+        self.assertIsInstance(self.conf._value["lazy"], Lazy)
+
+    def test_load_environ_ambiguous_names(self):
+        conf = Config(dict(db=dict(host="a", HOST="b"), port=1))
+        conf.load_environ(environ={"APP__PORT": "2"})
+        self.assertEqual(conf.root.port, 2)
+        with self.assertRaises(exceptions.InvalidPath):
+            conf.load_environ(environ={"APP__DB__HOST": "c"})
+        self.assertEqual(conf.serialize_to_dict()["db"], dict(host="a", HOST="b"))
+
+    def test_load_environ_deduces_type_of_ref_leaves(self):
+        conf = Config(dict(port=1, other_port=Ref(".port")))
+        conf.load_environ(environ={"APP__OTHER_PORT": "5"})
+        self.assertEqual(conf.root.other_port, 5)
+        self.assertEqual(conf.get_config("other_port")._value, 5)
+        self.assertEqual(conf.root.port, 1)
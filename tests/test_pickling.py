@@ -0,0 +1,120 @@
+import copy
+import pickle
+
+import pytest
+
+from confetti import Config, Lazy, Metadata, Ref
+from confetti.derived import derive
+
+
+@pytest.fixture
+def config():
+    return Config(
+        {
+            "a": {"b": 1, "c": Config(2, metadata={"tag": "x"})},
+            "d": [1, 2],
+            "e": Ref(".a.b"),
+            "f": {"g": {}},
+        },
+        metadata={"top": True},
+    )
+
+
+def _roundtrip(config):
+    return pickle.loads(pickle.dumps(config, pickle.HIGHEST_PROTOCOL))
+
+
+@pytest.mark.parametrize("func", [_roundtrip, copy.copy, copy.deepcopy])
+def test_copy_preserves_contents(config, func):
+    copied = func(config)
+    assert copied is not config
+    assert copied.diff(config) == []
+    assert copied.metadata == {"top": True}
+    assert copied.get_config("a.c").metadata == {"tag": "x"}
+    assert copied.root.e == 1
+    assert copied.get_config("a.b").get_parent() is copied.get_config("a")
+    assert copied.get_config("a").get_parent() is copied
+
+
+@pytest.mark.parametrize("func", [_roundtrip, copy.copy, copy.deepcopy])
+def test_copy_is_independent(config, func):
+    copied = func(config)
+    copied.root.a.b = 5
+    copied.extend({"h": 1})
+    assert config.root.a.b == 1
+    assert "h" not in config
+
+
+@pytest.mark.parametrize("func", [copy.copy, copy.deepcopy])
+def test_copy_does_not_share_metadata(config, func):
+    copied = func(config)
+    copied.get_config("a.b") // Metadata(secret=True)
+    copied.get_config("a.c") // Metadata(secret=True)
+    copied.metadata["top"] = False
+    assert config.find_by_metadata("secret") == []
+    assert config.get_config("a.c").metadata == {"tag": "x"}
+    assert config.metadata == {"top": True}
+
+
+def test_copy_shares_leaves(config):
+    assert copy.copy(config)["d"] is config["d"]
+
+
+def test_deepcopy_copies_leaves(config):
+    copied = copy.deepcopy(config)
+    copied["d"].append(3)
+    assert config["d"] == [1, 2]
+
+
+def test_deepcopy_keeps_shared_leaves_shared():
+    shared = [1]
+    copied = copy.deepcopy(Config({"a": shared, "b": {"c": shared}}))
+    assert copied["a"] is copied["b"]["c"]
+
+
+def test_hooks_are_not_pickled(config):
+    config.on_update(lambda *args: None)
+    copied = _roundtrip(config)
+    assert not copied._update_callbacks
+
+
+def test_pickle_leaf_config():
+    copied = _roundtrip(Config(5, metadata={"a": 1}))
+    assert copied.get_value() == 5
+    assert copied.metadata == {"a": 1}
+
+
+def test_pickle_root_proxy(config):
+    assert _roundtrip(config.root).a.b == 1
+
+
+def test_pickle_lazy_is_not_loaded(tmpdir):
+    filename = str(tmpdir.join("section.py"))
+    with open(filename, "w") as f:
+        f.write("CONFIG = {'x': 1}\n")
+    config = Config({"section": Lazy(filename)})
+    copied = _roundtrip(config)
+    assert isinstance(copied._value["section"], Lazy)
+    assert copied.root.section.x == 1
+
+
+def test_pickle_derived_config(config):
+    derived = derive(config, {"a": {"b": 3}})
+    copied = _roundtrip(derived)
+    assert type(copied) is Config
+    assert copied.root.a.b == 3
+    assert copied.root.e == 3
+    config.root.a.c = 10
+    assert copied.root.a.c == 2
+
+
+def test_pickle_is_flat():
+    config = Config({"a": {"b": {"c": {"d": 1}}}})
+    # the nodes are not pickled as separate objects
+    assert b"Config" in pickle.dumps(config)
+    assert pickle.dumps(config).count(b"Config") == 1
+
+
+def test_copy_preserves_key_order():
+    config = Config({"z": 1, "y": {"a": 1}, "x": 2, "w": {}})
+    assert list(_roundtrip(config).keys()) == ["z", "y", "x", "w"]
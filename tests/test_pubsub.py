@@ -0,0 +1,150 @@
+import copy
+import time
+from multiprocessing import AuthenticationError, current_process
+from multiprocessing.connection import Client
+
+import pytest
+from confetti import Config
+from confetti.pubsub import Publisher, Subscriber
+
+
+@pytest.fixture
+def address(tmpdir):
+    return str(tmpdir.join("config.sock"))
+
+
+@pytest.fixture
+def master():
+    return Config({"a": {"b": 1, "c": {"d": "x"}}, "e": {"f": 2}})
+
+
+@pytest.fixture
+def worker(master):
+    return copy.deepcopy(master)
+
+
+@pytest.fixture
+def publisher(master, address):
+    returned = Publisher(master, address, batch_interval=None)
+    yield returned
+    returned.close()
+
+
+def _wait_for(subscriber, version):
+    while subscriber.get_version() < version:
+        assert subscriber.poll(timeout=5)
+
+
+def test_propagation(master, worker, publisher, address):
+    subscriber = Subscriber(worker, address)
+    master.assign_path("a.b", 2)
+    master.root.a.c.d = "y"
+    publisher.flush()
+    _wait_for(subscriber, 1)
+    assert worker.serialize_to_dict() == master.serialize_to_dict()
+    subscriber.close()
+
+
+def test_batching(master, worker, publisher, address):
+    subscriber = Subscriber(worker, address)
+    for value in range(10):
+        master.assign_path("a.b", value)
+    publisher.flush()
+    publisher.flush()
+    assert publisher.get_version() == 1
+    _wait_for(subscriber, 1)
+    assert worker.root.a.b == 9
+    subscriber.close()
+
+
+def test_only_relevant_hooks_fired(master, worker, publisher, address):
+    subscriber = Subscriber(worker, address)
+    updated = []
+    worker.get_config("a").on_update(lambda _: updated.append("a"))
+    worker.get_config("e").on_update(lambda _: updated.append("e"))
+    master.assign_path("e.f", 3)
+    publisher.flush()
+    _wait_for(subscriber, 1)
+    assert updated == ["e"]
+    subscriber.close()
+
+
+def test_new_subtrees(master, worker, publisher, address):
+    subscriber = Subscriber(worker, address)
+    master.extend({"g": {"h": {"i": 1}}})
+    master.assign_path("g.h.i", 2)
+    master.update({"a": {"new": {"j": 3}}})
+    publisher.flush()
+    _wait_for(subscriber, 1)
+    assert worker.serialize_to_dict() == master.serialize_to_dict()
+    subscriber.close()
+
+
+def test_catch_up_from_history(master, worker, publisher, address):
+    for value in range(3):
+        master.assign_path("a.b", value)
+        publisher.flush()
+    subscriber = Subscriber(worker, address, version=1)
+    _wait_for(subscriber, 3)
+    assert worker.root.a.b == 2
+    subscriber.close()
+
+
+def test_catch_up_from_snapshot(master, worker, address):
+    publisher = Publisher(master, address, batch_interval=None, history=1)
+    try:
+        master.assign_path("a.b", 5)
+        publisher.flush()
+        master.assign_path("e.f", 6)
+        publisher.flush()
+        subscriber = Subscriber(worker, address)
+        _wait_for(subscriber, 2)
+        assert worker.serialize_to_dict() == master.serialize_to_dict()
+        subscriber.close()
+    finally:
+        publisher.close()
+
+
+def test_background_flushing_and_applying(master, worker, address):
+    publisher = Publisher(master, address, batch_interval=0.01)
+    try:
+        subscriber = Subscriber(worker, address)
+        subscriber.start()
+        master.assign_path("a.b", 7)
+        for _ in range(500):
+            if worker.root.a.b == 7:
+                break
+            time.sleep(0.01)
+        assert worker.root.a.b == 7
+        subscriber.close()
+    finally:
+        publisher.close()
+
+
+def test_bad_clients_do_not_stop_publisher(master, worker, publisher, address):
+    with pytest.raises(AuthenticationError):
+        Client(address, authkey=b"wrong key")
+    garbage = Client(address, authkey=current_process().authkey)
+    garbage.send("not a subscription")
+    garbage.close()
+    subscriber = Subscriber(worker, address)
+    master.assign_path("a.b", 2)
+    publisher.flush()
+    _wait_for(subscriber, 1)
+    assert worker.root.a.b == 2
+    subscriber.close()
+
+
+def test_authkey_required(master, worker, address):
+    publisher = Publisher(master, address, authkey=b"secret", batch_interval=None)
+    try:
+        with pytest.raises(AuthenticationError):
+            Subscriber(worker, address)
+        subscriber = Subscriber(worker, address, authkey=b"secret")
+        master.assign_path("a.b", 3)
+        publisher.flush()
+        _wait_for(subscriber, 1)
+        assert worker.root.a.b == 3
+        subscriber.close()
+    finally:
+        publisher.close()
@@ -0,0 +1,104 @@
+import pytest
+from confetti import Config
+from confetti import exceptions
+
+
+@pytest.fixture
+def config():
+    return Config(
+        {
+            "services": {
+                "web": {"pool": {"max_size": 10}, "timeout": 1},
+                "db": {"pool": {"max_size": 20}, "timeout": 2},
+                "db_replica": {"pool": {"max_size": 30}},
+            },
+            "timeout": 3,
+        }
+    )
+
+
+@pytest.fixture(params=[False, True])
+def indexed(request, config):
+    if request.param:
+        config.build_query_index()
+    return config
+
+
+def _paths(results):
+    return sorted(path for path, _ in results)
+
+
+def test_query_single_wildcard(indexed):
+    assert _paths(indexed.query("services.*.pool.max_size")) == [
+        "services.db.pool.max_size",
+        "services.db_replica.pool.max_size",
+        "services.web.pool.max_size",
+    ]
+
+
+def test_query_any_depth(indexed):
+    assert _paths(indexed.query("**.timeout")) == [
+        "services.db.timeout",
+        "services.web.timeout",
+        "timeout",
+    ]
+
+
+def test_query_any_depth_in_middle(indexed):
+    assert _paths(indexed.query("services.**.max_size")) == [
+        "services.db.pool.max_size",
+        "services.db_replica.pool.max_size",
+        "services.web.pool.max_size",
+    ]
+
+
+def test_query_glob_component(indexed):
+    assert _paths(indexed.query("services.db*.pool")) == [
+        "services.db.pool",
+        "services.db_replica.pool",
+    ]
+
+
+def test_query_returns_config_objects(indexed):
+    [(path, cfg)] = indexed.query("services.web.timeout")
+    assert cfg is indexed.get_config(path)
+    assert cfg.get_value() == 1
+
+
+def test_query_no_match(indexed):
+    assert indexed.query("services.*.nonexistent") == []
+
+
+def test_query_index_invalidated_on_structure_change(config):
+    config.build_query_index()
+    config["services"].extend({"cache": {"timeout": 4}})
+    assert "services.cache.timeout" in _paths(config.query("**.timeout"))
+    config["services"].pop("db")
+    assert "services.db.timeout" not in _paths(config.query("**.timeout"))
+
+
+def test_assign_query(indexed, checkpoint):
+    indexed.on_update(checkpoint)
+    calls = []
+    indexed["services"].on_update(calls.append)
+    indexed.assign_query("services.*.pool.max_size", 5)
+    assert checkpoint.called
+    assert len(calls) == 1
+    assert [cfg.get_value() for _, cfg in indexed.query("**.max_size")] == [5, 5, 5]
+    assert indexed.is_dirty()
+
+
+def test_assign_query_non_leaf(config):
+    with pytest.raises(exceptions.CannotSetValue):
+        config.assign_query("services.*.pool", 5)
+    assert config.get_path("services.web.pool.max_size") == 10
+
+
+def test_pattern_cache_is_bounded():
+    from confetti import query
+
+    config = Config({"a": 1})
+    for index in range(query._MAX_CACHED_PATTERNS * 2):
+        assert config.query("a{0}".format(index)) == []
+    assert len(query._pattern_cache) <= query._MAX_CACHED_PATTERNS
+    assert query.compile_pattern("a.*") is query.compile_pattern("a.*")
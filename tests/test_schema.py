@@ -0,0 +1,129 @@
+import pytest
+from confetti import Config, Metadata, Ref
+from confetti import exceptions
+
+
+@pytest.fixture
+def config():
+    return Config(
+        {
+            "host": "localhost",
+            "port": 8080 // Metadata(min_value=1, max_value=65535),
+            "ratio": 0.5,
+            "debug": False,
+            "mode": "fast" // Metadata(choices=["fast", "slow"]),
+            "nothing": None,
+            "ref": Ref(".port"),
+            "db": {"name": "x", "pool": {"size": 3}},
+        }
+    )
+
+
+@pytest.fixture
+def schema(config):
+    return config.compile_schema()
+
+
+def test_validate_valid_overlay(schema):
+    schema.validate(
+        {"host": "example.com", "ratio": 1, "nothing": 3, "db": {"pool": {"size": 5}}}
+    )
+    schema.validate(Config({"port": 1, "mode": "slow", "ref": Ref(".host")}))
+
+
+def test_validate_collects_all_errors(schema):
+    with pytest.raises(exceptions.ValidationError) as caught:
+        schema.validate(
+            {
+                "host": 1,
+                "port": 0,
+                "debug": 0,
+                "mode": "medium",
+                "db": {"pool": 2, "user": "admin", "name": {"x": 1}},
+            }
+        )
+    assert [path for path, _ in caught.value.errors] == [
+        "db.name",
+        "db.pool",
+        "db.user",
+        "debug",
+        "host",
+        "mode",
+        "port",
+    ]
+
+
+def test_custom_validator_and_type():
+    config = Config(
+        {
+            "a": None // Metadata(type=int),
+            "b": 2 // Metadata(validator=lambda x: x % 2 == 0),
+        }
+    )
+    schema = config.compile_schema()
+    assert schema.get_errors({"a": 1, "b": 4}) == []
+    assert [path for path, _ in schema.get_errors({"a": "x", "b": 3})] == ["a", "b"]
+
+
+def test_not_enforced_by_default(config, schema):
+    config.root.port = "x"
+    assert config.root.port == "x"
+
+
+def test_enforced_assignments(config):
+    config.compile_schema(enforce=True)
+    with pytest.raises(exceptions.ValidationError):
+        config.root.port = "x"
+    with pytest.raises(exceptions.ValidationError):
+        config.assign_path("db.pool.size", 0.5)
+    with pytest.raises(exceptions.ValidationError):
+        config["mode"] = "medium"
+    config.root.port = 80
+    config.root.port = 81
+    with pytest.raises(exceptions.ValidationError):
+        config.root.port = 0
+    assert config.root.port == 81
+    assert config.get_config("port").metadata == {"min_value": 1, "max_value": 65535}
+
+
+def test_enforced_update_and_extend(config):
+    config.compile_schema(enforce=True)
+    with pytest.raises(exceptions.ValidationError) as caught:
+        config.update({"port": 0, "host": "example.com", "db": {"pool": {"size": "x"}}})
+    assert [path for path, _ in caught.value.errors] == ["db.pool.size", "port"]
+    assert config.root.host == "localhost"
+    with pytest.raises(exceptions.ValidationError):
+        config.extend({"mode": "medium"})
+    problems = config.update({"port": 0}, dry_run=True)
+    assert [type(problem) for problem in problems] == [exceptions.ValidationError]
+    assert config.root.port == 8080
+
+    config.update({"port": 80, "db": {"pool": {"size": 4}}})
+    config.extend({"mode": "slow"})
+    assert config.get_config("port").metadata == {"min_value": 1, "max_value": 65535}
+    with pytest.raises(exceptions.ValidationError):
+        config.root.port = 0
+    with pytest.raises(exceptions.ValidationError):
+        config.root.db.pool.size = "x"
+    with pytest.raises(exceptions.ValidationError):
+        config.update({"mode": "medium"})
+    assert (config.root.port, config.root.mode) == (80, "slow")
+
+
+def test_enforced_assign_query(config):
+    config.compile_schema(enforce=True)
+    with pytest.raises(exceptions.ValidationError):
+        config.assign_query("*or*", 0)
+    assert config.root.port == 8080
+    config.assign_query("po*", 81)
+    assert config.root.port == 81
+
+
+def test_enforced_load_environ(config):
+    config.compile_schema(enforce=True)
+    environ = {"APP__PORT": "0", "APP__HOST": "example.com"}
+    with pytest.raises(exceptions.ValidationError):
+        config.load_environ(environ=environ)
+    assert (config.root.port, config.root.host) == (8080, "localhost")
+    config.load_environ(environ={"APP__PORT": "81"})
+    assert config.root.port == 81
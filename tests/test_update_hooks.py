@@ -9,3 +9,34 @@ def test_update_hook(nested_config, checkpoint):
     nested_config.root.a.b.value += 1
 
     assert checkpoint.called
+
+
+def test_change_hook(nested_config):
+    changes = []
+    nested_config.on_change(lambda path, value: changes.append((path, value)))
+    nested_config.get_config("a").on_change(
+        lambda path, value: changes.append(("a:" + path, value))
+    )
+    nested_config.root.a.b.value = 5
+    nested_config.assign_path("a2.value", 6)
+    assert changes == [("a:b.value", 5), ("a.b.value", 5), ("a2.value", 6)]
+    del changes[:]
+    nested_config.assign_query("a.**.value", 7)
+    assert sorted(changes) == [
+        ("a.b.value", 7),
+        ("a.value", 7),
+        ("a:b.value", 7),
+        ("a:value", 7),
+    ]
+
+
+def test_remove_hook(nested_config):
+    removals = []
+    nested_config.on_remove(removals.append)
+    nested_config.get_config("a").on_remove(lambda path: removals.append("a:" + path))
+    nested_config.get_config("a.b").pop("value")
+    nested_config.pop("a2")
+    assert removals == ["a:b.value", "a.b.value", "a2"]
+    del removals[:]
+    nested_config.apply_patch([("remove", "a.value", None)])
+    assert removals == ["a:value", "a.value"]
@@ -0,0 +1,89 @@
+import pytest
+from confetti import Config
+
+
+def _versions(config, *paths):
+    return [
+        config.get_config(path).version if path else config.version for path in paths
+    ]
+
+
+def test_versions_are_unique():
+    first = Config({"a": 1})
+    second = Config({"a": 1})
+    assert first.version != second.version
+
+
+def test_leaf_change_bumps_parent_chain(nested_config):
+    before = _versions(nested_config, "", "a", "a.b", "a2")
+    nested_config.root.a.b.value = 10
+    after = _versions(nested_config, "", "a", "a.b", "a2")
+    assert after[0] > before[0]
+    assert after[1] > before[1]
+    assert after[2] > before[2]
+    assert after[3] == before[3]
+
+
+def test_set_value_bumps_leaf(nested_config):
+    leaf = nested_config.get_config("a.value")
+    before = leaf.version
+    nested_config.assign_path("a.value", 5)
+    assert leaf.version > before
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        lambda config: config.extend({"a": {"new": 1}}),
+        lambda config: config.update({"a": {"value": 1}}),
+        lambda config: config.get_config("a").pop("value"),
+        lambda config: config.assign_query("**.value", 5),
+        lambda config: config.load_environ(environ={"APP__A__VALUE": "5"}),
+    ],
+)
+def test_operations_bump_versions(nested_config, operation):
+    before = _versions(nested_config, "", "a")
+    operation(nested_config)
+    after = _versions(nested_config, "", "a")
+    assert after[0] > before[0]
+    assert after[1] > before[1]
+
+
+def test_restore_bumps_versions(nested_config):
+    nested_config.backup()
+    nested_config.root.a.b.value = 10
+    version = nested_config.get_config("a.b").version
+    nested_config.restore()
+    assert nested_config.root.a.b.value == 2
+    assert nested_config.get_config("a.b").version > version
+
+
+def test_tree_version(nested_config):
+    leaf = nested_config.get_config("a.b.value")
+    assert leaf.get_tree_version() == nested_config.version
+    nested_config.root.a2.value = 7
+    assert leaf.get_tree_version() == nested_config.version
+
+
+def test_derived_versions_follow_base(nested_config):
+    derived = nested_config.derive()
+    version = derived.get_config("a.b").version
+    root_version = derived.version
+    assert derived.get_config("a.b").version == version
+    nested_config.root.a.b.value = 10
+    assert derived.get_config("a.b").version > version
+    assert derived.version > root_version
+
+
+def test_changed_derived_versions_follow_base(nested_config):
+    derived = nested_config.derive()
+    derived.root.a2.value = 30
+    version = derived.version
+    assert derived.version == version
+    assert derived.version != nested_config.version
+    nested_config.root.a.b.value = 10
+    assert derived.version > version
+    assert derived.version != nested_config.version
+    version = derived.version
+    derived.root.value = 5
+    assert derived.version > version
@@ -0,0 +1,154 @@
+import collections
+import gc
+
+import pytest
+
+from confetti import Config
+
+
+class _Subscriber(object):
+    def __init__(self):
+        super(_Subscriber, self).__init__()
+        self.updates = []
+        self.changes = []
+
+    def on_update(self, config):
+        self.updates.append(config)
+
+    def on_change(self, path, value):
+        self.changes.append((path, value))
+
+
+@pytest.fixture
+def config():
+    return Config({"a": {"b": 1}, "c": 2})
+
+
+def test_weak_update_callback(config):
+    subscriber = _Subscriber()
+    config.on_update(subscriber.on_update, weak=True)
+    config.root.a.b = 2
+    assert subscriber.updates == [config]
+    del subscriber
+    gc.collect()
+    assert config._update_callbacks == []
+    config.root.a.b = 3
+
+
+def test_weak_update_callback_function(config):
+    calls = []
+
+    def callback(config):
+        calls.append(config)
+
+    config.on_update(callback, weak=True)
+    config.root.c = 3
+    assert calls == [config]
+    del callback
+    gc.collect()
+    assert config._update_callbacks == []
+
+
+def test_weak_builtin_method_callbacks(config):
+    updates = []
+    changes = collections.OrderedDict()
+    config.on_update(updates.append, weak=True)
+    config.on_change(changes.__setitem__, weak=True)
+    config.root.c = 3
+    assert updates == [config]
+    assert list(changes.items()) == [("c", 3)]
+    # lists cannot be referenced weakly, so their methods are kept alive
+    del updates
+    gc.collect()
+    assert len(config._update_callbacks) == 1
+    del changes
+    gc.collect()
+    assert config._change_callbacks == []
+    config.root.c = 4
+
+
+def test_weak_change_callback(config):
+    subscriber = _Subscriber()
+    config.on_change(subscriber.on_change, weak=True)
+    config.root.a.b = 2
+    assert subscriber.changes == [("a.b", 2)]
+    del subscriber
+    gc.collect()
+    assert config._change_callbacks == []
+    config.root.a.b = 3
+
+
+def test_strong_callback_kept(config):
+    config.on_update(_Subscriber().on_update)
+    gc.collect()
+    assert len(config._update_callbacks) == 1
+
+
+def test_pop_detaches(config):
+    child = config.get_config("a")
+    assert config.pop("a") is child
+    assert child.get_parent() is None
+    version = config.version
+    child.root.b = 5
+    assert config.version == version
+
+
+def test_replace_detaches(config):
+    child = config.get_config("a")
+    config["a"] = Config({"b": 2})
+    assert child.get_parent() is None
+    assert config.get_config("a").get_parent() is config
+    updates = []
+    config.on_update(updates.append)
+    child.root.b = 5
+    assert updates == []
+    config.root.a.b = 3
+    assert updates == [config]
+
+
+def test_update_detaches_replaced_leaves(config):
+    leaf = config.get_config("a.b")
+    config.update({"a": {"b": 2}})
+    assert leaf.get_parent() is None
+    assert config.root.a.b == 2
+
+
+def test_restore_detaches(config):
+    config.backup()
+    config.extend({"d": {"e": 1}})
+    added = config.get_config("d")
+    config.restore()
+    assert added.get_parent() is None
+
+
+def test_apply_patch_detaches(config):
+    child = config.get_config("a")
+    config.apply_patch([("remove", "a", None)])
+    assert child.get_parent() is None
+
+
+def _cycle(config):
+    subscriber = _Subscriber()
+    config.on_update(subscriber.on_update, weak=True)
+    config.on_change(subscriber.on_change, weak=True)
+    config["a"] = Config({"b": {"c": list(range(10))}})
+    config.root.a.b.c = [1]
+
+
+def test_memory_flat_over_replace_subscribe_cycles(config):
+    tracemalloc = pytest.importorskip("tracemalloc")
+    for _ in range(200):
+        _cycle(config)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        for _ in range(2000):
+            _cycle(config)
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    assert len(config._update_callbacks) == 0
+    assert len(config._change_callbacks) == 0
+    assert growth < 20000